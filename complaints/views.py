@@ -9,6 +9,10 @@ from .models import Complaint, ComplaintStatus, ComplaintCategory
 from .serializers import ComplaintSerializer, ComplaintStatusSerializer, ComplaintCategorySerializer
 from tenants.models import Tenant
 from core.models import Estate, Block
+from core.exports import COMPLAINT_COLUMNS, streaming_csv_response, with_tenant_name
+from core.scoping import EstateScopeMixin
+from core.statuses import COMPLAINT_STATUSES
+from core.timeseries import BUCKETS, DEFAULT_BUCKET, bucket_starts, bucketed_counts
 
 class ComplaintStatusViewSet(viewsets.ModelViewSet):
     queryset = ComplaintStatus.objects.all()
@@ -109,7 +113,7 @@ class ComplaintStatusViewSet(viewsets.ModelViewSet):
         
         return queryset
 
-class ComplaintViewSet(viewsets.ModelViewSet):
+class ComplaintViewSet(EstateScopeMixin, viewsets.ModelViewSet):
     queryset = Complaint.objects.all()
     serializer_class = ComplaintSerializer
     permission_classes = [IsAuthenticated]
@@ -125,6 +129,13 @@ class ComplaintViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(tenant_id=tenant_id)
         return queryset
     
+    @action(detail=False, methods=['get'], url_path='export.csv', url_name='export-csv')
+    def export_csv(self, request):
+        """Stream every complaint matching the list filters as CSV"""
+        queryset = self.scope_to_owner(self.get_queryset(), 'tenant__apartment__block__estate')
+        filename = f'complaints_{timezone.localdate().isoformat()}.csv'
+        return streaming_csv_response(with_tenant_name(queryset), COMPLAINT_COLUMNS, filename)
+    
     @action(detail=False, methods=['get'])
     def my_complaints(self, request):
         """Get complaints for the logged-in tenant with comprehensive data"""
@@ -323,12 +334,8 @@ class ComplaintViewSet(viewsets.ModelViewSet):
             
             # Set default status to 'Open'
             print("Looking for 'Open' status or creating it...")
-            open_status, created = ComplaintStatus.objects.get_or_create(
-                name='Open',
-                defaults={'name': 'Open'}
-            )
-            print(f"Open status: {open_status} (created: {created})")
-            data['status'] = open_status.id
+            data['status'] = COMPLAINT_STATUSES.get_or_create('Open')
+            print(f"Open status ID: {data['status']}")
             print(f"Final data with status: {data}")
             
             serializer = self.get_serializer(data=data)
@@ -373,10 +380,13 @@ class ComplaintViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def dashboard_analytics(self, request):
         """Get complaint analytics for property owner dashboard"""
-        total_complaints = Complaint.objects.count()
+        complaints = self.scope_to_owner(Complaint.objects.all(), 'tenant__apartment__block__estate')
+        resolved_ids = COMPLAINT_STATUSES.ids_containing('resolved')
+        open_ids = COMPLAINT_STATUSES.ids_containing('open')
+        total_complaints = complaints.count()
         
         # Count by status
-        status_counts = Complaint.objects.values('status__name').annotate(
+        status_counts = complaints.values('status__name').annotate(
             count=Count('id')
         ).order_by('status__name')
         
@@ -388,8 +398,8 @@ class ComplaintViewSet(viewsets.ModelViewSet):
         closed_complaints = status_dict.get('closed', 0)
         
         # Calculate average resolution time (simplified)
-        resolved_complaints_list = Complaint.objects.filter(
-            status__name__icontains='resolved'
+        resolved_complaints_list = complaints.filter(
+            status_id__in=resolved_ids
         ).exclude(created_at__isnull=True).exclude(updated_at__isnull=True)
         
         if resolved_complaints_list.exists():
@@ -402,7 +412,7 @@ class ComplaintViewSet(viewsets.ModelViewSet):
             avg_resolution_time = 0
         
         # Estate-wise analytics
-        estates = Estate.objects.all()
+        estates = self.scope_to_owner(Estate.objects.all(), 'id')
         estate_data = []
         
         for estate in estates:
@@ -412,11 +422,11 @@ class ComplaintViewSet(viewsets.ModelViewSet):
             estate_total = estate_complaints.count()
             
             estate_resolved = estate_complaints.filter(
-                status__name__icontains='resolved'
+                status_id__in=resolved_ids
             ).count()
             
             estate_open = estate_complaints.filter(
-                status__name__icontains='open'
+                status_id__in=open_ids
             ).count()
             
             # Calculate resolution rate
@@ -424,7 +434,7 @@ class ComplaintViewSet(viewsets.ModelViewSet):
             
             # Calculate average resolution time for this estate
             estate_resolved_list = estate_complaints.filter(
-                status__name__icontains='resolved'
+                status_id__in=resolved_ids
             ).exclude(created_at__isnull=True).exclude(updated_at__isnull=True)
             
             if estate_resolved_list.exists():
@@ -443,8 +453,8 @@ class ComplaintViewSet(viewsets.ModelViewSet):
                     tenant__apartment__block=block
                 )
                 block_total = block_complaints.count()
-                block_open = block_complaints.filter(status__name__icontains='open').count()
-                block_resolved = block_complaints.filter(status__name__icontains='resolved').count()
+                block_open = block_complaints.filter(status_id__in=open_ids).count()
+                block_resolved = block_complaints.filter(status_id__in=resolved_ids).count()
                 
                 blocks_data.append({
                     'block_id': block.id,
@@ -478,35 +488,45 @@ class ComplaintViewSet(viewsets.ModelViewSet):
     def trends(self, request):
         """Get complaint trends over time"""
         days = int(request.query_params.get('days', 30))
+        bucket = request.query_params.get('bucket', DEFAULT_BUCKET)  # 'day', 'week' or 'month'
+        if bucket not in BUCKETS:
+            return Response({
+                'error': f'bucket must be one of: {", ".join(BUCKETS)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
         start_date = timezone.now() - timedelta(days=days)
+        first_day = start_date.date()
+        last_day = timezone.now().date()
         
-        # Get daily complaint counts
-        trends = []
-        current_date = start_date
+        complaints = self.scope_to_owner(Complaint.objects.all(), 'tenant__apartment__block__estate')
+        resolved_ids = COMPLAINT_STATUSES.ids_containing('resolved')
         
-        while current_date <= timezone.now():
-            new_complaints = Complaint.objects.filter(
-                created_at__date=current_date.date()
-            ).count()
-            
-            resolved_complaints = Complaint.objects.filter(
-                updated_at__date=current_date.date(),
-                status__name__icontains='resolved'
-            ).count()
-            
+        # New complaints by creation date, resolutions by last update - one grouped query each
+        new_counts = bucketed_counts(
+            complaints.filter(created_at__date__gte=first_day, created_at__date__lte=last_day),
+            'created_at', bucket, count=Count('id')
+        )
+        resolved_counts = bucketed_counts(
+            complaints.filter(
+                updated_at__date__gte=first_day,
+                updated_at__date__lte=last_day,
+                status_id__in=resolved_ids
+            ),
+            'updated_at', bucket, count=Count('id')
+        )
+        
+        trends = []
+        for day in bucket_starts(first_day, last_day, bucket):
             trends.append({
-                'date': current_date.date(),
-                'new': new_complaints,
-                'resolved': resolved_complaints
+                'date': day,
+                'new': new_counts.get(day, {}).get('count', 0),
+                'resolved': resolved_counts.get(day, {}).get('count', 0)
             })
-            
-            current_date += timedelta(days=1)
         
         # Summary for the period
-        total_new = Complaint.objects.filter(created_at__gte=start_date).count()
-        total_resolved = Complaint.objects.filter(
+        total_new = complaints.filter(created_at__gte=start_date).count()
+        total_resolved = complaints.filter(
             updated_at__gte=start_date,
-            status__name__icontains='resolved'
+            status_id__in=resolved_ids
         ).count()
         
         return Response({
@@ -528,16 +548,17 @@ class ComplaintViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         # Filter complaints by date range
-        complaints = Complaint.objects.filter(
+        complaints = self.scope_to_owner(Complaint.objects.filter(
             created_at__date__gte=start_date,
             created_at__date__lte=end_date
-        )
+        ), 'tenant__apartment__block__estate')
+        resolved_ids = COMPLAINT_STATUSES.ids_containing('resolved')
         
         total_complaints = complaints.count()
-        resolved_complaints = complaints.filter(status__name__icontains='resolved').count()
+        resolved_complaints = complaints.filter(status_id__in=resolved_ids).count()
         
         # Calculate average resolution time
-        resolved_list = complaints.filter(status__name__icontains='resolved')
+        resolved_list = complaints.filter(status_id__in=resolved_ids)
         if resolved_list.exists():
             total_resolution_time = sum(
                 (complaint.updated_at - complaint.created_at).days 
@@ -573,13 +594,13 @@ class ComplaintViewSet(viewsets.ModelViewSet):
                 category['resolution_rate'] = 0
         
         # Estate breakdown
-        estates = Estate.objects.all()
+        estates = self.scope_to_owner(Estate.objects.all(), 'id')
         estate_breakdown = []
         
         for estate in estates:
             estate_complaints = complaints.filter(tenant__apartment__block__estate=estate)
             estate_count = estate_complaints.count()
-            estate_resolved = estate_complaints.filter(status__name__icontains='resolved').count()
+            estate_resolved = estate_complaints.filter(status_id__in=resolved_ids).count()
             
             if estate_count > 0:
                 estate_breakdown.append({
@@ -601,9 +622,9 @@ class ComplaintViewSet(viewsets.ModelViewSet):
     def close(self, request, pk=None):
         """Close a complaint"""
         complaint = self.get_object()
-        closed_status = ComplaintStatus.objects.filter(name__icontains='closed').first()
-        if closed_status:
-            complaint.status = closed_status
+        closed_status_id = COMPLAINT_STATUSES.first_containing('closed')
+        if closed_status_id:
+            complaint.status_id = closed_status_id
             complaint.save()
             # TODO: Trigger email notification to tenant
             return Response({'message': 'Complaint closed successfully'})
@@ -2,4 +2,10 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'core'
\ No newline at end of file
+    name = 'core'
+
+    def ready(self):
+        from .signals import connect_cache_invalidation, connect_rollup_maintenance, connect_status_registries
+        connect_cache_invalidation()
+        connect_rollup_maintenance()
+        connect_status_registries()
@@ -0,0 +1,138 @@
+import functools
+import hashlib
+import json
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+VERSION_KEY_PREFIX = 'pms:version'
+RESPONSE_KEY_PREFIX = 'pms:response'
+STATS_KEY_PREFIX = 'pms:cache-stats'
+
+# Namespaces passed to @cached_response, reported by get_cache_stats()
+RESPONSE_CACHE_NAMESPACES = ['apartments-list', 'apartments-available', 'owner-dashboard']
+
+
+def _version_key(label):
+    return f'{VERSION_KEY_PREFIX}:{label}'
+
+
+def _seed_value():
+    # A missing counter (never set, or evicted) restarts from the clock rather
+    # than 0, so it can never collide with a version an old entry was keyed on
+    return int(time.time() * 1000)
+
+
+def get_model_versions(labels):
+    """Current version counter for each model label, e.g. 'core.apartment'"""
+    keys = {_version_key(label): label for label in labels}
+    found = cache.get_many(list(keys))
+    versions = {}
+    for key, label in keys.items():
+        if key not in found:
+            cache.add(key, _seed_value(), timeout=None)
+            found[key] = cache.get(key)
+        versions[label] = found[key]
+    return versions
+
+
+def bump_model_version(label):
+    """Invalidate every cached response that depends on this model"""
+    key = _version_key(label)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _seed_value(), timeout=None)
+
+
+def bump_model_version_on_commit(label):
+    # Bumping before commit would let a concurrent request re-cache the old rows
+    transaction.on_commit(lambda: bump_model_version(label))
+
+
+def record_cache_event(namespace, event):
+    key = f'{STATS_KEY_PREFIX}:{namespace}:{event}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_cache_stats(namespaces=RESPONSE_CACHE_NAMESPACES):
+    """Hit/miss counters for the given cache namespaces"""
+    stats = {}
+    for namespace in namespaces:
+        hits = cache.get(f'{STATS_KEY_PREFIX}:{namespace}:hit', 0)
+        misses = cache.get(f'{STATS_KEY_PREFIX}:{namespace}:miss', 0)
+        total = hits + misses
+        stats[namespace] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round((hits / total * 100) if total > 0 else 0, 2)
+        }
+    return stats
+
+
+def reset_cache_stats(namespaces=RESPONSE_CACHE_NAMESPACES):
+    cache.delete_many([
+        f'{STATS_KEY_PREFIX}:{namespace}:{event}'
+        for namespace in namespaces for event in ('hit', 'miss')
+    ])
+
+
+def build_response_cache_key(namespace, request, labels, vary_on=None):
+    """Key on the normalized query parameters plus the version of every dependency"""
+    params = {
+        key: sorted(request.query_params.getlist(key))
+        for key in sorted(request.query_params.keys())
+    }
+    payload = json.dumps({
+        'host': request.get_host(),
+        'path': request.path,
+        'params': params,
+        'versions': get_model_versions(labels),
+        'vary': vary_on(request) if vary_on else None,
+    }, sort_keys=True, default=str)
+    digest = hashlib.md5(payload.encode('utf-8')).hexdigest()
+    return f'{RESPONSE_KEY_PREFIX}:{namespace}:{digest}'
+
+
+def cached_response(namespace, models, timeout=None, vary_on=None):
+    """
+    Cache a viewset action's successful responses.
+
+    ``models`` lists the model labels the response is built from; saving or
+    deleting any of them bumps its version counter, which changes the key and
+    so retires every cached response built from the old data. ``vary_on``
+    (request -> JSON-able value) adds per-user key material, e.g. the
+    owner's estate scope, for responses that differ between users.
+
+    Responses are only cached with a shared cache (settings.SHARED_CACHE):
+    a per-process cache never sees the version bumps of writes made by
+    other workers or by Celery, so it would keep serving their old data.
+    """
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if not settings.SHARED_CACHE:
+                return view_method(self, request, *args, **kwargs)
+            key = build_response_cache_key(namespace, request, models, vary_on)
+            cached = cache.get(key)
+            if cached is not None:
+                record_cache_event(namespace, 'hit')
+                response = Response(cached)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            record_cache_event(namespace, 'miss')
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache_timeout = timeout if timeout is not None else settings.RESPONSE_CACHE_TIMEOUT
+                cache.set(key, response.data, cache_timeout)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
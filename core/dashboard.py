@@ -0,0 +1,66 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from django.db import connections
+
+WIDGET_OK = 'ok'
+WIDGET_ERROR = 'error'
+WIDGET_TIMEOUT = 'timeout'
+
+
+def _elapsed_ms(since, until=None):
+    return round(((until or time.monotonic()) - since) * 1000, 1)
+
+
+def _run_widget(widget, timings, name):
+    timings[name] = [time.monotonic(), None]
+    try:
+        return widget()
+    finally:
+        timings[name][1] = time.monotonic()
+        # Each pool thread opens its own database connection; don't leak it
+        connections.close_all()
+
+
+def run_widgets(widgets, max_workers, timeout):
+    """
+    Evaluate ``widgets`` ({name: zero-argument callable returning a DRF
+    Response}) on a bounded thread pool. A widget that runs longer than
+    ``timeout`` seconds (or waits that long for a free thread) is reported
+    as timed out and left to finish in the background.
+
+    Returns {name: {'status', 'elapsed_ms', 'data' | 'error'}} in the order
+    the widgets were given.
+    """
+    results = {}
+    timings = {}  # name -> [started, finished], written by the worker threads
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(widgets))), thread_name_prefix='dashboard')
+    submitted = time.monotonic()
+    try:
+        pending = {executor.submit(_run_widget, widget, timings, name): name for name, widget in widgets.items()}
+        while pending:
+            deadline = min(timings.get(name, [submitted])[0] for name in pending.values()) + timeout
+            done, _ = wait(pending, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                results[name] = _widget_result(future, _elapsed_ms(*timings[name]))
+
+            now = time.monotonic()
+            for future, name in list(pending.items()):
+                started = timings.get(name, [submitted])[0]
+                if now - started >= timeout:
+                    pending.pop(future)
+                    results[name] = {'status': WIDGET_TIMEOUT, 'elapsed_ms': _elapsed_ms(started)}
+    finally:
+        # Never wait for timed-out widgets; drop any that have not started
+        executor.shutdown(wait=False, cancel_futures=True)
+    return {name: results[name] for name in widgets}
+
+
+def _widget_result(future, elapsed_ms):
+    try:
+        response = future.result()
+    except Exception as exc:
+        return {'status': WIDGET_ERROR, 'elapsed_ms': elapsed_ms, 'error': str(exc)}
+    if response.status_code >= 400:
+        return {'status': WIDGET_ERROR, 'elapsed_ms': elapsed_ms, 'error': response.data}
+    return {'status': WIDGET_OK, 'elapsed_ms': elapsed_ms, 'data': response.data}
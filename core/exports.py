@@ -0,0 +1,328 @@
+"""
+Report exports.
+
+Each export is a flat ``values_list`` projection streamed from the database
+with ``QuerySet.iterator(chunk_size=...)``. Background reports (core.tasks)
+write it to a temporary file that is then moved into the export file store;
+the export.csv endpoints stream it straight into the response. Nothing holds
+more than one chunk of rows in memory.
+"""
+import csv
+import logging
+import tempfile
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q, Value
+from django.db.models.functions import Concat
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from complaints.models import Complaint
+from payments.models import Payment
+from tenants.models import Tenant
+from .models import ReportExport
+from .scoping import scope_queryset
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {'csv': 'csv', 'xlsx': 'xlsx', 'excel': 'xlsx'}
+
+# Report type -> prefix of the generated file name
+REPORT_FILENAMES = {
+    'payments': 'payment_report',
+    'occupancy': 'occupancy_report',
+    'complaints': 'complaint_report',
+    'tenancy': 'tenancy_report',
+}
+
+
+def _tenant_name(prefix=''):
+    return Concat(f'{prefix}user__first_name', Value(' '), f'{prefix}user__last_name')
+
+
+# (header, values_list field) pairs shared by the background reports and the
+# streaming export.csv endpoints; 'tenant_name' comes from with_tenant_name()
+PAYMENT_COLUMNS = [
+    ('Payment ID', 'id'),
+    ('Created At', 'created_at'),
+    ('Tenant', 'tenant_name'),
+    ('Estate', 'tenant__apartment__block__estate__name'),
+    ('Block', 'tenant__apartment__block__name'),
+    ('Apartment', 'tenant__apartment__number'),
+    ('Amount', 'amount'),
+    ('Status', 'status__name'),
+    ('Due Date', 'due_date'),
+    ('Paid At', 'paid_at'),
+    ('For Month', 'payment_for_month'),
+    ('For Year', 'payment_for_year'),
+    ('Method', 'payment_method'),
+    ('Type', 'payment_type'),
+    ('Reference', 'reference_number'),
+]
+
+COMPLAINT_COLUMNS = [
+    ('Complaint ID', 'id'),
+    ('Created At', 'created_at'),
+    ('Updated At', 'updated_at'),
+    ('Tenant', 'tenant_name'),
+    ('Estate', 'tenant__apartment__block__estate__name'),
+    ('Block', 'tenant__apartment__block__name'),
+    ('Apartment', 'tenant__apartment__number'),
+    ('Category', 'category__name'),
+    ('Status', 'status__name'),
+    ('Title', 'title'),
+    ('Description', 'description'),
+]
+
+
+def with_tenant_name(queryset, prefix='tenant__'):
+    return queryset.annotate(tenant_name=_tenant_name(prefix))
+
+
+def payments_report(start, end):
+    queryset = Payment.objects.filter(
+        created_at__date__gte=start, created_at__date__lte=end
+    )
+    return with_tenant_name(queryset), 'tenant__apartment__block__estate', PAYMENT_COLUMNS
+
+
+def occupancy_report(start, end):
+    """Every lease active at some point in the range"""
+    queryset = Tenant.objects.filter(
+        lease_start__lte=end, lease_end__gte=start
+    ).annotate(tenant_name=_tenant_name())
+    columns = [
+        ('Tenant ID', 'id'),
+        ('Tenant', 'tenant_name'),
+        ('Estate', 'apartment__block__estate__name'),
+        ('Block', 'apartment__block__name'),
+        ('Apartment', 'apartment__number'),
+        ('Rooms', 'apartment__number_of_rooms'),
+        ('Rent', 'apartment__rent_amount'),
+        ('Lease Start', 'lease_start'),
+        ('Lease End', 'lease_end'),
+    ]
+    return queryset, 'apartment__block__estate', columns
+
+
+def complaints_report(start, end):
+    queryset = Complaint.objects.filter(
+        created_at__date__gte=start, created_at__date__lte=end
+    )
+    return with_tenant_name(queryset), 'tenant__apartment__block__estate', COMPLAINT_COLUMNS
+
+
+def tenancy_report(start, end):
+    """Leases ending in the range"""
+    queryset = Tenant.objects.filter(
+        lease_end__gte=start, lease_end__lte=end
+    ).annotate(tenant_name=_tenant_name())
+    columns = [
+        ('Tenant ID', 'id'),
+        ('Tenant', 'tenant_name'),
+        ('Email', 'user__email'),
+        ('Phone', 'phone_number'),
+        ('Estate', 'apartment__block__estate__name'),
+        ('Block', 'apartment__block__name'),
+        ('Apartment', 'apartment__number'),
+        ('Rent', 'apartment__rent_amount'),
+        ('Lease Start', 'lease_start'),
+        ('Lease End', 'lease_end'),
+    ]
+    return queryset, 'apartment__block__estate', columns
+
+
+REPORTS = {
+    'payments': payments_report,
+    'occupancy': occupancy_report,
+    'complaints': complaints_report,
+    'tenancy': tenancy_report,
+}
+
+
+def report_rows(report_type, start, end, estate_ids=None, chunk_size=None):
+    """(headers, row iterator) for a report, restricted to ``estate_ids`` when given"""
+    queryset, estate_field, columns = REPORTS[report_type](start, end)
+    queryset = scope_queryset(queryset, estate_ids, estate_field).order_by('pk')
+    return [header for header, _ in columns], queryset_rows(queryset, columns, chunk_size)
+
+
+def queryset_rows(queryset, columns, chunk_size=None):
+    """Stream the ``columns`` projection of ``queryset`` one chunk at a time"""
+    rows = queryset.values_list(*[field for _, field in columns]).iterator(
+        chunk_size=chunk_size or settings.REPORT_EXPORT_CHUNK_SIZE
+    )
+    return (tuple(_cell(value) for value in row) for row in rows)
+
+
+def _cell(value):
+    # Spreadsheets have no time zones: write local wall-clock time to the second
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.replace(tzinfo=None, microsecond=0)
+    return value
+
+
+# Leading characters a spreadsheet reads as the start of a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_row(row):
+    """
+    CSV cells for one row. Tenant-entered text that would open as a formula
+    (complaint titles, notes...) is prefixed with ' so it stays text.
+    """
+    return [
+        '' if value is None
+        else f"'{value}" if isinstance(value, str) and value.startswith(FORMULA_PREFIXES)
+        else value
+        for value in row
+    ]
+
+
+def write_csv(handle, headers, rows):
+    writer = csv.writer(handle)
+    writer.writerow(headers)
+    count = 0
+    for row in rows:
+        writer.writerow(_csv_row(row))
+        count += 1
+    return count
+
+
+class _Echo:
+    """File-like object whose write() hands back the line instead of buffering it"""
+
+    def write(self, value):
+        return value
+
+
+def streaming_csv_response(queryset, columns, filename):
+    """
+    A CSV download of ``queryset`` produced while it is sent. Rows come from
+    a server-side cursor (iterator) in REPORT_EXPORT_CHUNK_SIZE batches, so
+    memory use does not grow with the number of rows.
+    """
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow([header for header, _ in columns])
+        for row in queryset_rows(queryset, columns):
+            yield writer.writerow(_csv_row(row))
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def write_xlsx(path, headers, rows, title):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    # write_only keeps a constant memory footprint: rows go straight to disk
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title[:31])
+    sheet.append(headers)
+
+    def text_cell(value):
+        # openpyxl stores strings starting with '=' as formulas; keep them text
+        cell = WriteOnlyCell(sheet, value)
+        cell.data_type = 's'
+        return cell
+
+    count = 0
+    for row in rows:
+        sheet.append([
+            text_cell(value) if isinstance(value, str) and value.startswith('=') else value
+            for value in row
+        ])
+        count += 1
+    workbook.save(path)
+    return count
+
+
+def export_filename(export):
+    prefix = REPORT_FILENAMES.get(export.report_type, 'report')
+    return f'{prefix}_{export.start_date.isoformat()}_{export.end_date.isoformat()}.{export.format}'
+
+
+def run_report_export(export_id):
+    """Generate one export; called by the worker task. Failures are recorded on the export."""
+    # A provisional expiry lets the purge job reap the row if this worker dies mid-run
+    started_at = timezone.now()
+    updated = ReportExport.objects.filter(
+        pk=export_id, status=ReportExport.STATUS_PENDING
+    ).update(
+        status=ReportExport.STATUS_RUNNING, started_at=started_at,
+        expires_at=started_at + timedelta(hours=settings.REPORT_EXPORT_TTL_HOURS)
+    )
+    if not updated:
+        return  # already picked up by another worker, or gone
+    export = ReportExport.objects.get(pk=export_id)
+
+    try:
+        headers, rows = report_rows(export.report_type, export.start_date, export.end_date, export.estate_ids)
+        with tempfile.TemporaryDirectory() as workdir:
+            path = f'{workdir}/{export_filename(export)}'
+            if export.format == 'csv':
+                with open(path, 'w', newline='', encoding='utf-8') as handle:
+                    row_count = write_csv(handle, headers, rows)
+            else:
+                row_count = write_xlsx(path, headers, rows, title=REPORT_FILENAMES[export.report_type])
+            with open(path, 'rb') as handle:
+                export.file.save(export_filename(export), File(handle), save=False)
+    except Exception as e:
+        logger.exception('Report export %s failed', export_id)
+        _mark_failed(ReportExport.objects.filter(pk=export_id), str(e))
+        return
+
+    completed_at = timezone.now()
+    export.status = ReportExport.STATUS_COMPLETED
+    export.row_count = row_count
+    export.file_size = export.file.size
+    export.completed_at = completed_at
+    export.expires_at = completed_at + timedelta(hours=settings.REPORT_EXPORT_TTL_HOURS)
+    export.save(update_fields=['status', 'file', 'row_count', 'file_size', 'completed_at', 'expires_at'])
+
+
+def enqueue_report_export(export):
+    """Hand an export to the worker pool; a broker outage fails the export instead of the request"""
+    from .tasks import generate_report_export
+
+    try:
+        generate_report_export.delay(str(export.pk))
+    except Exception as e:
+        logger.warning('Could not queue report export %s: %s', export.pk, e)
+        _mark_failed(
+            ReportExport.objects.filter(pk=export.pk, status=ReportExport.STATUS_PENDING),
+            'Export queue unavailable, please retry later'
+        )
+
+
+def _mark_failed(exports, error):
+    now = timezone.now()
+    exports.update(
+        status=ReportExport.STATUS_FAILED, error=error, completed_at=now,
+        expires_at=now + timedelta(hours=settings.REPORT_EXPORT_TTL_HOURS)
+    )
+
+
+def purge_expired_exports(now=None):
+    """
+    Delete expired export files and their records; returns how many were
+    removed. Exports that never got an expiry (a task lost before it ran,
+    or a run claimed without one) are removed once older than the TTL.
+    """
+    now = now or timezone.now()
+    expired = ReportExport.objects.filter(
+        Q(expires_at__lte=now)
+        | Q(expires_at__isnull=True, created_at__lte=now - timedelta(hours=settings.REPORT_EXPORT_TTL_HOURS))
+    )
+    removed = 0
+    for export in expired.iterator():
+        if export.file:
+            export.file.delete(save=False)
+        export.delete()
+        removed += 1
+    return removed
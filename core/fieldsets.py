@@ -0,0 +1,186 @@
+from django.db.models import Prefetch
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def parse_fieldset(values):
+    """
+    Turn ``['id,name', 'block.estate.name']`` into a nested tree
+    ``{'id': {}, 'name': {}, 'block': {'estate': {'name': {}}}}``.
+    Returns None when no values were given, meaning "no restriction".
+    """
+    if values is None:
+        return None
+    tree = {}
+    for value in values:
+        for path in value.split(','):
+            path = path.strip()
+            if not path:
+                continue
+            node = tree
+            for part in path.split('.'):
+                node = node.setdefault(part, {})
+    return tree
+
+
+def get_fieldset_params(request):
+    """(fields tree, expand tree) requested on a read request; None for absent params"""
+    if request is None or request.method not in SAFE_METHODS:
+        return None, None
+    params = request.query_params
+    fields = parse_fieldset(params.getlist(FIELDS_PARAM)) if FIELDS_PARAM in params else None
+    expand = parse_fieldset(params.getlist(EXPAND_PARAM)) if EXPAND_PARAM in params else None
+    return fields, expand
+
+
+def wants(fields, name):
+    return fields is None or name in fields
+
+
+def subtree(tree, name):
+    """Nested restriction for ``name``; None when the whole sub-object is wanted"""
+    if tree is None:
+        return None
+    return tree.get(name) or None
+
+
+def tree_paths(tree, prefix=''):
+    """Flatten a tree back into ORM paths: {'block': {'estate': {}}} -> ['block', 'block__estate']"""
+    paths = []
+    for name, children in tree.items():
+        path = f'{prefix}{name}'
+        paths.append(path)
+        paths.extend(tree_paths(children, prefix=f'{path}__'))
+    return paths
+
+
+def trim_fields(data, fields):
+    """Apply a fields tree to a plain dict built by hand in a view"""
+    if fields is None or not isinstance(data, dict):
+        return data
+    trimmed = {}
+    for name, children in fields.items():
+        if name not in data:
+            continue
+        value = data[name]
+        if children and isinstance(value, dict):
+            value = trim_fields(value, children)
+        elif children and isinstance(value, list):
+            value = [trim_fields(item, children) for item in value]
+        trimmed[name] = value
+    return trimmed
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    ``?fields=`` / ``?expand=`` support for model serializers.
+
+    ``fields`` keeps only the listed fields (dotted paths reach into expanded
+    objects). ``expand`` swaps a relation's primary key for the nested
+    serializer named in ``expandable_fields``; without the parameter the
+    serializer's ``default_expand`` is used, so existing payloads are unchanged.
+    ``optimize_queryset`` narrows select_related/prefetch_related/only() to
+    exactly what will be rendered.
+    """
+    # name -> (serializer class, extra kwargs)
+    expandable_fields = {}
+    default_expand = []
+    # SerializerMethodField name -> model relation it reads; expand paths under
+    # the method field (e.g. 'apartment_details.block') follow that relation
+    field_sources = {}
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        expand = kwargs.pop('expand', None)
+        super().__init__(*args, **kwargs)
+
+        if fields is None and expand is None:
+            fields, expand = get_fieldset_params(self.context.get('request'))
+        if expand is None:
+            expand = parse_fieldset(self.default_expand)
+        self._fieldset_fields = fields
+        self._fieldset_expand = expand
+
+        for name, children in expand.items():
+            if name in self.expandable_fields and name in self.fields:
+                serializer_class, options = self.expandable_fields[name]
+                self.fields[name] = serializer_class(
+                    fields=subtree(fields, name), expand=children, read_only=True, **options
+                )
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def resolve_fieldset(cls, fields, expand):
+        return fields, expand if expand is not None else parse_fieldset(cls.default_expand)
+
+    @classmethod
+    def optimize_queryset(cls, queryset, fields=None, expand=None):
+        """Load only the relations and columns the given fieldset renders"""
+        fields, expand = cls.resolve_fieldset(fields, expand)
+        select_related, prefetches, columns = cls._collect_relations(fields, expand, prefix='')
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        if columns is not None:
+            queryset = queryset.only(*columns)
+        return queryset
+
+    @classmethod
+    def _collect_relations(cls, fields, expand, prefix):
+        model = cls.Meta.model
+        select_related, prefetches = [], []
+        columns = None if fields is None else [f'{prefix}{model._meta.pk.name}']
+
+        for field in model._meta.get_fields():
+            name = field.name
+            if field.auto_created and not field.concrete:
+                continue  # reverse relations are never rendered by these serializers
+            if not wants(fields, name):
+                continue
+            if field.many_to_many:
+                if name in expand and name in cls.expandable_fields:
+                    prefetches.append(f'{prefix}{name}')
+                else:
+                    prefetches.append(Prefetch(f'{prefix}{name}', queryset=field.related_model.objects.only('pk')))
+                continue
+            if columns is not None:
+                columns.append(f'{prefix}{name}')
+            if field.is_relation and name in expand and name in cls.expandable_fields:
+                nested_class = cls.expandable_fields[name][0]
+                select_related.append(f'{prefix}{name}')
+                nested_select, nested_prefetch, nested_columns = nested_class._collect_relations(
+                    subtree(fields, name), expand[name], prefix=f'{prefix}{name}__'
+                )
+                select_related.extend(nested_select)
+                prefetches.extend(nested_prefetch)
+                if columns is not None and nested_columns is not None:
+                    columns.remove(f'{prefix}{name}')
+                    columns.extend(nested_columns)
+
+        for name, source in cls.field_sources.items():
+            if wants(fields, name):
+                select_related.append(f'{prefix}{source}')
+                select_related.extend(tree_paths(expand.get(name, {}), prefix=f'{prefix}{source}__'))
+                if columns is not None:
+                    columns.append(f'{prefix}{source}')
+        return select_related, prefetches, columns
+
+
+class SparseFieldsetViewMixin:
+    """Narrow the list/retrieve queryset to the requested ``fields``/``expand``"""
+    fieldset_actions = ('list', 'retrieve')
+
+    def filter_queryset(self, queryset):
+        # Hooked here rather than get_queryset so viewsets overriding that still get it
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        if self.action in self.fieldset_actions and hasattr(serializer_class, 'optimize_queryset'):
+            fields, expand = get_fieldset_params(self.request)
+            queryset = serializer_class.optimize_queryset(queryset, fields, expand)
+        return queryset
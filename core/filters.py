@@ -0,0 +1,68 @@
+from django.db.models import Count
+from rest_framework.exceptions import ValidationError
+from .models import Apartment
+
+
+class FeatureFilter:
+    """
+    Filter apartments by an M2M feature (amenities or furnishings).
+
+    Matching runs as a semi-join against the M2M through table
+    (``id IN (SELECT apartment_id ...)``) so apartment rows are never
+    duplicated and no DISTINCT is needed. ``all`` matching groups the through
+    rows per apartment and keeps those whose match count equals the number of
+    requested features (``HAVING COUNT(*) = n``); the (apartment, feature)
+    unique index on the through table means every row counts once.
+    """
+    MATCH_ANY = 'any'
+    MATCH_ALL = 'all'
+    MATCH_CHOICES = (MATCH_ANY, MATCH_ALL)
+
+    def __init__(self, field_name):
+        field = Apartment._meta.get_field(field_name)
+        self.field_name = field_name
+        self.through = field.remote_field.through
+        self.apartment_column = f'{field.m2m_field_name()}_id'
+        self.feature_column = f'{field.m2m_reverse_field_name()}_id'
+
+    def parse_ids(self, raw_ids):
+        """Accept repeated and comma-separated ids; reject anything non-numeric"""
+        feature_ids = set()
+        for raw in raw_ids:
+            for value in str(raw).split(','):
+                value = value.strip()
+                if not value:
+                    continue
+                try:
+                    feature_ids.add(int(value))
+                except ValueError:
+                    raise ValidationError({self.field_name: f'Invalid id: {value}'})
+        return sorted(feature_ids)
+
+    def parse_match(self, match):
+        match = (match or self.MATCH_ANY).lower()
+        if match not in self.MATCH_CHOICES:
+            raise ValidationError({
+                f'{self.field_name}_match': f'Must be one of: {", ".join(self.MATCH_CHOICES)}'
+            })
+        return match
+
+    def matching_apartment_ids(self, feature_ids, match=MATCH_ANY):
+        """Subquery of apartment ids having any/all of the given features"""
+        rows = self.through.objects.filter(**{f'{self.feature_column}__in': feature_ids})
+        if match == self.MATCH_ALL:
+            rows = rows.values(self.apartment_column).annotate(
+                matched=Count('*')
+            ).filter(matched=len(feature_ids))
+        return rows.values(self.apartment_column)
+
+    def apply(self, queryset, raw_ids, match=None):
+        feature_ids = self.parse_ids(raw_ids)
+        if not feature_ids:
+            return queryset
+        match = self.parse_match(match)
+        return queryset.filter(id__in=self.matching_apartment_ids(feature_ids, match))
+
+
+amenity_filter = FeatureFilter('amenities')
+furnishing_filter = FeatureFilter('furnishings')
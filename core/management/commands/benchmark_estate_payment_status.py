@@ -0,0 +1,113 @@
+import contextlib
+import io
+import time
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+from core.models import Estate, Block, Apartment
+from core.views import OwnerDashboardViewSet
+from payments.models import Payment, PaymentStatus
+from tenants.models import Tenant
+
+
+class UncachedOwnerDashboardViewSet(OwnerDashboardViewSet):
+    # Measure the queries themselves, not the response cache
+    estate_payment_status = OwnerDashboardViewSet.estate_payment_status.__wrapped__
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Time owner-dashboard estate-payment-status against growing numbers of estates and report '
+        'its query count. Synthetic estates are created in a transaction that is rolled back'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='5,50,500', help='Comma-separated estate counts to measure')
+        parser.add_argument('--apartments', type=int, default=4, help='Occupied apartments per synthetic estate')
+        parser.add_argument('--iterations', type=int, default=5, help='Requests per size; the best time is reported')
+        parser.add_argument('--username', help='User to request as (defaults to the first superuser)')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = sorted(int(size) for size in options['sizes'].split(','))
+        except ValueError:
+            raise CommandError('--sizes must be a comma-separated list of integers')
+        user = self.get_user(options['username'])
+
+        try:
+            with transaction.atomic():
+                created = 0
+                for size in sizes:
+                    created += self.seed(created, size - created, options['apartments'])
+                    estates, queries, seconds = self.measure(user, options['iterations'])
+                    self.stdout.write(
+                        f'  {size:>5} synthetic estates ({estates} in response): '
+                        f'{queries} queries, {seconds * 1000:8.1f} ms'
+                    )
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS('Estate payment status benchmark complete (synthetic data rolled back)'))
+
+    def get_user(self, username):
+        users = User.objects.filter(username=username) if username else User.objects.filter(is_superuser=True)
+        user = users.first()
+        if user is None:
+            raise CommandError('No user to request as; pass --username or create a superuser')
+        return user
+
+    def seed(self, offset, count, apartments_per_estate):
+        """Add ``count`` estates, each with occupied apartments and this month's payments"""
+        if count <= 0:
+            return 0
+        paid, _ = PaymentStatus.objects.get_or_create(name='PAID')
+        pending, _ = PaymentStatus.objects.get_or_create(name='PENDING')
+        today = timezone.now().date()
+
+        estates = Estate.objects.bulk_create(
+            Estate(name=f'Benchmark estate {offset + i}', address='-') for i in range(count)
+        )
+        blocks = Block.objects.bulk_create(Block(estate=estate, name='A') for estate in estates)
+        apartments = Apartment.objects.bulk_create(
+            Apartment(block=block, number=str(n), rent_amount=Decimal('1000.00'), is_occupied=True)
+            for block in blocks for n in range(apartments_per_estate)
+        )
+        users = User.objects.bulk_create(
+            User(username=f'benchmark-{offset}-{i}') for i in range(len(apartments))
+        )
+        tenants = Tenant.objects.bulk_create(
+            Tenant(user=user, apartment=apartment) for user, apartment in zip(users, apartments)
+        )
+        Payment.objects.bulk_create(
+            Payment(
+                tenant=tenant, amount=Decimal('1000.00'), status=paid if i % 2 else pending,
+                due_date=today, payment_for_month=today.month, payment_for_year=today.year
+            )
+            for i, tenant in enumerate(tenants)
+        )
+        return count
+
+    def measure(self, user, iterations):
+        """(estates in the response, queries per request, best seconds per request)"""
+        view = UncachedOwnerDashboardViewSet.as_view({'get': 'estate_payment_status'})
+        best = None
+        for _ in range(iterations):
+            request = APIRequestFactory().get('/')
+            force_authenticate(request, user=user)
+            with CaptureQueriesContext(connection) as queries, contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                response = view(request)
+                elapsed = time.perf_counter() - start
+            if response.status_code != 200:
+                raise CommandError(f'estate_payment_status returned {response.status_code}: {response.data}')
+            best = elapsed if best is None else min(best, elapsed)
+        return len(response.data), len(queries), best
@@ -0,0 +1,102 @@
+import time
+import tracemalloc
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from core.models import Estate, Block, Apartment
+from payments.invoices import generate_monthly_invoices, month_bounds
+from tenants.models import Tenant
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Time monthly invoice generation over a synthetic portfolio, then time the idempotent '
+        're-run. Synthetic tenants are created in a transaction that is rolled back'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenants', type=int, default=100000, help='Synthetic tenants with active leases')
+        parser.add_argument('--estates', type=int, default=100, help='Estates to spread them over')
+        parser.add_argument('--chunk-size', type=int, help='Tenants per transaction (defaults to INVOICE_CHUNK_SIZE)')
+        parser.add_argument('--month', default='2099-01', help='Month to invoice (YYYY-MM)')
+        parser.add_argument('--memory', action='store_true', help='Also report peak Python memory (tracing slows the runs several times)')
+
+    def handle(self, *args, **options):
+        try:
+            year, month = (int(part) for part in options['month'].split('-'))
+            month_bounds(year, month)
+        except ValueError:
+            raise CommandError('--month must be in YYYY-MM format')
+        if options['tenants'] <= 0 or options['estates'] <= 0:
+            raise CommandError('--tenants and --estates must be positive')
+
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                self.seed(options['tenants'], options['estates'], year, month)
+                self.stdout.write(f"Seeded {options['tenants']} tenants in {time.perf_counter() - start:.1f} s")
+                for label in ('first run', 're-run'):
+                    report, queries, seconds, peak = self.measure(year, month, options['chunk_size'], options['memory'])
+                    memory = f', peak {peak / 1024 / 1024:.1f} MB' if options['memory'] else ''
+                    self.stdout.write(
+                        f"  {label:>9}: {report['created']:>7} created, {report['existing']:>7} existing, "
+                        f"{queries} queries, {seconds:6.2f} s{memory}"
+                    )
+                raise Rollback
+        except Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS('Invoice generation benchmark complete (synthetic data rolled back)'))
+
+    def seed(self, tenant_count, estate_count, year, month):
+        """Tenants in their own apartments, all with leases spanning the month"""
+        lease_start = date(year - 1, month, 1)
+        lease_end = date(year + 1, month, 1)
+        estates = Estate.objects.bulk_create(
+            Estate(name=f'Benchmark estate {i}', address='-') for i in range(estate_count)
+        )
+        blocks = Block.objects.bulk_create(Block(estate=estate, name='A') for estate in estates)
+        apartments = Apartment.objects.bulk_create(
+            (
+                Apartment(block=blocks[n % estate_count], number=str(n), rent_amount=Decimal('1000.00') + n % 50)
+                for n in range(tenant_count)
+            ),
+            batch_size=5000
+        )
+        users = User.objects.bulk_create(
+            (User(username=f'invoice-benchmark-{n}') for n in range(tenant_count)), batch_size=5000
+        )
+        Tenant.objects.bulk_create(
+            (
+                Tenant(user=user, apartment=apartment, lease_start=lease_start, lease_end=lease_end)
+                for user, apartment in zip(users, apartments)
+            ),
+            batch_size=5000
+        )
+
+    def measure(self, year, month, chunk_size, trace_memory):
+        """(report, queries, seconds, peak traced bytes or None) for one generation run"""
+        queries = 0
+
+        def count(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        if trace_memory:
+            tracemalloc.start()
+        with connection.execute_wrapper(count):
+            start = time.perf_counter()
+            report = generate_monthly_invoices(year, month, chunk_size=chunk_size)
+            elapsed = time.perf_counter() - start
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return report, queries, elapsed, peak
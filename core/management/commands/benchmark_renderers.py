@@ -0,0 +1,84 @@
+import contextlib
+import io
+import time
+import tracemalloc
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+from core.renderers import FastJSONRenderer
+from core.views import ApartmentViewSet, OwnerDashboardViewSet
+
+
+class Command(BaseCommand):
+    help = 'Compare render time and allocations of the stock JSONRenderer and FastJSONRenderer on real payloads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help='Renders per payload and renderer')
+        parser.add_argument('--days', type=int, default=365, help='Date range for the report payloads')
+        parser.add_argument('--username', help='User to build the payloads as (defaults to the first superuser)')
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['username'])
+        end_date = timezone.now().date()
+        start_date = end_date - timedelta(days=options['days'])
+        report_params = {'start_date': start_date.isoformat(), 'end_date': end_date.isoformat()}
+
+        payloads = [
+            ('available', ApartmentViewSet, 'available', {}),
+            ('payment-report', OwnerDashboardViewSet, 'payment_report', report_params),
+            ('occupancy-report', OwnerDashboardViewSet, 'occupancy_report', report_params),
+        ]
+        renderers = [('JSONRenderer', JSONRenderer()), ('FastJSONRenderer', FastJSONRenderer())]
+
+        for name, viewset, action_name, params in payloads:
+            data = self.build_payload(user, viewset, action_name, params)
+            outputs = {label: renderer.render(data) for label, renderer in renderers}
+            identical = len(set(outputs.values())) == 1
+
+            self.stdout.write(f"\n{name} ({len(outputs['JSONRenderer'])} bytes, identical output: {identical})")
+            baseline = None
+            for label, renderer in renderers:
+                per_render, peak = self.measure(renderer, data, options['iterations'])
+                baseline = baseline or per_render
+                self.stdout.write(
+                    f"  {label:<18} {per_render * 1e6:10.1f} us/render  "
+                    f"peak allocations {peak / 1024:8.1f} KiB  x{baseline / per_render:.2f}"
+                )
+            if not identical:
+                self.stdout.write(self.style.WARNING('  Rendered bytes differ between renderers'))
+
+        self.stdout.write(self.style.SUCCESS('\nRenderer benchmark complete'))
+
+    def get_user(self, username):
+        users = User.objects.filter(username=username) if username else User.objects.filter(is_superuser=True)
+        user = users.first()
+        if user is None:
+            raise CommandError('No user to build payloads with; pass --username or create a superuser')
+        return user
+
+    def build_payload(self, user, viewset, action_name, params):
+        """Run the view once and return its unrendered response data"""
+        request = APIRequestFactory().get('/', params)
+        force_authenticate(request, user=user)
+        with contextlib.redirect_stdout(io.StringIO()):  # the views print debug output
+            response = viewset.as_view({'get': action_name})(request)
+        if response.status_code != 200:
+            raise CommandError(f'{action_name} returned {response.status_code}: {response.data}')
+        return response.data
+
+    def measure(self, renderer, data, iterations):
+        """Seconds per render, and peak traced allocations during one render"""
+        start = time.perf_counter()
+        for _ in range(iterations):
+            renderer.render(data)
+        per_render = (time.perf_counter() - start) / iterations
+
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        renderer.render(data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return per_render, peak - before
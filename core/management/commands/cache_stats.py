@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from core.cache import get_cache_stats, reset_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss metrics for the API response cache (meaningful with a shared cache such as Redis)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Reset the counters after printing them')
+
+    def handle(self, *args, **options):
+        stats = get_cache_stats()
+        for namespace, counters in stats.items():
+            self.stdout.write(
+                f"{namespace}: {counters['hits']} hits, {counters['misses']} misses "
+                f"({counters['hit_rate']}% hit rate)"
+            )
+        if options['reset']:
+            reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS('Cache counters reset'))
@@ -0,0 +1,33 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from payments.invoices import generate_monthly_invoices
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the pending rent payment for every active lease in a month. Tenants that '
+        'already have a payment for the month are skipped, so the command can be re-run safely'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', help='Month to invoice (YYYY-MM); defaults to the current month')
+        parser.add_argument('--estate', type=int, action='append', dest='estates', help='Only invoice this estate id (repeatable)')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be created without saving')
+
+    def handle(self, *args, **options):
+        if options['month']:
+            try:
+                month = datetime.strptime(options['month'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('--month must be in YYYY-MM format')
+        else:
+            month = timezone.localdate()
+
+        self.stdout.write(f'Generating invoices for {month:%Y-%m}...')
+        report = generate_monthly_invoices(month.year, month.month, estate_ids=options['estates'], dry_run=options['dry_run'])
+        self.stdout.write(f"  active leases: {report['active_leases']}")
+        self.stdout.write(f"  already invoiced: {report['existing']}")
+        self.stdout.write(f"  without rent amount: {report['no_rent']}")
+        verb = 'would be created' if options['dry_run'] else 'created'
+        self.stdout.write(self.style.SUCCESS(f"{report['created']} invoices {verb}"))
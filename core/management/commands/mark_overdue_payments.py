@@ -0,0 +1,24 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from payments.overdue import mark_overdue_payments
+
+
+class Command(BaseCommand):
+    help = (
+        'Move pending payments that are past their due date and unpaid to the Overdue status. '
+        'Celery beat runs this hourly; run it by hand after restoring data or changing due dates'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Treat this date (YYYY-MM-DD) as today; defaults to the local date')
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError('--date must be a date in YYYY-MM-DD format')
+
+        moved = mark_overdue_payments(today)
+        self.stdout.write(self.style.SUCCESS(f'{moved} payments marked overdue'))
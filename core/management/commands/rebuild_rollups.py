@@ -0,0 +1,36 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from core.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the daily payment, complaint and occupancy rollups from the raw tables. '
+        'Run after bulk edits that bypass model signals (queryset.update, raw SQL) or after '
+        'moving blocks/apartments between estates'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First date to rebuild (YYYY-MM-DD); defaults to the beginning of history')
+        parser.add_argument('--end', help='Last date to rebuild (YYYY-MM-DD); defaults to the latest row')
+
+    def handle(self, *args, **options):
+        start = self.parse_date(options['start'], '--start')
+        end = self.parse_date(options['end'], '--end')
+        if start and end and start > end:
+            raise CommandError('--start must be on or before --end')
+
+        span = f"{start or 'beginning'} to {end or 'latest'}"
+        self.stdout.write(f'Rebuilding rollups from {span}...')
+        counts = rebuild_rollups(start, end)
+        for name, count in counts.items():
+            self.stdout.write(f'  {name}: {count} rows')
+        self.stdout.write(self.style.SUCCESS('Rollups rebuilt'))
+
+    def parse_date(self, value, option):
+        if value is None:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f'{option} must be a date in YYYY-MM-DD format')
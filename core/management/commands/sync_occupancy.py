@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from core.models import Apartment
+from tenants.models import Tenant
+
+
+class Command(BaseCommand):
+    help = 'Backfill and verify the denormalized Apartment.is_occupied flag against tenant assignments'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report apartments whose flag disagrees with tenant assignments; exit non-zero if any do',
+        )
+
+    def handle(self, *args, **options):
+        mismatched = self.find_mismatches()
+
+        if options['check']:
+            if mismatched:
+                for apartment_id, is_occupied in mismatched[:50]:
+                    self.stdout.write(f"Apartment {apartment_id}: is_occupied={is_occupied}, has tenant={not is_occupied}")
+                raise CommandError(f'{len(mismatched)} apartments have a stale is_occupied flag')
+            self.stdout.write(self.style.SUCCESS('All apartment occupancy flags match tenant assignments'))
+            return
+
+        self.stdout.write('Backfilling apartment occupancy flags...')
+        with transaction.atomic():
+            updated = Apartment.sync_occupancy()
+        self.stdout.write(f'Recomputed {updated} apartments ({len(mismatched)} were stale)')
+
+        remaining = self.find_mismatches()
+        if remaining:
+            raise CommandError(f'{len(remaining)} apartments still disagree after backfill')
+        self.stdout.write(self.style.SUCCESS('Apartment occupancy flags verified'))
+
+    def find_mismatches(self):
+        """Return (apartment_id, is_occupied) for every apartment whose flag is wrong"""
+        has_tenant = Exists(Tenant.objects.filter(apartment_id=OuterRef('pk')))
+        return list(
+            Apartment.objects.annotate(has_tenant=has_tenant)
+            .exclude(is_occupied=has_tenant)
+            .values_list('id', 'is_occupied')
+        )
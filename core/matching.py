@@ -0,0 +1,216 @@
+import numpy as np
+from rest_framework.exceptions import ValidationError
+from .models import Apartment
+
+STRATEGY_GREEDY = 'greedy'
+STRATEGY_OPTIMAL = 'optimal'
+STRATEGIES = (STRATEGY_GREEDY, STRATEGY_OPTIMAL)
+
+MAX_APPLICANTS = 1000
+
+# Fit bonuses added on top of the apartment's allocation_score
+RENT_HEADROOM_POINTS = 20  # full bonus for rent at 0% of the applicant's max_rent
+EXTRA_ROOM_PENALTY = 5  # per room above what the applicant asked for
+
+
+def parse_applicants(raw_applicants):
+    """Validate the applicant list; return dicts of float bounds and amenity id lists"""
+    if not isinstance(raw_applicants, list) or not raw_applicants:
+        raise ValidationError({'applicants': 'Provide a non-empty list of applicant requirements'})
+    if len(raw_applicants) > MAX_APPLICANTS:
+        raise ValidationError({'applicants': f'At most {MAX_APPLICANTS} applicants per request'})
+
+    applicants = []
+    for index, raw in enumerate(raw_applicants):
+        if not isinstance(raw, dict):
+            raise ValidationError({'applicants': f'Entry {index} must be an object'})
+        applicant = {'applicant_id': raw.get('applicant_id', index)}
+        for bound in ('min_rooms', 'max_rooms', 'min_rent', 'max_rent', 'min_size', 'max_size'):
+            value = raw.get(bound)
+            try:
+                applicant[bound] = float(value) if value not in (None, '') else None
+            except (TypeError, ValueError):
+                raise ValidationError({'applicants': f'Entry {index}: invalid {bound} {value!r}'})
+        amenities = raw.get('amenities') or []
+        try:
+            applicant['amenities'] = sorted({int(amenity_id) for amenity_id in amenities})
+        except (TypeError, ValueError):
+            raise ValidationError({'applicants': f'Entry {index}: amenities must be a list of ids'})
+        applicants.append(applicant)
+    return applicants
+
+
+def load_vacant_stock(queryset):
+    """
+    Load the candidate apartments as column arrays in two queries: the
+    apartment rows (with their allocation_score annotation) and their
+    amenity links. Missing numbers become NaN, which fails every bound.
+    """
+    rows = list(queryset.values(
+        'id', 'number', 'block_id', 'block__name', 'block__estate_id', 'block__estate__name',
+        'rent_amount', 'number_of_rooms', 'size', 'allocation_score'
+    ))
+
+    def column(name):
+        return np.array([float(row[name]) if row[name] is not None else np.nan for row in rows], dtype=float)
+
+    amenity_links = Apartment.amenities.through.objects.filter(
+        apartment_id__in=queryset.values('id')
+    ).values_list('apartment_id', 'amenity_id')
+    amenities_by_apartment = {}
+    for apartment_id, amenity_id in amenity_links:
+        amenities_by_apartment.setdefault(apartment_id, set()).add(amenity_id)
+
+    return {
+        'rows': rows,
+        'rooms': column('number_of_rooms'),
+        'rent': column('rent_amount'),
+        'size': column('size'),
+        'allocation_score': column('allocation_score'),
+        'amenities': [amenities_by_apartment.get(row['id'], set()) for row in rows],
+    }
+
+
+def _bound(applicants, name, default):
+    return np.array([[a[name] if a[name] is not None else default] for a in applicants], dtype=float)
+
+
+def _within(values, lower, upper):
+    """(applicants x apartments) mask; an unbounded side accepts NaN values"""
+    values = values[np.newaxis, :]
+    with np.errstate(invalid='ignore'):
+        above = np.isneginf(lower) | (values >= lower)
+        below = np.isposinf(upper) | (values <= upper)
+    return above & below
+
+
+def build_score_matrix(applicants, stock):
+    """
+    Score every applicant against every apartment at once.
+
+    Returns (scores, feasible): float and bool matrices of shape
+    (applicants, apartments). Scores are only meaningful where feasible.
+    """
+    feasible = (
+        _within(stock['rooms'], _bound(applicants, 'min_rooms', -np.inf), _bound(applicants, 'max_rooms', np.inf))
+        & _within(stock['rent'], _bound(applicants, 'min_rent', -np.inf), _bound(applicants, 'max_rent', np.inf))
+        & _within(stock['size'], _bound(applicants, 'min_size', -np.inf), _bound(applicants, 'max_size', np.inf))
+    )
+
+    # Required amenities: count what each apartment is missing with one matrix product
+    amenity_ids = sorted({amenity_id for a in applicants for amenity_id in a['amenities']})
+    if amenity_ids:
+        position = {amenity_id: k for k, amenity_id in enumerate(amenity_ids)}
+        required = np.zeros((len(applicants), len(amenity_ids)), dtype=np.int32)
+        for i, applicant in enumerate(applicants):
+            required[i, [position[a] for a in applicant['amenities']]] = 1
+        lacking = np.ones((len(stock['rows']), len(amenity_ids)), dtype=np.int32)
+        for j, apartment_amenities in enumerate(stock['amenities']):
+            for amenity_id in apartment_amenities & position.keys():
+                lacking[j, position[amenity_id]] = 0
+        feasible &= (required @ lacking.T) == 0
+
+    scores = np.broadcast_to(np.nan_to_num(stock['allocation_score']), feasible.shape).copy()
+
+    # Cheaper rent within the applicant's budget scores higher
+    max_rent = _bound(applicants, 'max_rent', np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        headroom = np.clip((max_rent - stock['rent']) / max_rent, 0, 1)
+    scores += np.nan_to_num(headroom) * RENT_HEADROOM_POINTS
+
+    # Don't spend large apartments on applicants who asked for fewer rooms
+    min_rooms = _bound(applicants, 'min_rooms', np.nan)
+    extra_rooms = np.clip(stock['rooms'] - min_rooms, 0, None)
+    scores -= np.nan_to_num(extra_rooms) * EXTRA_ROOM_PENALTY
+
+    return scores, feasible
+
+
+def assign_greedy(scores, feasible):
+    """Take the best remaining (applicant, apartment) pair until nothing feasible is left"""
+    candidate_rows, candidate_cols = np.nonzero(feasible)
+    order = np.argsort(-scores[candidate_rows, candidate_cols], kind='stable')
+    taken_rows, taken_cols, pairs = set(), set(), []
+    limit = min(feasible.shape)
+    for k in order:
+        i, j = int(candidate_rows[k]), int(candidate_cols[k])
+        if i in taken_rows or j in taken_cols:
+            continue
+        taken_rows.add(i)
+        taken_cols.add(j)
+        pairs.append((i, j))
+        if len(pairs) == limit:
+            break
+    return pairs
+
+
+def _min_cost_assignment(cost):
+    """
+    Hungarian algorithm (shortest augmenting paths) for an n x m cost matrix
+    with n <= m; every row gets a distinct column. The scan over columns is
+    vectorized, so each augmenting step costs a handful of array operations.
+    """
+    n, m = cost.shape
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=int)  # p[j]: row (1-based) assigned to column j
+    way = np.zeros(m + 1, dtype=int)
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            free = ~used
+            free[0] = False
+            reduced = np.full(m + 1, np.inf)
+            reduced[1:] = cost[i0 - 1] - u[i0] - v[1:]
+            improved = free & (reduced < minv)
+            minv[improved] = reduced[improved]
+            way[improved] = j0
+            j1 = int(np.argmin(np.where(free, minv, np.inf)))
+            delta = minv[j1]
+            u[p[used]] += delta
+            v[used] -= delta
+            minv[free] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+    return [(int(p[j]) - 1, j - 1) for j in range(1, m + 1) if p[j]]
+
+
+def assign_optimal(scores, feasible):
+    """
+    Maximize the number of placed applicants, then their total score.
+
+    Scores are shifted to start at 0 (which leaves the ranking of equally
+    sized matchings unchanged), then each feasible pair's cost is lowered by
+    more than any total score difference, so a larger matching always wins;
+    infeasible pairs cost 0 and are dropped afterwards.
+    """
+    if not feasible.any():
+        return []
+    # Only columns some applicant can take; only rows with at least one option
+    rows = np.flatnonzero(feasible.any(axis=1))
+    cols = np.flatnonzero(feasible.any(axis=0))
+    sub_scores = scores[np.ix_(rows, cols)]
+    sub_feasible = feasible[np.ix_(rows, cols)]
+
+    # Scores can be negative (extra-room penalty), and a negative feasible
+    # cost would otherwise lose to leaving the pair out
+    shifted = sub_scores - sub_scores[sub_feasible].min()
+    spread = float(shifted[sub_feasible].max())
+    bonus = spread * min(sub_feasible.shape) + 1
+    cost = np.where(sub_feasible, -(shifted + bonus), 0.0)
+
+    transposed = cost.shape[0] > cost.shape[1]
+    pairs = _min_cost_assignment(cost.T if transposed else cost)
+    if transposed:
+        pairs = [(i, j) for j, i in pairs]
+    return [(int(rows[i]), int(cols[j])) for i, j in pairs if sub_feasible[i, j]]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:41
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def backfill_is_occupied(apps, schema_editor):
+    Apartment = apps.get_model("core", "Apartment")
+    Tenant = apps.get_model("tenants", "Tenant")
+    Apartment.objects.update(
+        is_occupied=Exists(Tenant.objects.filter(apartment_id=OuterRef("pk")))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_userprofile"),
+        ("tenants", "0002_tenant_emergency_contact_tenant_phone_number_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="apartment",
+            name="is_occupied",
+            field=models.BooleanField(
+                db_index=True,
+                default=False,
+                editable=False,
+                help_text="Denormalized from tenants; kept in sync by Apartment.sync_occupancy",
+            ),
+        ),
+        migrations.RunPython(backfill_is_occupied, migrations.RunPython.noop),
+    ]
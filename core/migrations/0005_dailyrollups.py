@@ -0,0 +1,173 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_rollups(apps, schema_editor):
+    from core.rollups import rebuild_rollups
+
+    rebuild_rollups(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("complaints", "0002_complaintcategory_complaint_attachment_and_more"),
+        ("core", "0004_apartment_is_occupied"),
+        ("payments", "0004_payment_payment_type"),
+        ("tenants", "0002_tenant_emergency_contact_tenant_phone_number_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ComplaintDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "date",
+                    models.DateField(
+                        help_text="Local date the complaints were created"
+                    ),
+                ),
+                ("complaint_count", models.IntegerField(default=0)),
+                (
+                    "category",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="complaints.complaintcategory",
+                    ),
+                ),
+                (
+                    "estate",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="core.estate",
+                    ),
+                ),
+                (
+                    "status",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="complaints.complaintstatus",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["date", "estate"], name="core_compla_date_dec7bf_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="OccupancyDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "move_ins",
+                    models.IntegerField(
+                        default=0, help_text="Leases starting on this date"
+                    ),
+                ),
+                (
+                    "move_outs",
+                    models.IntegerField(
+                        default=0, help_text="Leases ending on this date"
+                    ),
+                ),
+                (
+                    "occupancy_change",
+                    models.IntegerField(
+                        default=0,
+                        help_text="Active leases on this date minus the day before; occupancy is the running sum",
+                    ),
+                ),
+                (
+                    "estate",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="core.estate",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["date", "estate"], name="core_occupa_date_32401f_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="PaymentDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "date",
+                    models.DateField(help_text="Local date the payments were created"),
+                ),
+                ("payment_method", models.CharField(max_length=100, null=True)),
+                ("due_date", models.DateField()),
+                ("payment_count", models.IntegerField(default=0)),
+                (
+                    "total_amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "estate",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="core.estate",
+                    ),
+                ),
+                (
+                    "status",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to="payments.paymentstatus",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["date", "estate"], name="core_paymen_date_79ddd9_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
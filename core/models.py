@@ -1,4 +1,7 @@
+import uuid
+from django.apps import apps
 from django.db import models
+from django.db.models import Exists, OuterRef
 
 class Estate(models.Model):
     name = models.CharField(max_length=100)
@@ -29,11 +32,24 @@ class Apartment(models.Model):
     description = models.TextField(blank=True, null=True)
     amenities = models.ManyToManyField('Amenity', blank=True)
     furnishings = models.ManyToManyField('Furnishing', blank=True)
+    is_occupied = models.BooleanField(default=False, db_index=True, editable=False, help_text="Denormalized from tenants; kept in sync by Apartment.sync_occupancy")
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.block.estate.name} - {self.block.name} - {self.number}"
 
+    @classmethod
+    def sync_occupancy(cls, apartment_ids=None):
+        """Recompute is_occupied from tenant assignments; all apartments when no ids are given"""
+        Tenant = apps.get_model('tenants', 'Tenant')
+        queryset = cls.objects.all()
+        if apartment_ids is not None:
+            apartment_ids = [apartment_id for apartment_id in apartment_ids if apartment_id]
+            if not apartment_ids:
+                return 0
+            queryset = queryset.filter(id__in=apartment_ids)
+        return queryset.update(is_occupied=Exists(Tenant.objects.filter(apartment_id=OuterRef('pk'))))
+
 class Amenity(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True, null=True)
@@ -59,4 +75,94 @@ class UserProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Profile of {self.user.username}"
\ No newline at end of file
+        return f"Profile of {self.user.username}"
+
+# Analytics rollups, maintained by core.rollups from model signals. Rows are
+# additive: readers always SUM over them, so a duplicate row for the same key
+# (e.g. two concurrent first writes) never changes a result.
+
+class PaymentDailyRollup(models.Model):
+    date = models.DateField(help_text="Local date the payments were created")
+    estate = models.ForeignKey(Estate, on_delete=models.SET_NULL, null=True)
+    status = models.ForeignKey('payments.PaymentStatus', on_delete=models.SET_NULL, null=True)
+    payment_method = models.CharField(max_length=100, null=True)
+    due_date = models.DateField()
+    payment_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=['date', 'estate'])]
+
+    def __str__(self):
+        return f"Payments {self.date} - estate {self.estate_id}: {self.payment_count}"
+
+class ComplaintDailyRollup(models.Model):
+    date = models.DateField(help_text="Local date the complaints were created")
+    estate = models.ForeignKey(Estate, on_delete=models.SET_NULL, null=True)
+    status = models.ForeignKey('complaints.ComplaintStatus', on_delete=models.SET_NULL, null=True)
+    category = models.ForeignKey('complaints.ComplaintCategory', on_delete=models.SET_NULL, null=True)
+    complaint_count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [models.Index(fields=['date', 'estate'])]
+
+    def __str__(self):
+        return f"Complaints {self.date} - estate {self.estate_id}: {self.complaint_count}"
+
+class OccupancyDailyRollup(models.Model):
+    date = models.DateField()
+    estate = models.ForeignKey(Estate, on_delete=models.SET_NULL, null=True)
+    move_ins = models.IntegerField(default=0, help_text="Leases starting on this date")
+    move_outs = models.IntegerField(default=0, help_text="Leases ending on this date")
+    occupancy_change = models.IntegerField(default=0, help_text="Active leases on this date minus the day before; occupancy is the running sum")
+
+    class Meta:
+        indexes = [models.Index(fields=['date', 'estate'])]
+
+    def __str__(self):
+        return f"Occupancy {self.date} - estate {self.estate_id}: {self.occupancy_change:+d}"
+
+def report_export_storage():
+    from django.conf import settings
+    from django.core.files.storage import FileSystemStorage
+    return FileSystemStorage(location=settings.REPORT_EXPORT_ROOT)
+
+class ReportExport(models.Model):
+    """A report file generated in the background by core.exports"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    REPORT_TYPE_CHOICES = [
+        ('payments', 'Payments'),
+        ('occupancy', 'Occupancy'),
+        ('complaints', 'Complaints'),
+        ('tenancy', 'Tenancy'),
+    ]
+    FORMAT_CHOICES = [('csv', 'CSV'), ('xlsx', 'Excel (XLSX)')]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    requested_by = models.ForeignKey('auth.User', on_delete=models.CASCADE, related_name='report_exports')
+    report_type = models.CharField(max_length=20, choices=REPORT_TYPE_CHOICES)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    estate_ids = models.JSONField(null=True, blank=True, help_text="Owner estate scope at request time; null means all estates")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    file = models.FileField(storage=report_export_storage, upload_to='reports/%Y/%m/', blank=True, null=True)
+    row_count = models.IntegerField(default=0)
+    file_size = models.BigIntegerField(default=0)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.report_type} export ({self.format}) - {self.status}"
@@ -0,0 +1,84 @@
+import base64
+import binascii
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+class AllocationCursorPagination:
+    """
+    Keyset pagination for the available-apartments search.
+
+    Pages are ordered by (allocation_score DESC, id ASC) and the cursor holds the
+    last (allocation_score, id) pair served, so the next page is a plain
+    ``WHERE ... LIMIT`` instead of an OFFSET. Apartments that get a tenant while a
+    client is paging simply drop out without shifting the remaining pages.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 20
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def encode_cursor(self, score, pk):
+        return base64.urlsafe_b64encode(f'{score}:{pk}'.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            score, pk = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii').split(':')
+            return int(score), int(pk)
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request):
+        """Return one page from a queryset annotated with allocation_score"""
+        self.request = request
+        self.page_size_used = self.get_page_size(request)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            score, pk = position
+            queryset = queryset.filter(
+                Q(allocation_score__lt=score) | Q(allocation_score=score, id__gt=pk)
+            )
+
+        # Fetch one extra row to know whether there is a next page
+        page = list(queryset.order_by('-allocation_score', 'id')[:self.page_size_used + 1])
+        self.has_next = len(page) > self.page_size_used
+        page = page[:self.page_size_used]
+
+        self.next_cursor = None
+        if self.has_next and page:
+            last = page[-1]
+            self.next_cursor = self.encode_cursor(last.allocation_score, last.id)
+        return page
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_first_link(self):
+        url = self.request.build_absolute_uri()
+        return remove_query_param(url, self.cursor_query_param)
+
+    def get_pagination_data(self):
+        return {
+            'next': self.get_next_link(),
+            'first': self.get_first_link(),
+            'next_cursor': self.next_cursor,
+            'page_size': self.page_size_used,
+        }
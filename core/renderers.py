@@ -0,0 +1,41 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stock renderer
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer that serializes with orjson when it is installed.
+
+    Output matches the stock renderer's compact, non-ASCII-escaping form.
+    Types orjson doesn't know natively (Decimal, timedelta, lazy strings,
+    querysets...) go through DRF's own encoder, so a bare Decimal in a
+    view's dict still renders as a number and serializer DecimalFields
+    still render as strings. Indented output (browsable API, ``; indent=``),
+    non-compact settings and anything orjson refuses fall back to the stock
+    implementation.
+    """
+    ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if (orjson is None or not self.compact or self.ensure_ascii
+                or self.get_indent(accepted_media_type, renderer_context)):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.ORJSON_OPTIONS)
+        except (orjson.JSONEncodeError, TypeError, ValueError):
+            # e.g. integers beyond 64 bits - let the stdlib encoder decide
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same escaping the stock renderer applies, for JavaScript consumers
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
@@ -0,0 +1,259 @@
+"""
+Daily analytics rollups for the owner dashboards.
+
+``PaymentDailyRollup``, ``ComplaintDailyRollup`` and ``OccupancyDailyRollup``
+are kept up to date incrementally by the signal handlers in core/signals.py:
+every save/delete subtracts the row's previous contribution and adds the new
+one. ``rebuild_rollups`` recomputes any date range from the raw tables; run
+it (``manage.py rebuild_rollups``) after bulk edits that bypass signals or
+after moving blocks/apartments between estates.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .cache import bump_model_version_on_commit
+
+ROLLUP_LABELS = ('core.paymentdailyrollup', 'core.complaintdailyrollup', 'core.occupancydailyrollup')
+
+PAYMENT_STATE_FIELDS = ('tenant_id', 'created_at', 'status_id', 'payment_method', 'due_date', 'amount')
+COMPLAINT_STATE_FIELDS = ('tenant_id', 'created_at', 'status_id', 'category_id')
+TENANT_STATE_FIELDS = ('apartment_id', 'lease_start', 'lease_end')
+
+
+def _adjust(model, key, **deltas):
+    """Add ``deltas`` to the rollup row for ``key``, creating it on first use"""
+    updated = model.objects.filter(**key).update(**{field: F(field) + delta for field, delta in deltas.items()})
+    if not updated:
+        model.objects.create(**key, **deltas)
+
+
+def snapshot(instance, fields):
+    """The instance's current values for ``fields``, or None if any are deferred"""
+    if all(field in instance.__dict__ for field in fields):
+        return {field: getattr(instance, field) for field in fields}
+    return None
+
+
+def stored_state(instance, fields):
+    """Snapshot the instance, reading deferred values from its stored row"""
+    state = snapshot(instance, fields)
+    if state is None and instance.pk is not None:
+        state = type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+    return state
+
+
+def estate_for_tenant(tenant_id):
+    Tenant = global_apps.get_model('tenants', 'Tenant')
+    return Tenant.objects.filter(pk=tenant_id).values_list('apartment__block__estate_id', flat=True).first()
+
+
+def estate_for_apartment(apartment_id):
+    if apartment_id is None:
+        return None
+    Apartment = global_apps.get_model('core', 'Apartment')
+    return Apartment.objects.filter(pk=apartment_id).values_list('block__estate_id', flat=True).first()
+
+
+# Incremental maintenance
+
+def apply_payment(state, sign, estate_id=None):
+    PaymentDailyRollup = global_apps.get_model('core', 'PaymentDailyRollup')
+    _adjust(PaymentDailyRollup, {
+        'date': timezone.localdate(state['created_at']),
+        'estate_id': estate_id if estate_id is not None else estate_for_tenant(state['tenant_id']),
+        'status_id': state['status_id'],
+        'payment_method': state['payment_method'],
+        'due_date': state['due_date'],
+    }, payment_count=sign, total_amount=sign * Decimal(str(state['amount'])))
+
+
+def add_payment_rollups(payments, estate_ids, sign=1):
+    """
+    Count bulk-created payments (which send no signals) into the daily rollup,
+    or with ``sign=-1`` take bulk-updated payments' previous state out of it.
+    ``estate_ids`` maps tenant id -> estate id. Rollup rows are additive, so
+    each group is inserted as a new row instead of updating an existing one.
+    """
+    PaymentDailyRollup = global_apps.get_model('core', 'PaymentDailyRollup')
+    groups = defaultdict(lambda: {'payment_count': 0, 'total_amount': Decimal('0')})
+    for payment in payments:
+        key = (
+            timezone.localdate(payment.created_at), estate_ids.get(payment.tenant_id),
+            payment.status_id, payment.payment_method, payment.due_date
+        )
+        groups[key]['payment_count'] += sign
+        groups[key]['total_amount'] += sign * payment.amount
+    PaymentDailyRollup.objects.bulk_create([
+        PaymentDailyRollup(
+            date=date, estate_id=estate_id, status_id=status_id,
+            payment_method=payment_method, due_date=due_date, **totals
+        )
+        for (date, estate_id, status_id, payment_method, due_date), totals in groups.items()
+    ], batch_size=1000)
+
+
+def move_payment_rollups(payments, old_status_id, new_status_id):
+    """
+    Move bulk-updated payments (which send no signals) from one status to
+    another in the daily rollup. ``payments`` selects the moved rows; each
+    group is added as a negative row under the old status and a positive
+    one under the new status.
+    """
+    PaymentDailyRollup = global_apps.get_model('core', 'PaymentDailyRollup')
+    groups = payments.annotate(
+        date=TruncDate('created_at'), estate_id=F('tenant__apartment__block__estate')
+    ).values('date', 'estate_id', 'payment_method', 'due_date').annotate(
+        payment_count=Count('id'), total_amount=Sum('amount')
+    ).order_by()
+    rows = []
+    for group in groups:
+        rows.append(PaymentDailyRollup(
+            **group, status_id=new_status_id
+        ))
+        rows.append(PaymentDailyRollup(
+            **{**group, 'payment_count': -group['payment_count'], 'total_amount': -group['total_amount']},
+            status_id=old_status_id
+        ))
+    PaymentDailyRollup.objects.bulk_create(rows, batch_size=1000)
+
+
+def apply_complaint(state, sign, estate_id=None):
+    ComplaintDailyRollup = global_apps.get_model('core', 'ComplaintDailyRollup')
+    _adjust(ComplaintDailyRollup, {
+        'date': timezone.localdate(state['created_at']),
+        'estate_id': estate_id if estate_id is not None else estate_for_tenant(state['tenant_id']),
+        'status_id': state['status_id'],
+        'category_id': state['category_id'],
+    }, complaint_count=sign)
+
+
+def apply_tenancy(state, sign):
+    """A lease is a move-in on lease_start, a move-out on lease_end, and active in between"""
+    OccupancyDailyRollup = global_apps.get_model('core', 'OccupancyDailyRollup')
+    estate_id = estate_for_apartment(state['apartment_id'])
+    lease_start, lease_end = state['lease_start'], state['lease_end']
+    active = lease_start is not None and lease_end is not None and lease_start <= lease_end
+
+    if lease_start is not None:
+        deltas = {'move_ins': sign}
+        if active:
+            deltas['occupancy_change'] = sign
+        _adjust(OccupancyDailyRollup, {'date': lease_start, 'estate_id': estate_id}, **deltas)
+    if lease_end is not None:
+        _adjust(OccupancyDailyRollup, {'date': lease_end, 'estate_id': estate_id}, move_outs=sign)
+    if active:
+        _adjust(OccupancyDailyRollup, {'date': lease_end + timedelta(days=1), 'estate_id': estate_id}, occupancy_change=-sign)
+
+
+def move_tenant_rollups(tenant_id, old_estate_id, new_estate_id):
+    """Re-attribute a tenant's payments and complaints after they move estate"""
+    Payment = global_apps.get_model('payments', 'Payment')
+    Complaint = global_apps.get_model('complaints', 'Complaint')
+    PaymentDailyRollup = global_apps.get_model('core', 'PaymentDailyRollup')
+    ComplaintDailyRollup = global_apps.get_model('core', 'ComplaintDailyRollup')
+
+    payment_groups = Payment.objects.filter(tenant_id=tenant_id).annotate(
+        date=TruncDate('created_at')
+    ).values('date', 'status_id', 'payment_method', 'due_date').annotate(
+        payment_count=Count('id'), total_amount=Sum('amount')
+    ).order_by()
+    for group in payment_groups:
+        count, amount = group.pop('payment_count'), group.pop('total_amount')
+        _adjust(PaymentDailyRollup, {**group, 'estate_id': old_estate_id}, payment_count=-count, total_amount=-amount)
+        _adjust(PaymentDailyRollup, {**group, 'estate_id': new_estate_id}, payment_count=count, total_amount=amount)
+
+    complaint_groups = Complaint.objects.filter(tenant_id=tenant_id).annotate(
+        date=TruncDate('created_at')
+    ).values('date', 'status_id', 'category_id').annotate(complaint_count=Count('id')).order_by()
+    for group in complaint_groups:
+        count = group.pop('complaint_count')
+        _adjust(ComplaintDailyRollup, {**group, 'estate_id': old_estate_id}, complaint_count=-count)
+        _adjust(ComplaintDailyRollup, {**group, 'estate_id': new_estate_id}, complaint_count=count)
+
+
+# Full rebuild
+
+def _date_range_filter(field, start, end):
+    conditions = {}
+    if start is not None:
+        conditions[f'{field}__gte'] = start
+    if end is not None:
+        conditions[f'{field}__lte'] = end
+    return Q(**conditions)
+
+
+def _replace_rows(model, start, end, rows):
+    model.objects.filter(_date_range_filter('date', start, end)).delete()
+    model.objects.bulk_create([model(**row) for row in rows], batch_size=1000)
+    return len(rows)
+
+
+def rebuild_payment_rollups(start=None, end=None, apps=global_apps):
+    Payment = apps.get_model('payments', 'Payment')
+    PaymentDailyRollup = apps.get_model('core', 'PaymentDailyRollup')
+    rows = Payment.objects.filter(_date_range_filter('created_at__date', start, end)).annotate(
+        date=TruncDate('created_at'), estate_id=F('tenant__apartment__block__estate')
+    ).values('date', 'estate_id', 'status_id', 'payment_method', 'due_date').annotate(
+        payment_count=Count('id'), total_amount=Sum('amount')
+    ).order_by()
+    return _replace_rows(PaymentDailyRollup, start, end, list(rows))
+
+
+def rebuild_complaint_rollups(start=None, end=None, apps=global_apps):
+    Complaint = apps.get_model('complaints', 'Complaint')
+    ComplaintDailyRollup = apps.get_model('core', 'ComplaintDailyRollup')
+    rows = Complaint.objects.filter(_date_range_filter('created_at__date', start, end)).annotate(
+        date=TruncDate('created_at'), estate_id=F('tenant__apartment__block__estate')
+    ).values('date', 'estate_id', 'status_id', 'category_id').annotate(
+        complaint_count=Count('id')
+    ).order_by()
+    return _replace_rows(ComplaintDailyRollup, start, end, list(rows))
+
+
+def rebuild_occupancy_rollups(start=None, end=None, apps=global_apps):
+    Tenant = apps.get_model('tenants', 'Tenant')
+    OccupancyDailyRollup = apps.get_model('core', 'OccupancyDailyRollup')
+    tenants = Tenant.objects.annotate(estate_id=F('apartment__block__estate'))
+    active = Q(lease_start__isnull=False, lease_end__isnull=False, lease_start__lte=F('lease_end'))
+
+    totals = defaultdict(lambda: {'move_ins': 0, 'move_outs': 0, 'occupancy_change': 0})
+
+    def add(queryset, date_field, column, sign=1, shift=0):
+        # Lease dates are optional; an unset date is not an event
+        grouped = queryset.filter(**{f'{date_field}__isnull': False}).values(
+            date_field, 'estate_id'
+        ).annotate(n=Count('id')).order_by()
+        for row in grouped:
+            totals[(row[date_field] + timedelta(days=shift), row['estate_id'])][column] += sign * row['n']
+
+    add(tenants.filter(_date_range_filter('lease_start', start, end)), 'lease_start', 'move_ins')
+    add(tenants.filter(_date_range_filter('lease_end', start, end)), 'lease_end', 'move_outs')
+    add(tenants.filter(active, _date_range_filter('lease_start', start, end)), 'lease_start', 'occupancy_change')
+    # A lease stops counting the day after it ends
+    add(tenants.filter(active, _date_range_filter(
+        'lease_end',
+        start - timedelta(days=1) if start is not None else None,
+        end - timedelta(days=1) if end is not None else None
+    )), 'lease_end', 'occupancy_change', sign=-1, shift=1)
+
+    rows = [{'date': date, 'estate_id': estate_id, **counts} for (date, estate_id), counts in totals.items()]
+    return _replace_rows(OccupancyDailyRollup, start, end, rows)
+
+
+def rebuild_rollups(start=None, end=None, apps=global_apps):
+    """Recompute every rollup row dated within [start, end] (the whole history when omitted)"""
+    with transaction.atomic():
+        counts = {
+            'payments': rebuild_payment_rollups(start, end, apps),
+            'complaints': rebuild_complaint_rollups(start, end, apps),
+            'occupancy': rebuild_occupancy_rollups(start, end, apps),
+        }
+        # Cached dashboards built from the old rows
+        for label in ROLLUP_LABELS:
+            bump_model_version_on_commit(label)
+    return counts
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.cache import cache
+from owners.models import Owner
+from .cache import get_model_versions
+
+OWNER_LABEL = 'owners.owner'
+OWNER_SCOPE_KEY_PREFIX = 'pms:owner-estates'
+
+
+def _load_owner_estate_ids(user):
+    # No rows: not an owner; (owner_id, None): an owner with no estates yet
+    rows = list(Owner.objects.filter(user=user).values_list('id', 'estates'))
+    return sorted(estate_id for _, estate_id in rows if estate_id is not None) if rows else None
+
+
+def get_owner_estate_ids(user):
+    """
+    Sorted ids of the estates an owner's analytics are restricted to, or None
+    for users without an owners.Owner record (staff and managers keep the
+    whole portfolio). Cached per user when the cache is shared between
+    processes; any Owner or Owner.estates change bumps the owners.owner
+    version and retires every cached scope. A per-process cache would only
+    see its own process's bumps, and a stale None would open the whole
+    portfolio to a new owner, so without a shared cache it is one query per
+    request.
+    """
+    if not user.is_authenticated:
+        return None
+    if not settings.SHARED_CACHE:
+        return _load_owner_estate_ids(user)
+    version = get_model_versions([OWNER_LABEL])[OWNER_LABEL]
+    key = f'{OWNER_SCOPE_KEY_PREFIX}:{user.pk}:{version}'
+    cached = cache.get(key)
+    if cached is None:
+        cached = {'estates': _load_owner_estate_ids(user)}
+        cache.set(key, cached, settings.RESPONSE_CACHE_TIMEOUT)
+    return cached['estates']
+
+
+def get_request_estate_scope(request):
+    """The requesting user's estate scope, looked up once per request"""
+    if not hasattr(request, '_estate_scope'):
+        request._estate_scope = get_owner_estate_ids(request.user)
+    return request._estate_scope
+
+
+def scope_queryset(queryset, estate_ids, estate_field):
+    """Keep rows whose ``estate_field`` is one of ``estate_ids``; None means unrestricted"""
+    if estate_ids is None:
+        return queryset
+    return queryset.filter(**{f'{estate_field}__in': estate_ids})
+
+
+class EstateScopeMixin:
+    """
+    Restricts a viewset's analytics to the requesting owner's estates.
+    ``estate_field`` is the lookup path from the queryset's model to Estate,
+    e.g. 'tenant__apartment__block__estate' for payments.
+    """
+
+    def get_estate_scope(self):
+        return get_request_estate_scope(self.request)
+
+    def scope_to_owner(self, queryset, estate_field):
+        return scope_queryset(queryset, self.get_estate_scope(), estate_field)
@@ -1,27 +1,38 @@
 from rest_framework import serializers
 from .models import Estate, Block, Apartment, Amenity, Furnishing
+from .fieldsets import SparseFieldsetSerializerMixin
 
-class EstateSerializer(serializers.ModelSerializer):
+class EstateSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Estate
         fields = '__all__'
 
-class BlockSerializer(serializers.ModelSerializer):
+class BlockSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        'estate': (EstateSerializer, {}),
+    }
+
     class Meta:
         model = Block
         fields = '__all__'
 
-class ApartmentSerializer(serializers.ModelSerializer):
+class AmenitySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
-        model = Apartment
+        model = Amenity
         fields = '__all__'
 
-class AmenitySerializer(serializers.ModelSerializer):
+class FurnishingSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
-        model = Amenity
+        model = Furnishing
         fields = '__all__'
 
-class FurnishingSerializer(serializers.ModelSerializer):
+class ApartmentSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        'block': (BlockSerializer, {}),
+        'amenities': (AmenitySerializer, {'many': True}),
+        'furnishings': (FurnishingSerializer, {'many': True}),
+    }
+
     class Meta:
-        model = Furnishing
-        fields = '__all__'
\ No newline at end of file
+        model = Apartment
+        fields = '__all__'
@@ -0,0 +1,154 @@
+from django.db.models.signals import post_init, pre_save, post_save, pre_delete, post_delete, m2m_changed
+from . import rollups
+from .cache import bump_model_version_on_commit
+from .models import Estate, Block, Apartment, Amenity, Furnishing
+from .statuses import COMPLAINT_STATUSES, PAYMENT_STATUSES
+from complaints.models import Complaint, ComplaintStatus, ComplaintCategory
+from owners.models import Owner
+from payments.models import Payment, PaymentStatus
+from tenants.models import Tenant
+
+# Models whose changes invalidate cached responses (apartment search/listing,
+# owner dashboards) and cached owner estate scopes
+CACHE_VERSIONED_MODELS = [
+    Estate, Block, Apartment, Amenity, Furnishing, Tenant,
+    Payment, PaymentStatus, Complaint, ComplaintStatus, ComplaintCategory, Owner,
+]
+
+ROLLUP_STATE_FIELDS = {
+    Payment: rollups.PAYMENT_STATE_FIELDS,
+    Complaint: rollups.COMPLAINT_STATE_FIELDS,
+    Tenant: rollups.TENANT_STATE_FIELDS,
+}
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def bump_sender_version(sender, **kwargs):
+    bump_model_version_on_commit(model_label(sender))
+
+
+def bump_apartment_version(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_model_version_on_commit(model_label(Apartment))
+
+
+def bump_owner_version(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_model_version_on_commit(model_label(Owner))
+
+
+def connect_cache_invalidation():
+    for model in CACHE_VERSIONED_MODELS:
+        post_save.connect(bump_sender_version, sender=model, dispatch_uid=f'cache-version-save-{model_label(model)}')
+        post_delete.connect(bump_sender_version, sender=model, dispatch_uid=f'cache-version-delete-{model_label(model)}')
+
+    # Amenity/furnishing assignment changes only touch the through tables
+    for through in (Apartment.amenities.through, Apartment.furnishings.through):
+        m2m_changed.connect(bump_apartment_version, sender=through, dispatch_uid=f'cache-version-m2m-{model_label(through)}')
+
+    # Owner estate assignments decide each owner's dashboard scope
+    m2m_changed.connect(bump_owner_version, sender=Owner.estates.through, dispatch_uid='cache-version-m2m-owner-estates')
+
+
+# Analytics rollups: subtract a row's previous contribution, add its new one
+
+def remember_rollup_state(sender, instance, **kwargs):
+    instance._rollup_state = rollups.snapshot(instance, ROLLUP_STATE_FIELDS[sender])
+
+
+def load_rollup_state(sender, instance, raw=False, **kwargs):
+    """Fall back to the stored row when the instance was loaded with deferred fields"""
+    if raw or instance._state.adding:
+        instance._rollup_state = None
+    elif getattr(instance, '_rollup_state', None) is None:
+        instance._rollup_state = rollups.stored_state(instance, ROLLUP_STATE_FIELDS[sender])
+
+
+def update_payment_rollup(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = instance._rollup_state
+    current = rollups.stored_state(instance, rollups.PAYMENT_STATE_FIELDS)
+    if previous != current:
+        if previous:
+            rollups.apply_payment(previous, -1)
+        rollups.apply_payment(current, 1)
+    instance._rollup_state = current
+
+
+def update_complaint_rollup(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = instance._rollup_state
+    current = rollups.stored_state(instance, rollups.COMPLAINT_STATE_FIELDS)
+    if previous != current:
+        if previous:
+            rollups.apply_complaint(previous, -1)
+        rollups.apply_complaint(current, 1)
+    instance._rollup_state = current
+
+
+def update_tenant_rollups(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = instance._rollup_state
+    current = rollups.stored_state(instance, rollups.TENANT_STATE_FIELDS)
+    if previous != current:
+        if previous:
+            rollups.apply_tenancy(previous, -1)
+            old_estate_id = rollups.estate_for_apartment(previous['apartment_id'])
+            new_estate_id = rollups.estate_for_apartment(current['apartment_id'])
+            if old_estate_id != new_estate_id:
+                rollups.move_tenant_rollups(instance.pk, old_estate_id, new_estate_id)
+        rollups.apply_tenancy(current, 1)
+    instance._rollup_state = current
+
+
+def remove_payment_rollup(sender, instance, **kwargs):
+    rollups.apply_payment(rollups.stored_state(instance, rollups.PAYMENT_STATE_FIELDS), -1)
+
+
+def remove_complaint_rollup(sender, instance, **kwargs):
+    rollups.apply_complaint(rollups.stored_state(instance, rollups.COMPLAINT_STATE_FIELDS), -1)
+
+
+def remove_tenant_rollups(sender, instance, **kwargs):
+    # The tenant's payments and complaints are cascaded and remove themselves
+    rollups.apply_tenancy(rollups.stored_state(instance, rollups.TENANT_STATE_FIELDS), -1)
+
+
+def connect_rollup_maintenance():
+    handlers = [
+        (Payment, update_payment_rollup, remove_payment_rollup),
+        (Complaint, update_complaint_rollup, remove_complaint_rollup),
+        (Tenant, update_tenant_rollups, remove_tenant_rollups),
+    ]
+    for model, on_save, on_delete in handlers:
+        label = model_label(model)
+        post_init.connect(remember_rollup_state, sender=model, dispatch_uid=f'rollup-init-{label}')
+        pre_save.connect(load_rollup_state, sender=model, dispatch_uid=f'rollup-pre-save-{label}')
+        post_save.connect(on_save, sender=model, dispatch_uid=f'rollup-save-{label}')
+        # Before the row (and, for cascades, its tenant) is gone, so the estate still resolves
+        pre_delete.connect(on_delete, sender=model, dispatch_uid=f'rollup-delete-{label}')
+
+
+# Status registries (core.statuses)
+
+STATUS_REGISTRIES = {
+    PaymentStatus: PAYMENT_STATUSES,
+    ComplaintStatus: COMPLAINT_STATUSES,
+}
+
+
+def invalidate_status_registry(sender, **kwargs):
+    STATUS_REGISTRIES[sender].invalidate()
+
+
+def connect_status_registries():
+    for model in STATUS_REGISTRIES:
+        label = model_label(model)
+        post_save.connect(invalidate_status_registry, sender=model, dispatch_uid=f'status-registry-save-{label}')
+        post_delete.connect(invalidate_status_registry, sender=model, dispatch_uid=f'status-registry-delete-{label}')
@@ -0,0 +1,66 @@
+import time
+from django.conf import settings
+from complaints.models import ComplaintStatus
+from payments.models import PaymentStatus
+from .cache import get_model_versions
+
+
+class StatusRegistry:
+    """
+    In-process id/name lookup for a status table, so queries can filter on
+    ``status_id__in`` instead of joining the status table and matching names.
+
+    The table is read once per process and again whenever its cache version
+    changes; every status save or delete bumps it (core.signals), so with a
+    shared cache edits reach all workers on their next lookup. The version
+    counter is only per process with a local-memory cache, so the copy is
+    also re-read once it is STATUS_REGISTRY_TTL seconds old: a status
+    created by another process (say the overdue job in a Celery worker) is
+    seen within that time. The saving process drops its copy straight away,
+    without waiting for the commit.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.label = model._meta.label_lower
+        self._loaded = (None, 0, {})
+
+    def invalidate(self):
+        """Drop this process's copy immediately (other processes follow the version bump)"""
+        self._loaded = (None, 0, {})
+
+    def names(self):
+        """{id: name} for every status"""
+        version = get_model_versions([self.label])[self.label]
+        loaded_version, loaded_at, names = self._loaded
+        now = time.monotonic()
+        if loaded_version != version or now - loaded_at >= settings.STATUS_REGISTRY_TTL:
+            names = dict(self.model.objects.order_by('id').values_list('id', 'name'))
+            self._loaded = (version, now, names)
+        return names
+
+    def ids(self, *names):
+        """Ids of the statuses named exactly one of ``names`` (like name__in)"""
+        return [pk for pk, name in self.names().items() if name in names]
+
+    def ids_containing(self, fragment):
+        """Ids of the statuses whose name contains ``fragment`` in any case (like name__icontains)"""
+        fragment = fragment.lower()
+        return [pk for pk, name in self.names().items() if fragment in name.lower()]
+
+    def first_containing(self, fragment):
+        """Id of the first status whose name contains ``fragment``, or None"""
+        ids = self.ids_containing(fragment)
+        return ids[0] if ids else None
+
+    def get_or_create(self, name):
+        """Id of the status called ``name``, created on first use"""
+        ids = self.ids(name)
+        if ids:
+            return ids[0]
+        status, _ = self.model.objects.get_or_create(name=name)
+        return status.pk
+
+
+PAYMENT_STATUSES = StatusRegistry(PaymentStatus)
+COMPLAINT_STATUSES = StatusRegistry(ComplaintStatus)
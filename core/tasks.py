@@ -0,0 +1,12 @@
+from celery import shared_task
+from .exports import purge_expired_exports, run_report_export
+
+
+@shared_task
+def generate_report_export(export_id):
+    run_report_export(export_id)
+
+
+@shared_task
+def purge_expired_report_exports():
+    return purge_expired_exports()
@@ -0,0 +1,669 @@
+import contextlib
+import csv
+import io
+import itertools
+import json
+import os
+import tempfile
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock, skipUnless
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.db import connection
+from django.db.models import Sum
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from complaints.models import Complaint, ComplaintCategory, ComplaintStatus
+from owners.models import Owner
+from payments.imports import import_payments
+from payments.invoices import generate_monthly_invoices
+from payments.models import Payment, PaymentStatus
+from payments.overdue import mark_overdue_payments
+from tenants.models import Tenant
+from .cache import get_model_versions
+from .exports import purge_expired_exports, run_report_export, write_csv, write_xlsx
+from .matching import assign_optimal
+from .models import (
+    Estate, Block, Apartment, Amenity, Furnishing, ReportExport,
+    PaymentDailyRollup, ComplaintDailyRollup, OccupancyDailyRollup
+)
+from .renderers import FastJSONRenderer, orjson
+from .rollups import rebuild_rollups
+from .scoping import get_owner_estate_ids
+from .statuses import COMPLAINT_STATUSES, PAYMENT_STATUSES
+from .views import OwnerDashboardViewSet
+
+# Rollup model -> (key fields, summed fields)
+ROLLUP_TOTALS = {
+    PaymentDailyRollup: (('date', 'estate_id', 'status_id', 'payment_method', 'due_date'), ('payment_count', 'total_amount')),
+    ComplaintDailyRollup: (('date', 'estate_id', 'status_id', 'category_id'), ('complaint_count',)),
+    OccupancyDailyRollup: (('date', 'estate_id'), ('move_ins', 'move_outs', 'occupancy_change')),
+}
+
+
+def rollup_totals(model):
+    """Each rollup key's summed totals, leaving out keys that net to nothing"""
+    keys, fields = ROLLUP_TOTALS[model]
+    rows = model.objects.values(*keys).annotate(**{f'{field}_sum': Sum(field) for field in fields}).order_by()
+    totals = {}
+    for row in rows:
+        sums = tuple(row[f'{field}_sum'] for field in fields)
+        if any(sums):
+            totals[tuple(row[key] for key in keys)] = sums
+    return totals
+
+
+class RollupAssertions:
+    def assertRollupsMatchRebuild(self):
+        """The incrementally maintained rollups equal a full rebuild from the raw tables"""
+        maintained = {model: rollup_totals(model) for model in ROLLUP_TOTALS}
+        rebuild_rollups()
+        for model in ROLLUP_TOTALS:
+            self.assertEqual(maintained[model], rollup_totals(model), model.__name__)
+
+
+def best_matching(scores, feasible):
+    """(size, total score) of the best matching, by trying every assignment"""
+    n, m = feasible.shape
+    best = (0, 0.0)
+    # Each applicant takes one of the apartments or none (-1)
+    for choice in itertools.product(range(-1, m), repeat=n):
+        taken = [j for j in choice if j >= 0]
+        if len(taken) != len(set(taken)):
+            continue
+        if any(j >= 0 and not feasible[i, j] for i, j in enumerate(choice)):
+            continue
+        total = float(sum(scores[i, j] for i, j in enumerate(choice) if j >= 0))
+        best = max(best, (len(taken), total))
+    return best
+
+
+class AssignOptimalTests(SimpleTestCase):
+    def assertOptimal(self, scores, feasible):
+        pairs = assign_optimal(scores, feasible)
+        self.assertTrue(all(feasible[i, j] for i, j in pairs))
+        self.assertEqual(len({i for i, _ in pairs}), len(pairs))
+        self.assertEqual(len({j for _, j in pairs}), len(pairs))
+        size, total = best_matching(scores, feasible)
+        self.assertEqual(len(pairs), size)
+        self.assertAlmostEqual(sum(scores[i, j] for i, j in pairs), total)
+
+    def test_negative_scores_still_place_everyone_possible(self):
+        scores = np.array([[-34.0, -48.0, -34.0], [-31.0, -51.0, -52.0]])
+        feasible = np.array([[True, True, False], [True, False, True]])
+        self.assertOptimal(scores, feasible)
+        self.assertEqual(len(assign_optimal(scores, feasible)), 2)
+
+    def test_maximum_cardinality_on_random_cases(self):
+        rng = np.random.default_rng(9)
+        for _ in range(300):
+            n, m = rng.integers(1, 5, size=2)
+            scores = rng.integers(-60, 60, size=(n, m)).astype(float)
+            feasible = rng.random((n, m)) < 0.6
+            with self.subTest(scores=scores.tolist(), feasible=feasible.tolist()):
+                self.assertOptimal(scores, feasible)
+
+
+class UncachedOwnerDashboardViewSet(OwnerDashboardViewSet):
+    # Count the queries themselves, not the response cache
+    occupancy_status = OwnerDashboardViewSet.occupancy_status.__wrapped__
+
+
+class OccupancyStatusQueryTests(TestCase):
+    """occupancy_status reads the estate -> block tree in a fixed number of queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner-dashboard', password='pw', is_superuser=True)
+        cls.estate = Estate.objects.create(name='Estate', address='-')
+
+    def add_blocks(self, count):
+        for _ in range(count):
+            block = Block.objects.create(estate=self.estate, name=f'B{Block.objects.count()}')
+            for number in range(3):
+                Apartment.objects.create(block=block, number=str(number), rent_amount=Decimal('1000.00'))
+
+    def get_occupancy_status(self):
+        cache.clear()  # Every call pays for the owner-scope lookup too
+        view = UncachedOwnerDashboardViewSet.as_view({'get': 'occupancy_status'})
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=self.user)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return view(request)
+
+    def test_query_count_does_not_grow_with_blocks(self):
+        self.add_blocks(2)
+        with self.assertNumQueries(2):
+            response = self.get_occupancy_status()
+        self.assertEqual(len(response.data['estates'][0]['blocks']), 2)
+
+        self.add_blocks(20)
+        with self.assertNumQueries(2):
+            response = self.get_occupancy_status()
+        self.assertEqual(len(response.data['estates'][0]['blocks']), 22)
+
+
+class OwnerEstateScopeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('new-owner', password='pw')
+        self.estate = Estate.objects.create(name='Estate', address='-')
+
+    def become_owner(self):
+        # Commit hooks don't run inside the test transaction, as if the
+        # version bump had happened in another process's cache
+        Owner.objects.create(user=self.user).estates.add(self.estate)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_scope_is_read_per_request_without_a_shared_cache(self):
+        self.assertIsNone(get_owner_estate_ids(self.user))
+        self.become_owner()
+        self.assertEqual(get_owner_estate_ids(self.user), [self.estate.id])
+
+    @override_settings(SHARED_CACHE=True)
+    def test_scope_is_cached_until_the_owner_version_changes(self):
+        self.assertIsNone(get_owner_estate_ids(self.user))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.become_owner()
+        self.assertEqual(get_owner_estate_ids(self.user), [self.estate.id])
+        with self.assertNumQueries(0):
+            self.assertEqual(get_owner_estate_ids(self.user), [self.estate.id])
+
+
+@override_settings(SHARED_CACHE=True)
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('manager', password='pw', is_staff=True))
+        block = Block.objects.create(estate=Estate.objects.create(name='Estate', address='-'), name='A')
+        self.apartment = Apartment.objects.create(block=block, number='1', rent_amount=Decimal('1000.00'))
+
+    def list_apartments(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.client.get('/api/core/apartments/')
+
+    def rents(self, response):
+        results = response.data['results'] if isinstance(response.data, dict) else response.data
+        return [item['rent_amount'] for item in results]
+
+    def test_save_bumps_the_version_and_misses_the_cache(self):
+        self.assertEqual(self.list_apartments()['X-Cache'], 'MISS')
+        self.assertEqual(self.list_apartments()['X-Cache'], 'HIT')
+
+        version = get_model_versions(['core.apartment'])['core.apartment']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.apartment.rent_amount = Decimal('1200.00')
+            self.apartment.save()
+        self.assertGreater(get_model_versions(['core.apartment'])['core.apartment'], version)
+
+        response = self.list_apartments()
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(self.rents(response), ['1200.00'])
+
+    @override_settings(SHARED_CACHE=False)
+    def test_responses_are_not_cached_without_a_shared_cache(self):
+        self.list_apartments()
+        # No commit hooks run: another process's write, whose bump this process never sees
+        Apartment.objects.filter(pk=self.apartment.pk).update(rent_amount=Decimal('1200.00'))
+        response = self.list_apartments()
+        self.assertFalse(response.has_header('X-Cache'))
+        self.assertEqual(self.rents(response), ['1200.00'])
+
+
+class RollupMaintenanceTests(RollupAssertions, TestCase):
+    """Every write path keeps the daily rollups equal to a rebuild from the raw tables"""
+
+    def setUp(self):
+        # Status ids cached by an earlier test were rolled back with it
+        PAYMENT_STATUSES.invalidate()
+        COMPLAINT_STATUSES.invalidate()
+        self.paid, self.pending = (PaymentStatus.objects.create(name=name) for name in ('Paid', 'Pending'))
+        PaymentStatus.objects.create(name='Overdue')
+        self.open, self.resolved = (ComplaintStatus.objects.create(name=name) for name in ('Open', 'Resolved'))
+        self.category = ComplaintCategory.objects.create(name='Plumbing')
+        self.apartments = []
+        for name in ('North', 'South'):
+            block = Block.objects.create(estate=Estate.objects.create(name=name, address='-'), name='A')
+            self.apartments.append(Apartment.objects.create(block=block, number='1', rent_amount=Decimal('1000.00')))
+        self.tenant = Tenant.objects.create(
+            user=User.objects.create_user('tenant'), apartment=self.apartments[0], lease_start=date(2026, 1, 1)
+        )
+
+    def test_write_paths_match_a_rebuild(self):
+        with self.subTest('create'):
+            payment = Payment.objects.create(
+                tenant=self.tenant, amount=Decimal('1000.00'), status=self.pending, due_date=date(2026, 1, 1),
+                payment_for_month=1, payment_for_year=2026
+            )
+            doomed = Payment.objects.create(
+                tenant=self.tenant, amount=Decimal('500.00'), status=self.paid, due_date=date(2026, 2, 1),
+                payment_for_month=2, payment_for_year=2026, payment_method='cash'
+            )
+            complaint = Complaint.objects.create(
+                tenant=self.tenant, category=self.category, description='-', status=self.open
+            )
+            self.assertRollupsMatchRebuild()
+
+        with self.subTest('update'):
+            payment.amount = Decimal('1200.00')
+            payment.payment_method = 'bank'
+            payment.save()
+            self.tenant.lease_end = date(2026, 12, 31)
+            self.tenant.save()
+            self.assertRollupsMatchRebuild()
+
+        with self.subTest('status change'):
+            payment.status = self.paid
+            payment.save()
+            complaint.status = self.resolved
+            complaint.save()
+            self.assertRollupsMatchRebuild()
+
+        with self.subTest('delete'):
+            doomed.delete()
+            complaint.delete()
+            self.assertRollupsMatchRebuild()
+
+        with self.subTest('tenant move'):
+            Complaint.objects.create(tenant=self.tenant, category=self.category, description='-', status=self.open)
+            self.tenant.apartment = self.apartments[1]
+            self.tenant.save()
+            self.assertRollupsMatchRebuild()
+
+        with self.subTest('import settle'):
+            generate_monthly_invoices(2026, 3)
+            report = import_payments([
+                {'tenant': self.tenant.id, 'amount': '1000.00', 'due_date': '2026-03-01',
+                 'payment_for_month': 3, 'payment_for_year': 2026, 'reference_number': 'ST1'},
+                {'tenant': self.tenant.id, 'amount': '800.00', 'due_date': '2026-04-01',
+                 'payment_for_month': 4, 'payment_for_year': 2026, 'payment_method': 'bank'},
+            ])
+            self.assertEqual((report['settled'], report['created']), (1, 1))
+            self.assertRollupsMatchRebuild()
+
+        with self.subTest('overdue job'):
+            generate_monthly_invoices(2026, 5)
+            self.assertEqual(mark_overdue_payments(today=date(2026, 6, 1)), 1)
+            self.assertRollupsMatchRebuild()
+
+        with self.subTest('tenant delete'):
+            self.tenant.delete()
+            self.assertRollupsMatchRebuild()
+
+
+class ApartmentSearchTestCase(TestCase):
+    """A block of vacant apartments and a manager client for the available-apartments search"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('manager', is_staff=True))
+        self.estate = Estate.objects.create(name='Estate', address='-')
+        self.block = Block.objects.create(estate=self.estate, name='A')
+
+    def add_apartment(self, rooms, rent='1000.00', **kwargs):
+        return Apartment.objects.create(
+            block=self.block, number=str(Apartment.objects.count() + 1),
+            number_of_rooms=rooms, rent_amount=Decimal(rent), **kwargs
+        )
+
+    def available(self, **params):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.client.get('/api/core/apartments/available/', params)
+
+    def available_ids(self, **params):
+        response = self.available(**params)
+        self.assertEqual(response.status_code, 200)
+        return [apartment['id'] for apartment in response.data['apartments']]
+
+
+class CursorPaginationTests(ApartmentSearchTestCase):
+    def setUp(self):
+        super().setUp()
+        # Repeated room counts give tied scores, ordered by id
+        for rooms in (2, 2, 3, 1, 3, 2, 2):
+            self.add_apartment(rooms)
+
+    def walk(self, page_size, between_pages=None):
+        ids, cursor = [], None
+        while True:
+            params = {'page_size': page_size, **({'cursor': cursor} if cursor else {})}
+            response = self.available(**params)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(apartment['id'] for apartment in response.data['apartments'])
+            cursor = response.data['pagination']['next_cursor']
+            if cursor is None:
+                return ids
+            if between_pages:
+                between_pages(ids)
+
+    def test_pages_follow_score_then_id_without_repeats(self):
+        ranked = self.available()
+        expected = [apartment['id'] for apartment in ranked.data['apartments']]
+        scores = {apartment['id']: apartment['allocation_score'] for apartment in ranked.data['apartments']}
+        self.assertEqual(expected, sorted(expected, key=lambda pk: (-scores[pk], pk)))
+        for page_size in (1, 2, 3, 7, 50):
+            with self.subTest(page_size=page_size):
+                self.assertEqual(self.walk(page_size), expected)
+
+    def test_apartment_let_mid_walk_drops_out_without_shifting_pages(self):
+        expected = self.available_ids()
+        let = []
+
+        def let_an_unseen_apartment(seen):
+            unseen = [pk for pk in expected if pk not in seen and pk not in let]
+            if unseen:
+                let.append(unseen[-1])
+                Apartment.objects.filter(pk=unseen[-1]).update(is_occupied=True)
+
+        ids = self.walk(2, between_pages=let_an_unseen_apartment)
+        self.assertEqual(ids, [pk for pk in expected if pk not in let])
+
+    def test_invalid_cursor_is_404(self):
+        for cursor in ('not-base64!', 'bm90LWEtY3Vyc29y'):  # the second decodes to 'not-a-cursor'
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.available(cursor=cursor).status_code, 404)
+
+
+class FeatureFilterTests(ApartmentSearchTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pool, self.gym = (Amenity.objects.create(name=name) for name in ('Pool', 'Gym'))
+        self.sofa = Furnishing.objects.create(name='Sofa')
+        self.both, self.pool_only, self.gym_only, self.bare = (self.add_apartment(2) for _ in range(4))
+        self.both.amenities.add(self.pool, self.gym)
+        self.both.furnishings.add(self.sofa)
+        self.pool_only.amenities.add(self.pool)
+        self.gym_only.amenities.add(self.gym)
+
+    def assertMatches(self, expected, **params):
+        self.assertEqual(sorted(self.available_ids(**params)), sorted(apartment.id for apartment in expected))
+
+    def test_any_matches_each_apartment_once(self):
+        self.assertMatches([self.both, self.pool_only, self.gym_only], amenities=[self.pool.id, self.gym.id])
+        # Comma-separated ids, and 'any' is the default
+        self.assertMatches(
+            [self.both, self.pool_only, self.gym_only], amenities=f'{self.pool.id},{self.gym.id}', amenities_match='any'
+        )
+
+    def test_all_needs_every_feature(self):
+        self.assertMatches([self.both], amenities=[self.pool.id, self.gym.id], amenities_match='all')
+        self.assertMatches([self.both, self.pool_only], amenities=[self.pool.id, self.pool.id], amenities_match='ALL')
+        self.assertMatches(
+            [self.both], amenities=self.pool.id, furnishings=self.sofa.id, furnishings_match='all'
+        )
+
+    def test_unknown_feature_matches_nothing(self):
+        self.assertMatches([], amenities=[self.pool.id, 999], amenities_match='all')
+
+    def test_invalid_ids_and_match_modes_are_400(self):
+        for params, field in (
+            ({'amenities': 'pool'}, 'amenities'),
+            ({'furnishings': f'{self.sofa.id},x'}, 'furnishings'),
+            ({'amenities': self.pool.id, 'amenities_match': 'some'}, 'amenities_match'),
+        ):
+            with self.subTest(params=params):
+                response = self.available(**params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(list(response.data), [field])
+
+
+class SummaryOnlyTests(ApartmentSearchTestCase):
+    def setUp(self):
+        super().setUp()
+        for rooms, rent in ((1, '800.00'), (2, '1500.00'), (3, '2500.00')):
+            self.add_apartment(rooms, rent)
+
+    def test_summary_only_returns_the_full_summary_without_rows(self):
+        full = self.available(min_rooms=2)
+        with self.assertNumQueries(1):
+            summary = self.available(min_rooms=2, summary_only='true')
+        self.assertEqual(summary.status_code, 200)
+        self.assertNotIn('apartments', summary.data)
+        self.assertEqual(summary.data['total_available'], 2)
+        self.assertEqual(summary.data['summary'], full.data['summary'])
+        self.assertEqual(summary.data['filters_applied'], full.data['filters_applied'])
+
+    def test_summary_only_with_no_matches(self):
+        response = self.available(min_rooms=9, summary_only='true')
+        self.assertEqual((response.data['total_available'], response.data['summary']), (0, {}))
+
+
+class SparseFieldsetTests(ApartmentSearchTestCase):
+    def setUp(self):
+        super().setUp()
+        self.pool = Amenity.objects.create(name='Pool', description='Heated')
+        for _ in range(3):
+            self.add_apartment(2, description='A long description').amenities.add(self.pool)
+
+    def get(self, url, **params):
+        with CaptureQueriesContext(connection) as queries, contextlib.redirect_stdout(io.StringIO()):
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, [query['sql'] for query in queries]
+
+    def test_fields_narrow_the_payload_and_the_select(self):
+        response, queries = self.get('/api/core/apartments/', fields='id,number')
+        self.assertTrue(response.data)
+        self.assertTrue(all(set(item) == {'id', 'number'} for item in response.data))
+        # One query, no amenity/furnishing prefetches, no unrendered columns
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('description', queries[0])
+        self.assertNotIn('rent_amount', queries[0])
+
+    def test_expand_joins_instead_of_querying_per_row(self):
+        response, queries = self.get('/api/core/apartments/', fields='id,block.name', expand='block')
+        self.assertEqual(response.data[0]['block'], {'name': 'A'})
+        for _ in range(5):
+            self.add_apartment(3)
+        _, more_queries = self.get('/api/core/apartments/', fields='id,block.name', expand='block')
+        self.assertEqual(len(more_queries), len(queries))
+        self.assertNotIn('"core_estate"', ' '.join(more_queries))
+
+    def test_available_search_loads_only_rendered_text_columns(self):
+        response, queries = self.get('/api/core/apartments/available/', fields='id,number,amenities.name')
+        self.assertEqual(set(response.data['apartments'][0]), {'id', 'number', 'amenities'})
+        self.assertEqual(response.data['apartments'][0]['amenities'], [{'name': 'Pool'}])
+        for table in ('core_apartment', 'core_amenity'):
+            selects = [sql for sql in queries if f'FROM "{table}"' in sql]
+            self.assertTrue(selects, table)
+            self.assertFalse(any('"description"' in sql for sql in selects), table)
+
+
+class FastJSONRendererTests(ApartmentSearchTestCase):
+    def assertSameBytes(self, data, renderer_context=None):
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json', renderer_context),
+            JSONRenderer().render(data, 'application/json', renderer_context)
+        )
+
+    def test_matches_the_stock_renderer_byte_for_byte(self):
+        self.assertSameBytes({
+            'text': 'caf\u00e9 \u2603 \u2028 \u2029', 'numbers': [1, -2, 2.5, 0.1 + 0.2], 'none': None, 'flag': True,
+            'decimal': Decimal('12.50'), 'uuid': uuid.UUID(int=5), 'date': date(2026, 1, 2),
+            'datetime': datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc),
+            'timedelta': timedelta(seconds=5), 'big': 2 ** 70, 1: 'int key', 'nested': {'empty': {}, 'list': []},
+        })
+
+    def test_matches_on_a_real_payload(self):
+        pool = Amenity.objects.create(name='Pool')
+        for rooms in (1, 2, 3):
+            self.add_apartment(rooms, description='Sunny').amenities.add(pool)
+        self.assertSameBytes(self.available().data)
+
+    def test_indented_output_is_the_stock_renderers(self):
+        self.assertSameBytes({'a': [1, 2]}, {'indent': 2})
+
+    @skipUnless(orjson, 'orjson is not installed')
+    def test_documented_differences_parse_the_same(self):
+        fast = FastJSONRenderer().render({'exponent': 1e16})
+        self.assertEqual(fast, b'{"exponent":1e16}')
+        self.assertEqual(json.loads(fast), json.loads(JSONRenderer().render({'exponent': 1e16})))
+        self.assertEqual(FastJSONRenderer().render({'nan': float('nan')}), b'{"nan":null}')
+
+
+class ReportExportTests(TestCase):
+    def setUp(self):
+        # The file field's storage is bound at import; point it at a scratch directory
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        storage = mock.patch.object(
+            ReportExport._meta.get_field('file'), 'storage', FileSystemStorage(location=workdir.name)
+        )
+        storage.start()
+        self.addCleanup(storage.stop)
+
+        PAYMENT_STATUSES.invalidate()
+        block = Block.objects.create(estate=Estate.objects.create(name='Estate', address='-'), name='A')
+        Payment.objects.create(
+            tenant=Tenant.objects.create(
+                user=User.objects.create_user('tenant'), apartment=Apartment.objects.create(block=block, number='1')
+            ),
+            amount=Decimal('1000.00'), status=PaymentStatus.objects.create(name='Paid'), due_date=date(2026, 3, 1),
+            payment_for_month=3, payment_for_year=2026
+        )
+        self.user = User.objects.create_user('manager', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def request_export(self, worker=run_report_export):
+        with mock.patch('core.tasks.generate_report_export.delay', side_effect=worker):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post('/api/core/owner/export-report/', {
+                    'report_type': 'payments', 'format': 'csv', 'start_date': '2026-01-01', 'end_date': '2026-12-31'
+                })
+        self.assertEqual(response.status_code, 202)
+        return ReportExport.objects.get(pk=response.data['export_id'])
+
+    def status_url(self, export):
+        return f'/api/core/owner/exports/{export.pk}/'
+
+    def test_lifecycle(self):
+        export = self.request_export(worker=lambda export_id: None)
+        response = self.client.get(self.status_url(export))
+        self.assertEqual((response.data['status'], response.data['download_url']), ('pending', None))
+        self.assertEqual(self.client.get(self.status_url(export) + 'download/').status_code, 409)
+
+        run_report_export(str(export.pk))
+        export.refresh_from_db()
+        self.assertEqual((export.status, export.row_count), (ReportExport.STATUS_COMPLETED, 1))
+        self.assertEqual(export.file_size, export.file.size)
+        self.assertEqual(export.expires_at, export.completed_at + timedelta(hours=settings.REPORT_EXPORT_TTL_HOURS))
+
+        response = self.client.get(self.status_url(export))
+        self.assertEqual((response.data['status'], response.data['row_count']), ('completed', 1))
+        response = self.client.get(self.status_url(export) + 'download/')
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn('1000.00', lines[1])
+
+        ReportExport.objects.filter(pk=export.pk).update(expires_at=export.completed_at)
+        self.assertEqual(self.client.get(self.status_url(export) + 'download/').status_code, 410)
+
+    def test_worker_runs_each_export_once(self):
+        export = self.request_export()
+        self.assertEqual(export.status, ReportExport.STATUS_COMPLETED)
+        name = export.file.name
+        run_report_export(str(export.pk))
+        export.refresh_from_db()
+        self.assertEqual(export.file.name, name)
+
+    def test_queue_outage_fails_the_export(self):
+        def broker_down(export_id):
+            raise ConnectionError('broker down')
+
+        with self.assertLogs('core.exports', 'WARNING'):
+            export = self.request_export(worker=broker_down)
+        self.assertEqual(export.status, ReportExport.STATUS_FAILED)
+        self.assertEqual(export.error, 'Export queue unavailable, please retry later')
+        self.assertIsNotNone(export.expires_at)
+
+    def test_other_users_cannot_see_the_export(self):
+        export = self.request_export()
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user('other'))
+        self.assertEqual(other.get(self.status_url(export)).status_code, 404)
+        self.assertEqual(other.get(self.status_url(export) + 'download/').status_code, 404)
+
+    def test_purge_removes_expired_and_stale_exports_with_their_files(self):
+        expired = self.request_export()
+        kept = self.request_export()
+        storage = expired.file.storage
+        self.assertTrue(storage.exists(expired.file.name))
+        now = expired.expires_at + timedelta(seconds=1)
+        ReportExport.objects.filter(pk=kept.pk).update(expires_at=now + timedelta(hours=1))
+
+        def add_export(created_at, **fields):
+            export = ReportExport.objects.create(
+                requested_by=self.user, report_type='payments', format='csv',
+                start_date=date(2026, 1, 1), end_date=date(2026, 12, 31), **fields
+            )
+            ReportExport.objects.filter(pk=export.pk).update(created_at=created_at)
+            return export.pk
+
+        # A worker that died mid-run leaves its provisional expiry behind
+        crashed = add_export(now - timedelta(hours=25), status=ReportExport.STATUS_RUNNING, expires_at=now - timedelta(hours=1))
+        # A task lost before it ran has no expiry at all
+        lost = add_export(now - timedelta(hours=25))
+        fresh = add_export(now - timedelta(hours=1))
+
+        self.assertEqual(purge_expired_exports(now=now), 3)
+        self.assertFalse(storage.exists(expired.file.name))
+        self.assertTrue(storage.exists(kept.file.name))
+        self.assertEqual(set(ReportExport.objects.values_list('pk', flat=True)), {kept.pk, fresh})
+        self.assertFalse(ReportExport.objects.filter(pk__in=[crashed, lost]).exists())
+
+
+class FormulaEscapingTests(SimpleTestCase):
+    ROW = ('=HYPERLINK("http://x")', '+1', '-1+1', '@SUM(A1)', 'plain', -50, Decimal('-12.50'), 3, None)
+
+    def test_csv_prefixes_formula_text_only(self):
+        handle = io.StringIO()
+        self.assertEqual(write_csv(handle, ['h'] * len(self.ROW), [self.ROW]), 1)
+        self.assertEqual(list(csv.reader(io.StringIO(handle.getvalue())))[1], [
+            '\'=HYPERLINK("http://x")', "'+1", "'-1+1", "'@SUM(A1)", 'plain', '-50', '-12.50', '3', ''
+        ])
+
+    def test_xlsx_keeps_formula_text_as_text(self):
+        from openpyxl import load_workbook
+
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, 'report.xlsx')
+            write_xlsx(path, ['h'] * len(self.ROW), [self.ROW], title='Report')
+            cells = list(load_workbook(path).active.iter_rows(min_row=2))[0]
+        self.assertEqual(cells[0].data_type, 's')
+        self.assertEqual(cells[0].value, self.ROW[0])
+        self.assertEqual([cell.value for cell in cells[1:5]], list(self.ROW[1:5]))
+        self.assertEqual([cell.data_type for cell in cells[5:8]], ['n'] * 3)
+        self.assertEqual([cell.value for cell in cells[5:8]], [-50, -12.5, 3])
+
+
+class StreamingCSVExportTests(TestCase):
+    def test_payment_export_escapes_tenant_text_but_not_amounts(self):
+        PAYMENT_STATUSES.invalidate()
+        block = Block.objects.create(estate=Estate.objects.create(name='Estate', address='-'), name='A')
+        tenant = Tenant.objects.create(
+            user=User.objects.create_user('tenant', first_name='=cmd', last_name='x'),
+            apartment=Apartment.objects.create(block=block, number='1')
+        )
+        Payment.objects.create(
+            tenant=tenant, amount=Decimal('-50.00'), status=PaymentStatus.objects.create(name='Paid'),
+            due_date=date(2026, 3, 1), payment_for_month=3, payment_for_year=2026, reference_number='@ref'
+        )
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('manager', is_staff=True))
+
+        response = client.get('/api/payments/payments/export.csv/')
+        self.assertEqual(response.status_code, 200)
+        header, row = csv.reader(io.StringIO(b''.join(response.streaming_content).decode()))
+        row = dict(zip(header, row))
+        self.assertEqual((row['Tenant'], row['Reference']), ("'=cmd x", "'@ref"))
+        self.assertEqual(row['Amount'], '-50.00')
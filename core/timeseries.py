@@ -0,0 +1,51 @@
+from datetime import timedelta
+from django.db.models import DateField, DateTimeField, F
+from django.db.models.functions import TruncDate, TruncWeek, TruncMonth
+
+# bucket name -> truncation applied in SQL (weeks start on Monday)
+BUCKETS = {
+    'day': TruncDate,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+DEFAULT_BUCKET = 'day'
+
+
+def bucket_start(day, bucket):
+    """First day of the bucket containing ``day``, matching the SQL truncation"""
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def bucket_starts(start_date, end_date, bucket):
+    """Every bucket between two dates (inclusive), so empty buckets can be zero-filled"""
+    starts = []
+    current = bucket_start(start_date, bucket)
+    while current <= end_date:
+        starts.append(current)
+        if bucket == 'week':
+            current += timedelta(days=7)
+        elif bucket == 'month':
+            current = (current.replace(month=current.month + 1) if current.month < 12
+                       else current.replace(year=current.year + 1, month=1))
+        else:
+            current += timedelta(days=1)
+    return starts
+
+
+def bucketed_counts(queryset, field, bucket, **aggregates):
+    """
+    Run ``aggregates`` grouped by ``field`` truncated to ``bucket``, in one
+    query. ``field`` may be a datetime or a date (e.g. a rollup's ``date``).
+    Returns {bucket start date: row}; buckets with no rows are absent.
+    """
+    if bucket == DEFAULT_BUCKET:
+        is_datetime = isinstance(queryset.model._meta.get_field(field), DateTimeField)
+        truncated = TruncDate(field) if is_datetime else F(field)
+    else:
+        truncated = BUCKETS[bucket](field, output_field=DateField())
+    rows = queryset.annotate(bucket=truncated).values('bucket').annotate(**aggregates).order_by('bucket')
+    return {row['bucket']: row for row in rows}
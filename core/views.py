@@ -1,22 +1,45 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q, Count, Sum, Avg, Case, When, Value, IntegerField
+from django.db.models import Q, Count, Sum, Avg, Min, Max, Case, When, Value, IntegerField, DecimalField, F, OuterRef, Subquery, Exists, Prefetch
+from django.db.models.functions import Coalesce, Least, TruncMonth
+from django.conf import settings
+from django.db import transaction
+from django.http import FileResponse
+from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
-from .models import Estate, Block, Apartment, Amenity, Furnishing
+from functools import partial
+import logging
+import time
+from .models import Estate, Block, Apartment, Amenity, Furnishing, PaymentDailyRollup, ComplaintDailyRollup, OccupancyDailyRollup, ReportExport
 from .serializers import EstateSerializer, BlockSerializer, ApartmentSerializer, AmenitySerializer, FurnishingSerializer
+from .pagination import AllocationCursorPagination
+from .filters import FeatureFilter, amenity_filter, furnishing_filter
+from .cache import cached_response, get_cache_stats
+from .dashboard import WIDGET_OK, run_widgets
+from .exports import EXPORT_FORMATS, REPORTS, enqueue_report_export, export_filename
+from .matching import STRATEGIES, STRATEGY_OPTIMAL, parse_applicants, load_vacant_stock, build_score_matrix, assign_greedy, assign_optimal
+from .timeseries import BUCKETS, DEFAULT_BUCKET, bucket_starts, bucketed_counts
+from .rollups import ROLLUP_LABELS
+from .scoping import EstateScopeMixin, get_request_estate_scope
+from .statuses import COMPLAINT_STATUSES, PAYMENT_STATUSES
+from .fieldsets import SparseFieldsetViewMixin, get_fieldset_params, parse_fieldset, subtree, trim_fields, wants
+from payments.overdue import overdue_status_ids
 from tenants.models import Tenant
-from complaints.models import Complaint
 from decimal import Decimal
+import numpy as np
 
-class EstateViewSet(viewsets.ModelViewSet):
+logger = logging.getLogger(__name__)
+
+class EstateViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Estate.objects.all()
     serializer_class = EstateSerializer
     permission_classes = [IsAuthenticated]
 
-class BlockViewSet(viewsets.ModelViewSet):
+class BlockViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Block.objects.all()
     serializer_class = BlockSerializer
     permission_classes = [IsAuthenticated]
@@ -28,11 +51,27 @@ class BlockViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(estate_id=estate_id)
         return queryset
 
-class ApartmentViewSet(viewsets.ModelViewSet):
+# Models the apartment listing/search responses are built from (see core/cache.py)
+APARTMENT_CACHE_MODELS = ['core.apartment', 'core.block', 'core.estate', 'tenants.tenant', 'core.amenity', 'core.furnishing']
+DASHBOARD_CACHE_MODELS = [
+    'core.estate', 'core.block', 'core.apartment', 'tenants.tenant',
+    'payments.payment', 'payments.paymentstatus',
+    'complaints.complaint', 'complaints.complaintstatus', 'complaints.complaintcategory',
+    *ROLLUP_LABELS,
+]
+
+class ApartmentViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Apartment.objects.all()
     serializer_class = ApartmentSerializer
     permission_classes = [IsAuthenticated]
     
+    # Relations the available endpoint nests when no ?expand= is given
+    AVAILABLE_DEFAULT_EXPAND = ['block.estate', 'amenities', 'furnishings']
+    
+    @cached_response('apartments-list', APARTMENT_CACHE_MODELS)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
     def get_queryset(self):
         queryset = Apartment.objects.all()
         block_id = self.request.query_params.get('block_id')
@@ -41,7 +80,7 @@ class ApartmentViewSet(viewsets.ModelViewSet):
         if block_id:
             queryset = queryset.filter(block_id=block_id)
         if available_only == 'true':
-            queryset = queryset.filter(tenant__isnull=True)
+            queryset = queryset.filter(is_occupied=False)
         return queryset
     
     def create(self, request, *args, **kwargs):
@@ -110,6 +149,7 @@ class ApartmentViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     @action(detail=False, methods=['get'])
+    @cached_response('apartments-available', APARTMENT_CACHE_MODELS)
     def available(self, request):
         """Get all available apartments for tenant assignment with smart filtering"""
         # Get query parameters for smart filtering
@@ -123,16 +163,26 @@ class ApartmentViewSet(viewsets.ModelViewSet):
         block_id = request.query_params.get('block_id')
         amenity_ids = request.query_params.getlist('amenities')  # Can pass multiple
         furnishing_ids = request.query_params.getlist('furnishings')  # Can pass multiple
+        amenities_match = request.query_params.get('amenities_match', FeatureFilter.MATCH_ANY)  # 'any' or 'all'
+        furnishings_match = request.query_params.get('furnishings_match', FeatureFilter.MATCH_ANY)  # 'any' or 'all'
+        limit = request.query_params.get('limit')  # Top-N by allocation score
+        summary_only = request.query_params.get('summary_only') == 'true'
+        fields, expand = get_fieldset_params(request)  # Sparse fieldsets: ?fields=id,number&expand=block
+        if expand is None:
+            expand = parse_fieldset(self.AVAILABLE_DEFAULT_EXPAND)
+        if limit and not (limit.isdigit() and int(limit) > 0):
+            return Response({
+                'error': 'Validation failed',
+                'details': {'limit': ['Must be a positive integer']}
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         print(f"=== AVAILABLE APARTMENTS FILTER DEBUG ===")
         print(f"Filters: rooms({min_rooms}-{max_rooms}), rent({min_rent}-{max_rent}), size({min_size}-{max_size})")
         print(f"Location: estate_id={estate_id}, block_id={block_id}")
-        print(f"Amenities: {amenity_ids}, Furnishings: {furnishing_ids}")
+        print(f"Amenities: {amenity_ids} ({amenities_match}), Furnishings: {furnishing_ids} ({furnishings_match})")
         
-        # Base query - apartments without tenants
-        available_apartments = Apartment.objects.filter(tenant__isnull=True).select_related(
-            'block', 'block__estate'
-        ).prefetch_related('amenities', 'furnishings')
+        # Base query - apartments without tenants (indexed flag, no join on tenants)
+        available_apartments = Apartment.objects.filter(is_occupied=False)
         
         # Apply smart filters
         if min_rooms:
@@ -151,166 +201,317 @@ class ApartmentViewSet(viewsets.ModelViewSet):
             available_apartments = available_apartments.filter(block__estate_id=estate_id)
         if block_id:
             available_apartments = available_apartments.filter(block_id=block_id)
+        # Feature filters run as semi-joins on the M2M tables - no row duplication, no DISTINCT
         if amenity_ids:
-            available_apartments = available_apartments.filter(amenities__id__in=amenity_ids).distinct()
+            available_apartments = amenity_filter.apply(available_apartments, amenity_ids, amenities_match)
         if furnishing_ids:
-            available_apartments = available_apartments.filter(furnishings__id__in=furnishing_ids).distinct()
+            available_apartments = furnishing_filter.apply(available_apartments, furnishing_ids, furnishings_match)
         
-        print(f"Found {available_apartments.count()} available apartments after filtering")
+        # One grouped aggregate gives both the match count and the summary
+        total_available, summary = self._generate_availability_summary(available_apartments)
+        print(f"Found {total_available} available apartments after filtering")
         
-        # Build comprehensive response data
-        apartments_data = []
-        for apartment in available_apartments:
-            # Calculate apartment score for smart recommendations
-            apartment_score = self._calculate_apartment_score(apartment)
-            
-            # Get apartment amenities and furnishings
-            amenities_list = [
-                {
-                    'id': amenity.id,
-                    'name': amenity.name,
-                    'description': amenity.description
-                } for amenity in apartment.amenities.all()
-            ]
-            
-            furnishings_list = [
-                {
-                    'id': furnishing.id,
-                    'name': furnishing.name,
-                    'description': furnishing.description
-                } for furnishing in apartment.furnishings.all()
-            ]
-            
-            # Calculate derived metrics
-            rent_per_room = float(apartment.rent_amount) / apartment.number_of_rooms if apartment.rent_amount and apartment.number_of_rooms else 0
-            rent_per_sqm = float(apartment.rent_amount) / float(apartment.size) if apartment.rent_amount and apartment.size else 0
-            
-            apartment_data = {
-                'id': apartment.id,
-                'number': apartment.number,
-                'block': {
-                    'id': apartment.block.id,
-                    'name': apartment.block.name,
-                    'description': apartment.block.description,
-                    'estate': {
-                        'id': apartment.block.estate.id,
-                        'name': apartment.block.estate.name,
-                        'address': apartment.block.estate.address,
-                        'description': apartment.block.estate.description
-                    }
-                },
-                'rent_amount': str(apartment.rent_amount) if apartment.rent_amount else None,
-                'number_of_rooms': apartment.number_of_rooms,
-                'size': str(apartment.size) if apartment.size else None,
-                'color': apartment.color,
-                'description': apartment.description,
-                'amenities': amenities_list,
-                'furnishings': furnishings_list,
-                'created_at': apartment.created_at,
-                
-                # Smart allocation metrics
-                'allocation_score': apartment_score,
-                'rent_per_room': round(rent_per_room, 2) if rent_per_room else 0,
-                'rent_per_sqm': round(rent_per_sqm, 2) if rent_per_sqm else 0,
-                'is_furnished': len(furnishings_list) > 0,
-                'amenities_count': len(amenities_list),
-                'furnishings_count': len(furnishings_list),
-                
-                # Room categorization for smart matching
-                'room_category': self._categorize_by_rooms(apartment.number_of_rooms),
-                'size_category': self._categorize_by_size(apartment.size),
-                'rent_category': self._categorize_by_rent(apartment.rent_amount),
-                
-                # Full address for display
-                'full_address': f"{apartment.block.estate.name} - {apartment.block.name} - {apartment.number}",
-                'location_hierarchy': {
-                    'estate': apartment.block.estate.name,
-                    'block': apartment.block.name,
-                    'apartment': apartment.number
-                }
-            }
-            apartments_data.append(apartment_data)
+        filters_applied = {
+            'min_rooms': min_rooms,
+            'max_rooms': max_rooms,
+            'min_rent': min_rent,
+            'max_rent': max_rent,
+            'min_size': min_size,
+            'max_size': max_size,
+            'estate_id': estate_id,
+            'block_id': block_id,
+            'amenities': amenity_ids,
+            'amenities_match': amenities_match,
+            'furnishings': furnishing_ids,
+            'furnishings_match': furnishings_match,
+            'limit': limit
+        }
+        
+        # Summary-only mode never loads apartment rows
+        if summary_only:
+            return Response({
+                'total_available': total_available,
+                'summary': summary,
+                'filters_applied': filters_applied
+            })
+        
+        # Score and rank in the database so LIMIT can be applied before rows are loaded
+        ranked_apartments = self._annotate_allocation_score(available_apartments).order_by('-allocation_score', 'id')
+        ranked_apartments = self._narrow_available_queryset(ranked_apartments, fields, expand)
         
-        # Sort by allocation score (highest first) for smart recommendations
-        apartments_data.sort(key=lambda x: x['allocation_score'], reverse=True)
+        # Cursor mode: keyset pages over (allocation_score, id)
+        paginator = None
+        if 'cursor' in request.query_params or 'page_size' in request.query_params:
+            paginator = AllocationCursorPagination()
+            ranked_apartments = paginator.paginate_queryset(ranked_apartments, request)
+        elif limit:
+            ranked_apartments = ranked_apartments[:int(limit)]
         
-        # Generate summary statistics
-        summary = self._generate_availability_summary(apartments_data)
+        # Build comprehensive response data
+        apartments_data = [
+            self._build_available_apartment_data(apartment, fields, expand) for apartment in ranked_apartments
+        ]
 
-        print({
-            'total_available': len(apartments_data),
+        response_data = {
+            'total_available': total_available,
             'apartments': apartments_data,
             'summary': summary,
-            'filters_applied': {
-                'min_rooms': min_rooms,
-                'max_rooms': max_rooms,
-                'min_rent': min_rent,
-                'max_rent': max_rent,
-                'min_size': min_size,
-                'max_size': max_size,
-                'estate_id': estate_id,
-                'block_id': block_id,
-                'amenities': amenity_ids,
-                'furnishings': furnishing_ids
-            }
-        })
+            'filters_applied': filters_applied
+        }
+        if paginator:
+            response_data['pagination'] = paginator.get_pagination_data()
         
+        return Response(response_data)
+    
+    @action(detail=False, methods=['post'])
+    def match(self, request):
+        """Assign a batch of applicants to vacant apartments in one pass"""
+        strategy = request.data.get('strategy', STRATEGY_OPTIMAL)
+        estate_id = request.data.get('estate_id')
+        block_id = request.data.get('block_id')
+
+        try:
+            applicants = parse_applicants(request.data.get('applicants'))
+            if strategy not in STRATEGIES:
+                raise ValidationError({'strategy': f'Must be one of: {", ".join(STRATEGIES)}'})
+        except ValidationError as e:
+            return Response({
+                'error': 'Validation failed',
+                'details': e.detail
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        logger.debug('Matching %d applicants, strategy=%s, estate_id=%s, block_id=%s', len(applicants), strategy, estate_id, block_id)
+
+        # Vacant stock with the same allocation_score the available endpoint ranks by
+        vacant_apartments = Apartment.objects.filter(is_occupied=False)
+        if estate_id:
+            vacant_apartments = vacant_apartments.filter(block__estate_id=estate_id)
+        if block_id:
+            vacant_apartments = vacant_apartments.filter(block_id=block_id)
+        stock = load_vacant_stock(self._annotate_allocation_score(vacant_apartments).order_by('-allocation_score', 'id'))
+
+        # Score every applicant x apartment pair at once, then pick the assignment
+        scores, feasible = build_score_matrix(applicants, stock)
+        if strategy == STRATEGY_OPTIMAL:
+            pairs = assign_optimal(scores, feasible)
+        else:
+            pairs = assign_greedy(scores, feasible)
+        assigned = dict(pairs)
+        logger.debug('Placed %d of %d applicants across %d vacant apartments', len(assigned), len(applicants), len(stock['rows']))
+
+        assignments = []
+        unassigned = []
+        for i, applicant in enumerate(applicants):
+            candidates = int(feasible[i].sum())
+            if i not in assigned:
+                unassigned.append({
+                    'applicant_id': applicant['applicant_id'],
+                    'matching_apartments': candidates,
+                    'reason': 'no_matching_apartment' if candidates == 0 else 'matches_taken_by_other_applicants'
+                })
+                continue
+            j = assigned[i]
+            row = stock['rows'][j]
+            assignments.append({
+                'applicant_id': applicant['applicant_id'],
+                'score': round(float(scores[i, j]), 2),
+                'matching_apartments': candidates,
+                'apartment': {
+                    'id': row['id'],
+                    'number': row['number'],
+                    'block': {'id': row['block_id'], 'name': row['block__name']},
+                    'estate': {'id': row['block__estate_id'], 'name': row['block__estate__name']},
+                    'rent_amount': str(row['rent_amount']) if row['rent_amount'] else None,
+                    'number_of_rooms': row['number_of_rooms'],
+                    'size': str(row['size']) if row['size'] else None,
+                    'allocation_score': row['allocation_score'],
+                    'full_address': f"{row['block__estate__name']} - {row['block__name']} - {row['number']}"
+                }
+            })
+
         return Response({
-            'total_available': len(apartments_data),
-            'apartments': apartments_data,
-            'summary': summary,
-            'filters_applied': {
-                'min_rooms': min_rooms,
-                'max_rooms': max_rooms,
-                'min_rent': min_rent,
-                'max_rent': max_rent,
-                'min_size': min_size,
-                'max_size': max_size,
-                'estate_id': estate_id,
-                'block_id': block_id,
-                'amenities': amenity_ids,
-                'furnishings': furnishing_ids
+            'assignments': assignments,
+            'unassigned': unassigned,
+            'summary': {
+                'strategy': strategy,
+                'applicants': len(applicants),
+                'assigned': len(assignments),
+                'unassigned': len(unassigned),
+                'vacant_apartments': len(stock['rows']),
+                'total_score': round(sum(assignment['score'] for assignment in assignments), 2)
             }
         })
+
+    def _narrow_available_queryset(self, queryset, fields, expand):
+        """Load only the text columns and feature rows the requested fieldset renders"""
+        block_fields = subtree(fields, 'block')
+        estate_fields = subtree(block_fields, 'estate')
+        block_expanded = wants(fields, 'block') and 'block' in expand
+        estate_expanded = block_expanded and 'estate' in expand['block'] and wants(block_fields, 'estate')
+        
+        # Block and estate names are always needed for full_address/location_hierarchy
+        queryset = queryset.select_related('block', 'block__estate')
+        deferred = []
+        if not wants(fields, 'description'):
+            deferred.append('description')
+        if not (block_expanded and wants(block_fields, 'description')):
+            deferred.append('block__description')
+        for column in ('address', 'description'):
+            if not (estate_expanded and wants(estate_fields, column)):
+                deferred.append(f'block__estate__{column}')
+        if deferred:
+            queryset = queryset.defer(*deferred)
+        
+        for name, model in (('amenities', Amenity), ('furnishings', Furnishing)):
+            if not wants(fields, name):
+                continue
+            if name in expand:
+                columns = ['id'] + [column for column in ('name', 'description') if wants(subtree(fields, name), column)]
+            else:
+                columns = ['id']
+            queryset = queryset.prefetch_related(Prefetch(name, queryset=model.objects.only(*columns)))
+        return queryset
+    
+    def _build_feature_list(self, apartment, name, fields, expand):
+        if not wants(fields, name):
+            return None
+        features = getattr(apartment, name).all()
+        if name not in expand:
+            return [feature.id for feature in features]
+        feature_fields = subtree(fields, name)
+        return [
+            trim_fields({
+                'id': feature.id,
+                'name': feature.name if wants(feature_fields, 'name') else None,
+                'description': feature.description if wants(feature_fields, 'description') else None
+            }, feature_fields) for feature in features
+        ]
     
-    def _calculate_apartment_score(self, apartment):
-        """Calculate a score for apartment recommendation based on various factors"""
-        score = 0
+    def _build_available_apartment_data(self, apartment, fields=None, expand=None):
+        """Build the response payload for one available apartment"""
+        if expand is None:
+            expand = parse_fieldset(self.AVAILABLE_DEFAULT_EXPAND)
+        block = apartment.block
+        estate = block.estate
         
-        # Room score (more rooms = higher score, but diminishing returns)
-        if apartment.number_of_rooms:
-            score += min(apartment.number_of_rooms * 10, 50)  # Cap at 50 points
+        # Get apartment amenities and furnishings (ids unless expanded)
+        amenities_list = self._build_feature_list(apartment, 'amenities', fields, expand)
+        furnishings_list = self._build_feature_list(apartment, 'furnishings', fields, expand)
         
-        # Size score
-        if apartment.size:
-            if apartment.size >= 100:  # Large apartments
-                score += 30
-            elif apartment.size >= 50:  # Medium apartments
-                score += 20
-            else:  # Small apartments
-                score += 10
+        block_data = block.id
+        if 'block' in expand and wants(fields, 'block'):
+            block_fields = subtree(fields, 'block')
+            block_data = {
+                'id': block.id,
+                'name': block.name,
+                'description': block.description if wants(block_fields, 'description') else None,
+                'estate': estate.id
+            }
+            if 'estate' in expand['block'] and wants(block_fields, 'estate'):
+                estate_fields = subtree(block_fields, 'estate')
+                block_data['estate'] = {
+                    'id': estate.id,
+                    'name': estate.name,
+                    'address': estate.address if wants(estate_fields, 'address') else None,
+                    'description': estate.description if wants(estate_fields, 'description') else None
+                }
         
-        # Amenities score
-        amenities_count = apartment.amenities.count()
-        score += min(amenities_count * 5, 25)  # Cap at 25 points
+        # Calculate derived metrics
+        rent_per_room = float(apartment.rent_amount) / apartment.number_of_rooms if apartment.rent_amount and apartment.number_of_rooms else 0
+        rent_per_sqm = float(apartment.rent_amount) / float(apartment.size) if apartment.rent_amount and apartment.size else 0
         
-        # Furnishings score
-        furnishings_count = apartment.furnishings.count()
-        score += min(furnishings_count * 3, 15)  # Cap at 15 points
+        return trim_fields({
+            'id': apartment.id,
+            'number': apartment.number,
+            'block': block_data,
+            'rent_amount': str(apartment.rent_amount) if apartment.rent_amount else None,
+            'number_of_rooms': apartment.number_of_rooms,
+            'size': str(apartment.size) if apartment.size else None,
+            'color': apartment.color,
+            'description': apartment.description if wants(fields, 'description') else None,
+            'amenities': amenities_list,
+            'furnishings': furnishings_list,
+            'created_at': apartment.created_at,
+            
+            # Smart allocation metrics (feature counts come from the score annotation)
+            'allocation_score': apartment.allocation_score,
+            'rent_per_room': round(rent_per_room, 2) if rent_per_room else 0,
+            'rent_per_sqm': round(rent_per_sqm, 2) if rent_per_sqm else 0,
+            'is_furnished': apartment.furnishings_count > 0,
+            'amenities_count': apartment.amenities_count,
+            'furnishings_count': apartment.furnishings_count,
+            
+            # Room categorization for smart matching
+            'room_category': self._categorize_by_rooms(apartment.number_of_rooms),
+            'size_category': self._categorize_by_size(apartment.size),
+            'rent_category': self._categorize_by_rent(apartment.rent_amount),
+            
+            # Full address for display
+            'full_address': f"{estate.name} - {block.name} - {apartment.number}",
+            'location_hierarchy': {
+                'estate': estate.name,
+                'block': block.name,
+                'apartment': apartment.number
+            }
+        }, fields)
+    
+    def _annotate_feature_counts(self, queryset):
+        """Annotate amenities_count and furnishings_count without joining the M2M tables"""
+        # Correlated subqueries so the M2M joins don't multiply rows or force a
+        # GROUP BY over every apartment column
+        amenities_count = Apartment.amenities.through.objects.filter(
+            apartment_id=OuterRef('pk')
+        ).values('apartment_id').annotate(c=Count('*')).values('c')
+        furnishings_count = Apartment.furnishings.through.objects.filter(
+            apartment_id=OuterRef('pk')
+        ).values('apartment_id').annotate(c=Count('*')).values('c')
         
-        # Rent efficiency score (lower rent per room = higher score)
-        if apartment.rent_amount and apartment.number_of_rooms:
-            rent_per_room = float(apartment.rent_amount) / apartment.number_of_rooms
-            if rent_per_room < 5000:  # Very affordable
-                score += 20
-            elif rent_per_room < 10000:  # Affordable
-                score += 15
-            elif rent_per_room < 15000:  # Moderate
-                score += 10
-            else:  # Expensive
-                score += 5
+        return queryset.annotate(
+            amenities_count=Coalesce(Subquery(amenities_count, output_field=IntegerField()), 0),
+            furnishings_count=Coalesce(Subquery(furnishings_count, output_field=IntegerField()), 0),
+        )
+    
+    def _annotate_allocation_score(self, queryset):
+        """Annotate apartments with a recommendation score computed in SQL"""
+        queryset = self._annotate_feature_counts(queryset)
         
-        return score
+        has_rooms = Q(number_of_rooms__isnull=False) & ~Q(number_of_rooms=0)
+        has_rent = Q(rent_amount__isnull=False) & ~Q(rent_amount=0)
+        
+        return queryset.annotate(
+            # Room score (more rooms = higher score, but diminishing returns, cap at 50)
+            room_score=Case(
+                When(number_of_rooms__isnull=False, then=Least(F('number_of_rooms') * 10, Value(50))),
+                default=Value(0),
+                output_field=IntegerField()
+            ),
+            # Size score
+            size_score=Case(
+                When(Q(size__isnull=True) | Q(size=0), then=Value(0)),
+                When(size__gte=100, then=Value(30)),  # Large apartments
+                When(size__gte=50, then=Value(20)),  # Medium apartments
+                default=Value(10),  # Small apartments
+                output_field=IntegerField()
+            ),
+            # Rent efficiency score (lower rent per room = higher score);
+            # rent / rooms < x is compared as rent < x * rooms to avoid a division
+            rent_score=Case(
+                When(~(has_rooms & has_rent), then=Value(0)),
+                When(rent_amount__lt=F('number_of_rooms') * 5000, then=Value(20)),  # Very affordable
+                When(rent_amount__lt=F('number_of_rooms') * 10000, then=Value(15)),  # Affordable
+                When(rent_amount__lt=F('number_of_rooms') * 15000, then=Value(10)),  # Moderate
+                default=Value(5),  # Expensive
+                output_field=IntegerField()
+            ),
+        ).annotate(
+            allocation_score=(
+                F('room_score')
+                + F('size_score')
+                + Least(F('amenities_count') * 5, Value(25))  # Cap at 25 points
+                + Least(F('furnishings_count') * 3, Value(15))  # Cap at 15 points
+                + F('rent_score')
+            )
+        )
     
     def _categorize_by_rooms(self, rooms):
         """Categorize apartment by number of rooms"""
@@ -357,127 +558,180 @@ class ApartmentViewSet(viewsets.ModelViewSet):
         else:
             return 'luxury'
     
-    def _generate_availability_summary(self, apartments_data):
-        """Generate summary statistics for available apartments"""
-        if not apartments_data:
-            return {}
+    # (category, condition) buckets mirroring _categorize_by_rooms/_size/_rent,
+    # evaluated in SQL by _generate_availability_summary
+    ROOM_BUCKETS = [
+        ('unknown', Q(number_of_rooms__isnull=True) | Q(number_of_rooms=0)),
+        ('studio', Q(number_of_rooms=1)),
+        ('1-bedroom', Q(number_of_rooms=2)),
+        ('2-bedroom', Q(number_of_rooms=3)),
+        ('3-bedroom', Q(number_of_rooms=4)),
+        ('large-family', Q(number_of_rooms__gte=5)),
+        ('other', Q(number_of_rooms__lt=0)),
+    ]
+    SIZE_BUCKETS = [
+        ('unknown', Q(size__isnull=True) | Q(size=0)),
+        ('small', ~Q(size=0) & Q(size__lt=30)),
+        ('medium', Q(size__gte=30, size__lt=60)),
+        ('large', Q(size__gte=60, size__lt=100)),
+        ('extra-large', Q(size__gte=100)),
+    ]
+    RENT_BUCKETS = [
+        ('unknown', Q(rent_amount__isnull=True) | Q(rent_amount=0)),
+        ('budget', ~Q(rent_amount=0) & Q(rent_amount__lt=10000)),
+        ('affordable', Q(rent_amount__gte=10000, rent_amount__lt=20000)),
+        ('moderate', Q(rent_amount__gte=20000, rent_amount__lt=35000)),
+        ('premium', Q(rent_amount__gte=35000, rent_amount__lt=50000)),
+        ('luxury', Q(rent_amount__gte=50000)),
+    ]
+    
+    def _generate_availability_summary(self, queryset):
+        """Generate (total, summary statistics) for available apartments in one grouped query"""
+        has_rent = Q(rent_amount__isnull=False) & ~Q(rent_amount=0)
+        has_size = Q(size__isnull=False) & ~Q(size=0)
+        has_furnishings = Exists(Apartment.furnishings.through.objects.filter(apartment_id=OuterRef('pk')))
         
-        # Count by categories
-        room_categories = {}
-        size_categories = {}
-        rent_categories = {}
-        estates = {}
+        aggregates = {
+            'total': Count('id'),
+            'furnished': Count('id', filter=Q(has_furnishings)),
+            'rent_sum': Sum('rent_amount', filter=has_rent),
+            'rent_count': Count('id', filter=has_rent),
+            'rent_min': Min('rent_amount', filter=has_rent),
+            'rent_max': Max('rent_amount', filter=has_rent),
+            'size_sum': Sum('size', filter=has_size),
+            'size_count': Count('id', filter=has_size),
+            'size_min': Min('size', filter=has_size),
+            'size_max': Max('size', filter=has_size),
+        }
+        buckets = {'room': self.ROOM_BUCKETS, 'size': self.SIZE_BUCKETS, 'rent': self.RENT_BUCKETS}
+        for prefix, bucket_list in buckets.items():
+            for category, condition in bucket_list:
+                aggregates[f'{prefix}:{category}'] = Count('id', filter=condition)
         
-        total_rent = 0
-        total_size = 0
-        rent_count = 0
-        size_count = 0
+        # Grouped per estate so by_estate comes from the same query; the other
+        # figures are rolled up from the (few) estate rows in Python
+        rows = list(
+            queryset.prefetch_related(None).order_by().values('block__estate__name').annotate(**aggregates)
+        )
         
-        for apt in apartments_data:
-            # Room categories
-            room_cat = apt['room_category']
-            room_categories[room_cat] = room_categories.get(room_cat, 0) + 1
-            
-            # Size categories
-            size_cat = apt['size_category']
-            size_categories[size_cat] = size_categories.get(size_cat, 0) + 1
-            
-            # Rent categories
-            rent_cat = apt['rent_category']
-            rent_categories[rent_cat] = rent_categories.get(rent_cat, 0) + 1
-            
-            # Estates
-            estate_name = apt['block']['estate']['name']
-            estates[estate_name] = estates.get(estate_name, 0) + 1
-            
-            # Calculate averages
-            if apt['rent_amount']:
-                total_rent += float(apt['rent_amount'])
-                rent_count += 1
-            
-            if apt['size']:
-                total_size += float(apt['size'])
-                size_count += 1
+        total = sum(row['total'] for row in rows)
+        if not total:
+            return 0, {}
         
-        return {
-            'by_room_category': room_categories,
-            'by_size_category': size_categories,
-            'by_rent_category': rent_categories,
-            'by_estate': estates,
+        def category_counts(prefix, bucket_list):
+            counts = {}
+            for category, _condition in bucket_list:
+                count = sum(row[f'{prefix}:{category}'] for row in rows)
+                if count:
+                    counts[category] = count
+            return counts
+        
+        def value_range(field):
+            mins = [row[f'{field}_min'] for row in rows if row[f'{field}_min'] is not None]
+            maxes = [row[f'{field}_max'] for row in rows if row[f'{field}_max'] is not None]
+            return {
+                'min': float(min(mins)) if mins else None,
+                'max': float(max(maxes)) if maxes else None
+            }
+        
+        rent_count = sum(row['rent_count'] for row in rows)
+        size_count = sum(row['size_count'] for row in rows)
+        total_rent = sum(float(row['rent_sum'] or 0) for row in rows)
+        total_size = sum(float(row['size_sum'] or 0) for row in rows)
+        furnished_count = sum(row['furnished'] for row in rows)
+        
+        return total, {
+            'by_room_category': category_counts('room', self.ROOM_BUCKETS),
+            'by_size_category': category_counts('size', self.SIZE_BUCKETS),
+            'by_rent_category': category_counts('rent', self.RENT_BUCKETS),
+            'by_estate': {row['block__estate__name']: row['total'] for row in rows},
             'average_rent': round(total_rent / rent_count, 2) if rent_count > 0 else 0,
             'average_size': round(total_size / size_count, 2) if size_count > 0 else 0,
-            'furnished_count': sum(1 for apt in apartments_data if apt['is_furnished']),
-            'unfurnished_count': sum(1 for apt in apartments_data if not apt['is_furnished'])
+            'rent_range': value_range('rent'),
+            'size_range': value_range('size'),
+            'furnished_count': furnished_count,
+            'unfurnished_count': total - furnished_count
         }
     
-class AmenityViewSet(viewsets.ModelViewSet):
+class AmenityViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Amenity.objects.all()
     serializer_class = AmenitySerializer
     permission_classes = [IsAuthenticated]
 
-class FurnishingViewSet(viewsets.ModelViewSet):
+class FurnishingViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Furnishing.objects.all()
     serializer_class = FurnishingSerializer
     permission_classes = [IsAuthenticated]
 
-class OwnerDashboardViewSet(viewsets.ViewSet):
+class OwnerDashboardViewSet(EstateScopeMixin, viewsets.ViewSet):
     """
-    ViewSet for Owner Dashboard APIs providing comprehensive property management insights
+    ViewSet for Owner Dashboard APIs providing comprehensive property management insights.
+    Users with an owners.Owner record only see their own estates.
     """
     permission_classes = [IsAuthenticated]
     
     @action(detail=False, methods=['get'], url_path='occupancy-status')
+    @cached_response('owner-dashboard', DASHBOARD_CACHE_MODELS, vary_on=get_request_estate_scope)
     def occupancy_status(self, request):
         """Get occupancy status across all estates"""
         estate_id = request.query_params.get('estate_id')
         
         # Base queryset
-        estates_queryset = Estate.objects.all()
+        estates_queryset = self.scope_to_owner(Estate.objects.all(), 'id')
         if estate_id:
             estates_queryset = estates_queryset.filter(id=estate_id)
         
+        # One grouped query for the whole estate -> block tree. Grouping from
+        # Estate (LEFT JOINs) keeps estates without blocks and empty blocks.
+        block_rows = estates_queryset.values('id', 'name', 'block__id', 'block__name').annotate(
+            total=Count('block__apartment'),
+            occupied=Count('block__apartment', filter=Q(block__apartment__is_occupied=True))
+        ).order_by('id', 'block__id')
+        
         estates_data = []
+        estates_by_id = {}
         total_apartments = 0
         total_occupied = 0
         
-        for estate in estates_queryset:
-            # Get blocks for this estate
-            blocks_data = []
-            estate_apartments = 0
-            estate_occupied = 0
-            
-            for block in Block.objects.filter(estate=estate):
-                # Count apartments and occupied ones for this block
-                block_apartments = Apartment.objects.filter(block=block).count()
-                block_occupied = Apartment.objects.filter(block=block, tenant__isnull=False).count()
-
-                blocks_data.append({
-                    'block_id': block.id,
-                    'block_name': block.name,
-                    'total_apartments': block_apartments,
-                    'occupied_apartments': block_occupied,
-                    'vacant_apartments': block_apartments - block_occupied,
-                    'occupancy_rate': round((block_occupied / block_apartments * 100) if block_apartments > 0 else 0, 2)
-                })
-                
-                estate_apartments += block_apartments
-                estate_occupied += block_occupied
-            
-            estates_data.append({
-                'estate_id': estate.id,
-                'estate_name': estate.name,
-                'total_apartments': estate_apartments,
-                'occupied_apartments': estate_occupied,
-                'vacant_apartments': estate_apartments - estate_occupied,
-                'occupancy_rate': round((estate_occupied / estate_apartments * 100) if estate_apartments > 0 else 0, 2),
-                'blocks': blocks_data
+        for row in block_rows:
+            estate_data = estates_by_id.get(row['id'])
+            if estate_data is None:
+                estate_data = estates_by_id[row['id']] = {
+                    'estate_id': row['id'],
+                    'estate_name': row['name'],
+                    'total_apartments': 0,
+                    'occupied_apartments': 0,
+                    'vacant_apartments': 0,
+                    'occupancy_rate': 0,
+                    'blocks': []
+                }
+                estates_data.append(estate_data)
+            if row['block__id'] is None:
+                continue
+            
+            block_apartments = row['total']
+            block_occupied = row['occupied']
+            estate_data['blocks'].append({
+                'block_id': row['block__id'],
+                'block_name': row['block__name'],
+                'total_apartments': block_apartments,
+                'occupied_apartments': block_occupied,
+                'vacant_apartments': block_apartments - block_occupied,
+                'occupancy_rate': round((block_occupied / block_apartments * 100) if block_apartments > 0 else 0, 2)
             })
-            
+            estate_data['total_apartments'] += block_apartments
+            estate_data['occupied_apartments'] += block_occupied
+        
+        for estate_data in estates_data:
+            estate_apartments = estate_data['total_apartments']
+            estate_occupied = estate_data['occupied_apartments']
+            estate_data['vacant_apartments'] = estate_apartments - estate_occupied
+            estate_data['occupancy_rate'] = round((estate_occupied / estate_apartments * 100) if estate_apartments > 0 else 0, 2)
             total_apartments += estate_apartments
             total_occupied += estate_occupied
         
         return Response({
-            'total_estates': estates_queryset.count(),
+            'total_estates': len(estates_data),
             'total_apartments': total_apartments,
             'occupied_apartments': total_occupied,
             'vacant_apartments': total_apartments - total_occupied,
@@ -486,31 +740,31 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
         })
     
     @action(detail=False, methods=['get'], url_path='payment-dashboard-summary')
+    @cached_response('owner-dashboard', DASHBOARD_CACHE_MODELS, vary_on=get_request_estate_scope)
     def payment_dashboard_summary(self, request):
         """Get payment dashboard summary"""
         try:
-            from payments.models import Payment
-            
-            # Get current month payments
-            current_month = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            
-            # Calculate payment statistics
-            payments_queryset = Payment.objects.filter(created_at__gte=current_month)
-            
-            paid_payments = payments_queryset.filter(status__name='PAID').count()
-            pending_payments = payments_queryset.filter(status__name='PENDING').count()
-            overdue_payments = payments_queryset.filter(
-                status__name='PENDING', 
-                due_date__lt=timezone.now().date()
-            ).count()
-            
-            total_collected = payments_queryset.filter(status__name='PAID').aggregate(
-                total=Sum('amount')
-            )['total'] or 0
+            # Current (local) month from the daily payment rollup
+            current_month = timezone.localdate().replace(day=1)
+            paid_ids = PAYMENT_STATUSES.ids('PAID')
+            overdue_ids = overdue_status_ids()
+            # Overdue payments are still pending payment
+            pending_ids = PAYMENT_STATUSES.ids('PENDING') + overdue_ids
+            totals = self.scope_to_owner(
+                PaymentDailyRollup.objects.filter(date__gte=current_month), 'estate'
+            ).aggregate(
+                paid_payments=Sum('payment_count', filter=Q(status_id__in=paid_ids)),
+                pending_payments=Sum('payment_count', filter=Q(status_id__in=pending_ids)),
+                overdue_payments=Sum('payment_count', filter=Q(status_id__in=overdue_ids)),
+                total_collected=Sum('total_amount', filter=Q(status_id__in=paid_ids)),
+                total_expected=Sum('total_amount')
+            )
             
-            total_expected = payments_queryset.aggregate(
-                total=Sum('amount')
-            )['total'] or 0
+            paid_payments = totals['paid_payments'] or 0
+            pending_payments = totals['pending_payments'] or 0
+            overdue_payments = totals['overdue_payments'] or 0
+            total_collected = totals['total_collected'] or 0
+            total_expected = totals['total_expected'] or 0
             
             payment_rate = round((paid_payments / (paid_payments + pending_payments) * 100) if (paid_payments + pending_payments) > 0 else 0, 2)
 
@@ -547,95 +801,104 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
             })
     
     @action(detail=False, methods=['get'], url_path='estate-payment-status')
+    @cached_response('owner-dashboard', DASHBOARD_CACHE_MODELS, vary_on=get_request_estate_scope)
     def estate_payment_status(self, request):
         """Get payment status by estate"""
+        # Every figure is a correlated subquery on the estate row, so the whole
+        # response is one query however many estates there are
+        estates = self.scope_to_owner(Estate.objects.all(), 'id').annotate(
+            total_apartments=self._per_estate(Apartment.objects.all(), 'block__estate', Count('id')),
+            occupied_apartments=self._per_estate(
+                Apartment.objects.all(), 'block__estate', Count('id', filter=Q(is_occupied=True))
+            ),
+        )
+        
         try:
             from payments.models import Payment
             
-            estates_data = []
             current_month = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            
-            for estate in Estate.objects.all():
-                # Get all apartments in this estate
-                apartments = Apartment.objects.filter(block__estate=estate)
-                total_apartments = apartments.count()
-                occupied_apartments = apartments.filter(tenant__isnull=False).count()
-                
-                # Get payments for this estate's tenants
-                estate_payments = Payment.objects.filter(
-                    tenant__apartment__block__estate=estate,
-                    created_at__gte=current_month
-                )
-                
-                total_expected = estate_payments.aggregate(total=Sum('amount'))['total'] or 0
-                collected = estate_payments.filter(status__name='PAID').aggregate(total=Sum('amount'))['total'] or 0
-                
-                overdue_count = estate_payments.filter(
-                    status__name='PENDING',
-                    due_date__lt=timezone.now().date()
-                ).count()
-                
-                pending_count = estate_payments.filter(status__name='PENDING').count()
-                
-                collection_rate = round((float(collected) / float(total_expected) * 100) if total_expected > 0 else 0, 2)
-                
-                estates_data.append({
-                    'estate_id': estate.id,
-                    'estate_name': estate.name,
-                    'total_apartments': total_apartments,
-                    'occupied_apartments': occupied_apartments,
-                    'total_rent_expected': float(total_expected),
-                    'rent_collected': float(collected),
-                    'collection_rate': collection_rate,
-                    'overdue_count': overdue_count,
-                    'pending_count': pending_count
-                })
-            
-            return Response(estates_data)
-            
+            month_payments = Payment.objects.filter(created_at__gte=current_month)
+            estate_field = 'tenant__apartment__block__estate'
+            paid_ids = PAYMENT_STATUSES.ids('PAID')
+            overdue_ids = overdue_status_ids()
+            # Overdue payments are still pending payment
+            pending_ids = PAYMENT_STATUSES.ids('PENDING') + overdue_ids
+            money = DecimalField(max_digits=12, decimal_places=2)
+            estates = estates.annotate(
+                total_expected=self._per_estate(month_payments, estate_field, Sum('amount'), money),
+                collected=self._per_estate(
+                    month_payments, estate_field, Sum('amount', filter=Q(status_id__in=paid_ids)), money
+                ),
+                overdue_count=self._per_estate(
+                    month_payments, estate_field,
+                    Count('id', filter=Q(status_id__in=overdue_ids))
+                ),
+                pending_count=self._per_estate(
+                    month_payments, estate_field, Count('id', filter=Q(status_id__in=pending_ids))
+                ),
+            )
         except ImportError:
             # Fallback data if payments app not available
-            estates_data = []
-            for estate in Estate.objects.all():
-                apartments = Apartment.objects.filter(block__estate=estate)
-                estates_data.append({
-                    'estate_id': estate.id,
-                    'estate_name': estate.name,
-                    'total_apartments': apartments.count(),
-                    'occupied_apartments': apartments.filter(tenant__isnull=False).count(),
-                    'total_rent_expected': 0,
-                    'rent_collected': 0,
-                    'collection_rate': 0,
-                    'overdue_count': 0,
-                    'pending_count': 0
-                })
-            return Response(estates_data)
+            estates = estates.annotate(
+                total_expected=Value(0), collected=Value(0), overdue_count=Value(0), pending_count=Value(0)
+            )
+        
+        estates_data = []
+        for estate in estates:
+            total_expected = estate.total_expected
+            collected = estate.collected
+            collection_rate = round((float(collected) / float(total_expected) * 100) if total_expected > 0 else 0, 2)
+            
+            estates_data.append({
+                'estate_id': estate.id,
+                'estate_name': estate.name,
+                'total_apartments': estate.total_apartments,
+                'occupied_apartments': estate.occupied_apartments,
+                'total_rent_expected': float(total_expected),
+                'rent_collected': float(collected),
+                'collection_rate': collection_rate,
+                'overdue_count': estate.overdue_count,
+                'pending_count': estate.pending_count
+            })
+        
+        return Response(estates_data)
+    
+    def _per_estate(self, queryset, estate_field, aggregate, output_field=None):
+        """``aggregate`` over the rows of ``queryset`` belonging to the outer estate, 0 when there are none"""
+        output_field = output_field or IntegerField()
+        values = queryset.filter(**{estate_field: OuterRef('pk')}).order_by().values(
+            estate_field
+        ).annotate(value=aggregate).values('value')
+        return Coalesce(Subquery(values, output_field=output_field), Value(0), output_field=output_field)
     
     @action(detail=False, methods=['get'], url_path='complaint-analytics')
+    @cached_response('owner-dashboard', DASHBOARD_CACHE_MODELS, vary_on=get_request_estate_scope)
     def complaint_analytics(self, request):
         """Get complaint analytics"""
         try:
-            current_month = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            
-            # Get all complaints
-            complaints_queryset = Complaint.objects.all()
-            total_complaints = complaints_queryset.count()
-            
-            # Status counts - use proper foreign key filtering
-            open_complaints = complaints_queryset.filter(status__name='OPEN').count()
-            in_progress_complaints = complaints_queryset.filter(status__name='IN_PROGRESS').count()
-            resolved_complaints = complaints_queryset.filter(status__name='RESOLVED').count()
-            closed_complaints = complaints_queryset.filter(status__name='CLOSED').count()
-            
-            # This month complaints
-            complaints_this_month = complaints_queryset.filter(
-                created_at__gte=current_month
-            ).count()
+            current_month = timezone.localdate().replace(day=1)
+            
+            # Status and this-month counts from the daily complaint rollup in one query
+            complaint_rollups = self.scope_to_owner(ComplaintDailyRollup.objects.all(), 'estate')
+            totals = complaint_rollups.aggregate(
+                total=Sum('complaint_count'),
+                open=Sum('complaint_count', filter=Q(status_id__in=COMPLAINT_STATUSES.ids('OPEN'))),
+                in_progress=Sum('complaint_count', filter=Q(status_id__in=COMPLAINT_STATUSES.ids('IN_PROGRESS'))),
+                resolved=Sum('complaint_count', filter=Q(status_id__in=COMPLAINT_STATUSES.ids('RESOLVED'))),
+                closed=Sum('complaint_count', filter=Q(status_id__in=COMPLAINT_STATUSES.ids('CLOSED'))),
+                this_month=Sum('complaint_count', filter=Q(date__gte=current_month))
+            )
+            total_complaints = totals['total'] or 0
+            open_complaints = totals['open'] or 0
+            in_progress_complaints = totals['in_progress'] or 0
+            resolved_complaints = totals['resolved'] or 0
+            closed_complaints = totals['closed'] or 0
+            complaints_this_month = totals['this_month'] or 0
             
             # Category breakdown using foreign key relationship
-            complaints_by_category = complaints_queryset.values('category__name').annotate(
-                count=Count('id')
-            ).order_by('-count')
+            complaints_by_category = complaint_rollups.values('category__name').annotate(
+                count=Sum('complaint_count')
+            ).filter(count__gt=0).order_by('-count')
             category_dict = {item['category__name']: item['count'] for item in complaints_by_category if item['category__name']}
             
             # Calculate average resolution time (mock data for now)
@@ -666,6 +929,7 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
             })
     
     @action(detail=False, methods=['get'], url_path='tenancy-expiry-dashboard')
+    @cached_response('owner-dashboard', DASHBOARD_CACHE_MODELS, vary_on=get_request_estate_scope)
     def tenancy_expiry_dashboard(self, request):
         """Get tenancy expiry dashboard data"""
         try:
@@ -674,7 +938,7 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
             this_month_end = current_date + timedelta(days=30)
             
             # Get tenants with lease end dates - use correct field names
-            tenants_queryset = Tenant.objects.filter(lease_end__isnull=False)
+            tenants_queryset = self.scope_to_owner(Tenant.objects.filter(lease_end__isnull=False), 'apartment__block__estate')
             
             # Expiring this month
             expiring_this_month = tenants_queryset.filter(
@@ -731,6 +995,7 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
             })
     
     @action(detail=False, methods=['get'], url_path='payment-alerts')
+    @cached_response('owner-dashboard', DASHBOARD_CACHE_MODELS, vary_on=get_request_estate_scope)
     def payment_alerts(self, request):
         """Get payment alerts for overdue and upcoming payments"""
         try:
@@ -738,12 +1003,14 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
             
             current_date = timezone.now().date()
             upcoming_threshold = current_date + timedelta(days=7)
+            paid_ids = PAYMENT_STATUSES.ids('PAID')
+            pending_ids = PAYMENT_STATUSES.ids('PENDING')
             
             # Overdue payments - use proper foreign key filtering
-            overdue_payments = Payment.objects.filter(
-                status__name='PENDING',
-                due_date__lt=current_date
-            ).select_related('tenant', 'tenant__apartment', 'tenant__apartment__block', 'tenant__apartment__block__estate')
+            payments = self.scope_to_owner(Payment.objects.all(), 'tenant__apartment__block__estate')
+            overdue_payments = payments.filter(
+                status_id__in=overdue_status_ids()
+            ).select_related('tenant', 'tenant__apartment', 'tenant__apartment__block', 'tenant__apartment__block__estate').order_by('due_date')
             
             overdue_alerts = []
             for payment in overdue_payments[:20]:  # Limit for performance
@@ -760,8 +1027,8 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
                 })
             
             # Upcoming payments
-            upcoming_payments = Payment.objects.filter(
-                status__name='PENDING',
+            upcoming_payments = payments.filter(
+                status_id__in=pending_ids,
                 due_date__gte=current_date,
                 due_date__lte=upcoming_threshold
             ).select_related('tenant', 'tenant__apartment', 'tenant__apartment__block', 'tenant__apartment__block__estate')
@@ -780,8 +1047,8 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
                 })
             
             # Recent payments (last 10)
-            recent_payments = Payment.objects.filter(
-                status__name='PAID'
+            recent_payments = payments.filter(
+                status_id__in=paid_ids
             ).select_related('tenant', 'tenant__apartment', 'tenant__apartment__block', 'tenant__apartment__block__estate').order_by('-paid_at')[:10]
             
             recent_payments_list = []
@@ -810,6 +1077,7 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
             })
     
     @action(detail=False, methods=['get'], url_path='payment-report')
+    @cached_response('owner-dashboard', DASHBOARD_CACHE_MODELS, vary_on=get_request_estate_scope)
     def payment_report(self, request):
         """Get detailed payment report for a date range"""
         start_date = request.query_params.get('start_date')
@@ -823,7 +1091,6 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
         
         try:
             from datetime import datetime
-            from payments.models import Payment
             
             # Parse dates
             start = datetime.strptime(start_date, '%Y-%m-%d').date()
@@ -836,52 +1103,58 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
                     'code': 'INVALID_DATE_RANGE'
                 }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
             
-            # Get payments in date range
-            payments_queryset = Payment.objects.filter(
-                created_at__date__gte=start,
-                created_at__date__lte=end
-            )
+            # Daily payment rollup rows in the date range
+            payments_queryset = self.scope_to_owner(PaymentDailyRollup.objects.filter(date__gte=start, date__lte=end), 'estate')
+            
+            # Paid/pending/overdue buckets as conditional sums, shared by every grouping below
+            paid_ids = PAYMENT_STATUSES.ids('PAID')
+            overdue_ids = overdue_status_ids()
+            # Overdue payments are still pending payment
+            pending_ids = PAYMENT_STATUSES.ids('PENDING') + overdue_ids
+            buckets = {
+                'payments': Coalesce(Sum('payment_count'), 0),
+                'total': Sum('total_amount'),
+                'paid': Sum('total_amount', filter=Q(status_id__in=paid_ids)),
+                'pending': Sum('total_amount', filter=Q(status_id__in=pending_ids)),
+                'overdue': Sum('total_amount', filter=Q(status_id__in=overdue_ids)),
+            }
             
-            total_payments = payments_queryset.count()
-            total_amount = payments_queryset.aggregate(total=Sum('amount'))['total'] or 0
-            paid_amount = payments_queryset.filter(status__name='PAID').aggregate(total=Sum('amount'))['total'] or 0
-            pending_amount = payments_queryset.filter(status__name='PENDING').aggregate(total=Sum('amount'))['total'] or 0
-            overdue_amount = payments_queryset.filter(
-                status__name='PENDING', 
-                due_date__lt=timezone.now().date()
-            ).aggregate(total=Sum('amount'))['total'] or 0
+            totals = payments_queryset.aggregate(**buckets)
+            total_payments = totals['payments']
+            total_amount = totals['total'] or 0
+            paid_amount = totals['paid'] or 0
+            pending_amount = totals['pending'] or 0
+            overdue_amount = totals['overdue'] or 0
             
             collection_rate = round((float(paid_amount) / float(total_amount) * 100) if total_amount > 0 else 0, 2)
             
-            # Estate breakdown
+            # Estate breakdown - one query grouped by estate
+            estate_rows = payments_queryset.filter(
+                estate__isnull=False
+            ).values('estate', 'estate__name').annotate(**buckets).order_by('estate')
+            
             estates_data = []
-            for estate in Estate.objects.all():
-                estate_payments = payments_queryset.filter(tenant__apartment__block__estate=estate)
-                estate_total = estate_payments.aggregate(total=Sum('amount'))['total'] or 0
-                estate_paid = estate_payments.filter(status__name='PAID').aggregate(total=Sum('amount'))['total'] or 0
-                estate_pending = estate_payments.filter(status__name='PENDING').aggregate(total=Sum('amount'))['total'] or 0
-                estate_overdue = estate_payments.filter(
-                    status__name='PENDING',
-                    due_date__lt=timezone.now().date()
-                ).aggregate(total=Sum('amount'))['total'] or 0
+            for row in estate_rows:
+                estate_total = row['total'] or 0
+                estate_paid = row['paid'] or 0
                 
                 if estate_total > 0:  # Only include estates with payments
                     estates_data.append({
-                        'estate_id': estate.id,
-                        'estate_name': estate.name,
-                        'payments': estate_payments.count(),
+                        'estate_id': row['estate'],
+                        'estate_name': row['estate__name'],
+                        'payments': row['payments'],
                         'total_amount': float(estate_total),
                         'paid_amount': float(estate_paid),
-                        'pending_amount': float(estate_pending),
-                        'overdue_amount': float(estate_overdue),
+                        'pending_amount': float(row['pending'] or 0),
+                        'overdue_amount': float(row['overdue'] or 0),
                         'collection_rate': round((float(estate_paid) / float(estate_total) * 100) if estate_total > 0 else 0, 2)
                     })
             
             # Payment methods breakdown
             payment_methods = payments_queryset.values('payment_method').annotate(
-                count=Count('id'),
-                total_amount=Sum('amount')
-            ).order_by('-total_amount')
+                count=Sum('payment_count'),
+                total_amount=Sum('total_amount')
+            ).filter(count__gt=0).order_by('-total_amount')
             
             methods_data = [
                 {
@@ -891,29 +1164,29 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
                 } for method in payment_methods
             ]
             
-            # Monthly breakdown
+            # Monthly breakdown - one query grouped by month, empty months filled in below
+            month_rows = payments_queryset.annotate(
+                month=TruncMonth('date')
+            ).values('month').annotate(**buckets).order_by('month')
+            months = {row['month'].strftime('%Y-%m'): row for row in month_rows}
+            
             monthly_data = []
             current = start.replace(day=1)
             while current <= end:
-                month_end = (current.replace(month=current.month + 1) if current.month < 12 
-                           else current.replace(year=current.year + 1, month=1)) - timedelta(days=1)
-                
-                month_payments = payments_queryset.filter(
-                    created_at__date__gte=current,
-                    created_at__date__lte=min(month_end, end)
-                )
-                
-                month_total = month_payments.aggregate(total=Sum('amount'))['total'] or 0
-                month_paid = month_payments.filter(status__name='PAID').aggregate(total=Sum('amount'))['total'] or 0
+                month_key = current.strftime('%Y-%m')
+                month_row = months.get(month_key, {})
+                month_total = month_row.get('total') or 0
+                month_paid = month_row.get('paid') or 0
                 
                 monthly_data.append({
-                    'month': current.strftime('%Y-%m'),
-                    'total_payments': month_payments.count(),
+                    'month': month_key,
+                    'total_payments': month_row.get('payments', 0),
                     'total_amount': float(month_total),
                     'collection_rate': round((float(month_paid) / float(month_total) * 100) if month_total > 0 else 0, 2)
                 })
                 
-                current = month_end + timedelta(days=1)
+                current = (current.replace(month=current.month + 1) if current.month < 12
+                           else current.replace(year=current.year + 1, month=1))
             
             return Response({
                 'total_payments': total_payments,
@@ -946,6 +1219,7 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
     
     @action(detail=False, methods=['get'], url_path='occupancy-report')
+    @cached_response('owner-dashboard', DASHBOARD_CACHE_MODELS, vary_on=get_request_estate_scope)
     def occupancy_report(self, request):
         """Get detailed occupancy report for a date range"""
         start_date = request.query_params.get('start_date')
@@ -969,54 +1243,55 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
                     'detail': 'End date must be after start date'
                 }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
             
-            # Generate occupancy trends (daily snapshots)
-            occupancy_trends = []
-            current = start
-            while current <= end:
-                # Get tenancies active on this date - use correct field names
-                active_tenancies = Tenant.objects.filter(
-                    lease_start__lte=current,
-                    lease_end__gte=current
-                ).count()
-                
-                total_apartments = Apartment.objects.count()
-                
-                occupancy_trends.append({
-                    'date': current.isoformat(),
-                    'total_apartments': total_apartments,
-                    'occupied': active_tenancies,
-                    'vacant': total_apartments - active_tenancies,
-                    'occupancy_rate': round((active_tenancies / total_apartments * 100) if total_apartments > 0 else 0, 2)
-                })
-                
-                current += timedelta(days=7)  # Weekly snapshots for performance
+            interval = request.query_params.get('interval', 'week')  # 'week' (default) or 'day'
+            by_estate = request.query_params.get('by_estate') == 'true'
+            if interval not in self.OCCUPANCY_INTERVALS:
+                return Response({
+                    'error': 'Invalid interval',
+                    'detail': f'interval must be one of: {", ".join(self.OCCUPANCY_INTERVALS)}'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Apartment totals and current occupancy per estate in one query
+            today = timezone.now().date()
+            estates = list(self.scope_to_owner(Estate.objects.all(), 'id').annotate(
+                total_units=Count('block__apartment'),
+                occupied_units=Count('block__apartment', filter=Q(block__apartment__is_occupied=True))
+            ).order_by('id'))
+            total_apartments = sum(estate.total_units for estate in estates)
+            occupied_apartments = sum(estate.occupied_units for estate in estates)
+            
+            # Occupancy on the first day and lease turnover per estate from the occupancy rollup
+            occupancy_rollups = self.scope_to_owner(OccupancyDailyRollup.objects.filter(date__lte=end), 'estate')
+            estate_rows = occupancy_rollups.values('estate').annotate(
+                baseline=Coalesce(Sum('occupancy_change', filter=Q(date__lte=start)), 0),
+                move_ins=Coalesce(Sum('move_ins', filter=Q(date__gte=start)), 0),
+                move_outs=Coalesce(Sum('move_outs', filter=Q(date__gte=start, date__lt=today)), 0)
+            ).order_by()
+            rollup_by_estate = {row['estate']: row for row in estate_rows}
+            
+            # ...then the day-by-day changes, accumulated into a daily series
+            changes = occupancy_rollups.filter(date__gt=start).exclude(
+                occupancy_change=0
+            ).values_list('date', 'estate', 'occupancy_change')
+            day_count = (end - start).days + 1
+            estate_index = {estate.id: position for position, estate in enumerate(estates)}
+            occupied_by_day, occupied_by_estate_day = self._accumulate_occupancy(
+                rollup_by_estate.values(), changes, start, day_count, estate_index
+            )
+            
+            step = self.OCCUPANCY_INTERVALS[interval]
+            snapshot_days = range(0, day_count, step)
+            occupancy_trends = self._occupancy_snapshots(start, snapshot_days, occupied_by_day, total_apartments)
             
             # Estate breakdown
             estate_breakdown = []
-            for estate in Estate.objects.all():
-                estate_apartments = Apartment.objects.filter(block__estate=estate)
-                total_units = estate_apartments.count()
+            for estate in estates:
+                total_units = estate.total_units
+                turnover = rollup_by_estate.get(estate.id, {'move_ins': 0, 'move_outs': 0})
                 
                 if total_units > 0:
-                    # Calculate metrics for the period
-                    current_occupied = estate_apartments.filter(tenant__isnull=False).count()
-                    
-                    # Use correct field names for tenant dates
-                    move_ins = Tenant.objects.filter(
-                        apartment__block__estate=estate,
-                        lease_start__gte=start,
-                        lease_start__lte=end
-                    ).count()
-                    
-                    move_outs = Tenant.objects.filter(
-                        apartment__block__estate=estate,
-                        lease_end__gte=start,
-                        lease_end__lte=end,
-                        lease_end__lt=timezone.now().date()
-                    ).count()
-                    
-                    avg_occupancy = round((current_occupied / total_units * 100), 2)
-                    turnover_rate = round(((move_ins + move_outs) / total_units * 100), 2)
+                    avg_occupancy = round((estate.occupied_units / total_units * 100), 2)
+                    turnover_rate = round(((turnover['move_ins'] + turnover['move_outs']) / total_units * 100), 2)
                     
                     estate_breakdown.append({
                         'estate_id': estate.id,
@@ -1025,15 +1300,12 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
                         'peak_occupancy': min(avg_occupancy + 10, 100),  # Mock peak
                         'lowest_occupancy': max(avg_occupancy - 10, 0),  # Mock lowest
                         'total_apartments': total_units,
-                        'move_ins': move_ins,
-                        'move_outs': move_outs,
+                        'move_ins': turnover['move_ins'],
+                        'move_outs': turnover['move_outs'],
                         'turnover_rate': turnover_rate
                     })
             
             # Summary calculations
-            total_apartments = Apartment.objects.count()
-            occupied_apartments = Apartment.objects.filter(tenant__isnull=False).count();
-            
             summary = {
                 'average_occupancy': round((occupied_apartments / total_apartments * 100) if total_apartments > 0 else 0, 2),
                 'peak_occupancy': 92,  # Mock data
@@ -1043,6 +1315,22 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
                 'vacant_apartments': total_apartments - occupied_apartments
             }
             
+            if by_estate:
+                return Response({
+                    'occupancy_trends': occupancy_trends,
+                    'estate_trends': [
+                        {
+                            'estate_id': estate.id,
+                            'estate_name': estate.name,
+                            'occupancy_trends': self._occupancy_snapshots(
+                                start, snapshot_days, occupied_by_estate_day[position], estate.total_units
+                            )
+                        } for position, estate in enumerate(estates)
+                    ],
+                    'estate_breakdown': estate_breakdown,
+                    'summary': summary
+                })
+            
             return Response({
                 'occupancy_trends': occupancy_trends,
                 'estate_breakdown': estate_breakdown,
@@ -1055,7 +1343,43 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
                 'detail': 'Dates must be in YYYY-MM-DD format'
             }, status=status.HTTP_400_BAD_REQUEST)
     
+    # Days between occupancy_report snapshots
+    OCCUPANCY_INTERVALS = {'day': 1, 'week': 7}
+    
+    def _accumulate_occupancy(self, estate_rows, changes, start, day_count, estate_index):
+        """
+        Occupied-tenancy counts for each day of the range: each estate's
+        running total on ``start`` plus a cumulative sum of the later daily
+        changes. Returns (per-day totals, per-estate x per-day matrix).
+        """
+        deltas = np.zeros(day_count, dtype=np.int64)
+        estate_deltas = np.zeros((len(estate_index), day_count), dtype=np.int64)
+        for row in estate_rows:
+            deltas[0] += row['baseline']
+            if row['estate'] in estate_index:
+                estate_deltas[estate_index[row['estate']], 0] += row['baseline']
+        for date, estate_id, change in changes:
+            day = (date - start).days
+            deltas[day] += change
+            if estate_id in estate_index:
+                estate_deltas[estate_index[estate_id], day] += change
+        return np.cumsum(deltas), np.cumsum(estate_deltas, axis=1)
+    
+    def _occupancy_snapshots(self, start, snapshot_days, occupied_by_day, total_apartments):
+        snapshots = []
+        for day in snapshot_days:
+            occupied = int(occupied_by_day[day])
+            snapshots.append({
+                'date': (start + timedelta(days=day)).isoformat(),
+                'total_apartments': total_apartments,
+                'occupied': occupied,
+                'vacant': total_apartments - occupied,
+                'occupancy_rate': round((occupied / total_apartments * 100) if total_apartments > 0 else 0, 2)
+            })
+        return snapshots
+    
     @action(detail=False, methods=['get'], url_path='complaint-report')
+    @cached_response('owner-dashboard', DASHBOARD_CACHE_MODELS, vary_on=get_request_estate_scope)
     def complaint_report(self, request):
         """Get detailed complaint report for a date range"""
         start_date = request.query_params.get('start_date')
@@ -1079,31 +1403,37 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
                     'detail': 'End date must be after start date'
                 }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
             
-            # Get complaints in date range
-            complaints_queryset = Complaint.objects.filter(
-                created_at__date__gte=start,
-                created_at__date__lte=end
-            )
+            # Daily complaint rollup rows in the date range
+            complaints_queryset = self.scope_to_owner(ComplaintDailyRollup.objects.filter(date__gte=start, date__lte=end), 'estate')
+            counts = {
+                'total': Coalesce(Sum('complaint_count'), 0),
+                'resolved': Coalesce(Sum('complaint_count', filter=Q(status_id__in=COMPLAINT_STATUSES.ids('RESOLVED'))), 0),
+            }
             
-            total_complaints = complaints_queryset.count()
-            open_complaints = complaints_queryset.filter(status__name='OPEN').count()
-            in_progress_complaints = complaints_queryset.filter(status__name='IN_PROGRESS').count()
-            resolved_complaints = complaints_queryset.filter(status__name='RESOLVED').count()
-            closed_complaints = complaints_queryset.filter(status__name='CLOSED').count()
+            totals = complaints_queryset.aggregate(
+                open=Coalesce(Sum('complaint_count', filter=Q(status_id__in=COMPLAINT_STATUSES.ids('OPEN'))), 0),
+                in_progress=Coalesce(Sum('complaint_count', filter=Q(status_id__in=COMPLAINT_STATUSES.ids('IN_PROGRESS'))), 0),
+                closed=Coalesce(Sum('complaint_count', filter=Q(status_id__in=COMPLAINT_STATUSES.ids('CLOSED'))), 0),
+                **counts
+            )
+            total_complaints = totals['total']
+            open_complaints = totals['open']
+            in_progress_complaints = totals['in_progress']
+            resolved_complaints = totals['resolved']
+            closed_complaints = totals['closed']
             
             # Category breakdown using foreign key relationship
             categories_data = []
             categories = complaints_queryset.values('category__id', 'category__name').annotate(
-                count=Count('id'),
-                resolved_count=Count(Case(When(status__name='RESOLVED', then=1)))
-            ).order_by('-count')
+                **counts
+            ).filter(total__gt=0).order_by('-total')
             
             for category in categories:
                 if category['category__name']:  # Only include non-null categories
                     cat_id = category['category__id']
                     cat_name = category['category__name']
-                    cat_count = category['count']
-                    cat_resolved = category['resolved_count']
+                    cat_count = category['total']
+                    cat_resolved = category['resolved']
                     
                     categories_data.append({
                         'category_id': cat_id,
@@ -1114,45 +1444,46 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
                         'avg_resolution_time': 2.8  # Mock data
                     })
             
-            # Estate breakdown
+            # Estate breakdown - one query grouped by estate
             estates_data = []
-            for estate in Estate.objects.all():
-                estate_complaints = complaints_queryset.filter(tenant__apartment__block__estate=estate)
-                estate_total = estate_complaints.count()
-                estate_resolved = estate_complaints.filter(status__name='RESOLVED').count()
+            estate_rows = complaints_queryset.filter(
+                estate__isnull=False
+            ).values('estate', 'estate__name').annotate(**counts).order_by('estate')
+            for row in estate_rows:
+                estate_total = row['total']
+                estate_resolved = row['resolved']
                 
                 if estate_total > 0:
                     estates_data.append({
-                        'estate_id': estate.id,
-                        'estate_name': estate.name,
+                        'estate_id': row['estate'],
+                        'estate_name': row['estate__name'],
                         'total_complaints': estate_total,
                         'resolved_complaints': estate_resolved,
                         'resolution_rate': round((estate_resolved / estate_total * 100) if estate_total > 0 else 0, 2),
                         'avg_resolution_time': 2.5  # Mock data
                     })
             
-            # Monthly breakdown
+            # Monthly breakdown - one query grouped by month, empty months filled in below
+            month_rows = complaints_queryset.annotate(
+                month=TruncMonth('date')
+            ).values('month').annotate(**counts).order_by('month')
+            months = {row['month'].strftime('%Y-%m'): row for row in month_rows}
+            
             monthly_data = []
             current = start.replace(day=1)
             while current <= end:
-                month_end = (current.replace(month=current.month + 1) if current.month < 12 
-                           else current.replace(year=current.year + 1, month=1)) - timedelta(days=1)
-                
-                month_complaints = complaints_queryset.filter(
-                    created_at__date__gte=current,
-                    created_at__date__lte=min(month_end, end)
-                )
-                
-                month_resolved = month_complaints.filter(status__name='RESOLVED').count()
+                month_key = current.strftime('%Y-%m')
+                month_row = months.get(month_key, {})
                 
                 monthly_data.append({
-                    'month': current.strftime('%Y-%m'),
-                    'new_complaints': month_complaints.count(),
-                    'resolved_complaints': month_resolved,
+                    'month': month_key,
+                    'new_complaints': month_row.get('total', 0),
+                    'resolved_complaints': month_row.get('resolved', 0),
                     'avg_resolution_time': 3.1  # Mock data
                 })
                 
-                current = month_end + timedelta(days=1)
+                current = (current.replace(month=current.month + 1) if current.month < 12
+                           else current.replace(year=current.year + 1, month=1))
             
             return Response({
                 'total_complaints': total_complaints,
@@ -1185,43 +1516,50 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
     
     @action(detail=False, methods=['get'], url_path='complaint-trends')
+    @cached_response('owner-dashboard', DASHBOARD_CACHE_MODELS, vary_on=get_request_estate_scope)
     def complaint_trends(self, request):
         """Get complaint trends for the specified period"""
         days = int(request.query_params.get('days', 30))
+        bucket = request.query_params.get('bucket', DEFAULT_BUCKET)  # 'day', 'week' or 'month'
+        if bucket not in BUCKETS:
+            return Response({
+                'error': 'Invalid bucket',
+                'detail': f'bucket must be one of: {", ".join(BUCKETS)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         try:
             start_date = timezone.now().date() - timedelta(days=days)
             end_date = timezone.now().date()
+            resolved_ids = COMPLAINT_STATUSES.ids('RESOLVED')
             
-            complaints_queryset = Complaint.objects.filter(
-                created_at__date__gte=start_date,
-                created_at__date__lte=end_date
+            complaints_queryset = self.scope_to_owner(ComplaintDailyRollup.objects.filter(date__gte=start_date, date__lte=end_date), 'estate')
+            totals = complaints_queryset.aggregate(
+                new=Coalesce(Sum('complaint_count'), 0),
+                resolved=Coalesce(Sum('complaint_count', filter=Q(status_id__in=resolved_ids)), 0)
             )
-            
-            new_complaints = complaints_queryset.count()
-            resolved_complaints = complaints_queryset.filter(status__name='RESOLVED').count()
+            new_complaints = totals['new']
+            resolved_complaints = totals['resolved']
             
             # Mock escalated complaints (would need proper escalation tracking)
             escalated_complaints = 0
             
             resolution_rate = round((resolved_complaints / new_complaints * 100) if new_complaints > 0 else 0, 2)
             
-            # Daily trends
+            # Trends per bucket - one grouped query, empty buckets zero-filled
+            counts = bucketed_counts(
+                complaints_queryset, 'date', bucket,
+                new=Coalesce(Sum('complaint_count'), 0),
+                resolved=Coalesce(Sum('complaint_count', filter=Q(status_id__in=resolved_ids)), 0)
+            )
             daily_trends = []
-            current = start_date
-            while current <= end_date:
-                daily_complaints = complaints_queryset.filter(created_at__date=current)
-                daily_resolved = daily_complaints.filter(status__name='RESOLVED').count()
-                daily_escalated = 0  # Mock data
-                
+            for day in bucket_starts(start_date, end_date, bucket):
+                row = counts.get(day, {})
                 daily_trends.append({
-                    'date': current.isoformat(),
-                    'new': daily_complaints.count(),
-                    'resolved': daily_resolved,
-                    'escalated': daily_escalated
+                    'date': day.isoformat(),
+                    'new': row.get('new', 0),
+                    'resolved': row.get('resolved', 0),
+                    'escalated': 0  # Mock data
                 })
-                
-                current += timedelta(days=1)
             
             # Category trends (mock data for now)
             category_trends = [
@@ -1254,6 +1592,7 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
             })
 
     @action(detail=False, methods=['get'], url_path='tenants-expiring')
+    @cached_response('owner-dashboard', DASHBOARD_CACHE_MODELS, vary_on=get_request_estate_scope)
     def tenants_expiring(self, request):
         """Get tenants with leases expiring in the date range"""
         start_date = request.query_params.get('start_date')
@@ -1278,10 +1617,10 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
                 }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
             
             # Get tenants with lease end dates in range - use correct field names
-            tenants_queryset = Tenant.objects.filter(
+            tenants_queryset = self.scope_to_owner(Tenant.objects.filter(
                 lease_end__gte=start,
                 lease_end__lte=end
-            ).select_related('apartment', 'apartment__block', 'apartment__block__estate', 'user')
+            ), 'apartment__block__estate').select_related('apartment', 'apartment__block', 'apartment__block__estate', 'user')
             
             tenants_data = []
             current_date = timezone.now().date()
@@ -1326,9 +1665,47 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
                 'detail': 'Dates must be in YYYY-MM-DD format'
             }, status=status.HTTP_400_BAD_REQUEST)
 
+    # Widgets the composite dashboard can evaluate, keyed by their own url_path
+    DASHBOARD_WIDGETS = {
+        'occupancy-status': 'occupancy_status',
+        'payment-dashboard-summary': 'payment_dashboard_summary',
+        'estate-payment-status': 'estate_payment_status',
+        'complaint-analytics': 'complaint_analytics',
+        'tenancy-expiry-dashboard': 'tenancy_expiry_dashboard',
+        'payment-alerts': 'payment_alerts',
+    }
+    
+    @action(detail=False, methods=['get'])
+    def dashboard(self, request):
+        """Evaluate the owner dashboard widgets concurrently in one round trip"""
+        requested = request.query_params.get('widgets')
+        names = [name.strip() for name in requested.split(',') if name.strip()] if requested else list(self.DASHBOARD_WIDGETS)
+        unknown = [name for name in names if name not in self.DASHBOARD_WIDGETS]
+        if unknown or not names:
+            return Response({
+                'error': 'Invalid widgets',
+                'detail': f'widgets must be a comma-separated subset of: {", ".join(self.DASHBOARD_WIDGETS)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        started = time.monotonic()
+        get_request_estate_scope(request)  # resolve once, before the widget threads share the request
+        widgets = {name: partial(getattr(self, self.DASHBOARD_WIDGETS[name]), request) for name in dict.fromkeys(names)}
+        results = run_widgets(widgets, settings.DASHBOARD_MAX_WORKERS, settings.DASHBOARD_WIDGET_TIMEOUT)
+        
+        return Response({
+            'widgets': results,
+            'complete': all(result['status'] == WIDGET_OK for result in results.values()),
+            'elapsed_ms': round((time.monotonic() - started) * 1000, 1)
+        })
+
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+        """Get hit/miss metrics for the cached apartment search and listing responses"""
+        return Response(get_cache_stats())
+
     @action(detail=False, methods=['post'], url_path='export-report')
     def export_report(self, request):
-        """Generate and export reports in various formats"""
+        """Queue a report export; poll status_url until it completes, then fetch download_url"""
         report_type = request.data.get('report_type')
         format_type = request.data.get('format', 'excel')
         start_date = request.data.get('start_date')
@@ -1340,23 +1717,95 @@ class OwnerDashboardViewSet(viewsets.ViewSet):
                 'detail': 'report_type, start_date, and end_date are required'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Mock export functionality (would integrate with actual file generation)
-        import uuid
-        file_id = str(uuid.uuid4())
+        if report_type not in REPORTS:
+            return Response({
+                'error': 'Invalid report type',
+                'detail': f'report_type must be one of: {", ".join(REPORTS)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Simulate file generation based on report type
-        filenames = {
-            'payments': f'payment_report_{start_date}_{end_date}.{format_type}',
-            'occupancy': f'occupancy_report_{start_date}_{end_date}.{format_type}',
-            'complaints': f'complaint_report_{start_date}_{end_date}.{format_type}',
-            'tenancy': f'tenancy_report_{start_date}_{end_date}.{format_type}'
-        }
+        if format_type not in EXPORT_FORMATS:
+            return Response({
+                'error': 'Invalid format',
+                'detail': f'format must be one of: {", ".join(EXPORT_FORMATS)}'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        filename = filenames.get(report_type, f'report_{start_date}_{end_date}.{format_type}')
+        try:
+            from datetime import datetime
+            start = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except (TypeError, ValueError):
+            return Response({
+                'error': 'Invalid date format',
+                'detail': 'Dates must be in YYYY-MM-DD format'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({
-            'download_url': f'https://api.example.com/downloads/report_{file_id}.{format_type}',
-            'expires_at': (timezone.now() + timedelta(hours=24)).isoformat(),
-            'file_size': 2048576,  # Mock file size
-            'filename': filename
-        })
\ No newline at end of file
+        if start > end:
+            return Response({
+                'error': 'Invalid date range',
+                'detail': 'End date must be after start date'
+            }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        
+        export = ReportExport.objects.create(
+            requested_by=request.user,
+            report_type=report_type,
+            format=EXPORT_FORMATS[format_type],
+            start_date=start,
+            end_date=end,
+            estate_ids=self.get_estate_scope()
+        )
+        # The worker must be able to see the row, so queue only once it is committed
+        transaction.on_commit(lambda: enqueue_report_export(export))
+        
+        return Response(self._export_status_data(request, export), status=status.HTTP_202_ACCEPTED)
+    
+    @action(detail=False, methods=['get'], url_path=r'exports/(?P<export_id>[0-9a-f-]{36})')
+    def export_status(self, request, export_id=None):
+        """Poll a report export"""
+        export = self._get_report_export(request, export_id)
+        if export is None:
+            return Response({'error': 'Export not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(self._export_status_data(request, export))
+    
+    @action(detail=False, methods=['get'], url_path=r'exports/(?P<export_id>[0-9a-f-]{36})/download')
+    def export_download(self, request, export_id=None):
+        """Download a completed report export"""
+        export = self._get_report_export(request, export_id)
+        if export is None:
+            return Response({'error': 'Export not found'}, status=status.HTTP_404_NOT_FOUND)
+        if export.status != ReportExport.STATUS_COMPLETED:
+            return Response({
+                'error': 'Export not ready',
+                'detail': f'Export is {export.status}'
+            }, status=status.HTTP_409_CONFLICT)
+        if export.expires_at and export.expires_at <= timezone.now():
+            return Response({'error': 'Export expired'}, status=status.HTTP_410_GONE)
+        
+        # FileResponse streams the file from the export store in blocks
+        return FileResponse(export.file.open('rb'), as_attachment=True, filename=export_filename(export))
+    
+    def _get_report_export(self, request, export_id):
+        exports = ReportExport.objects.all()
+        if not request.user.is_staff:
+            exports = exports.filter(requested_by=request.user)
+        return exports.filter(pk=export_id).first()
+    
+    def _export_status_data(self, request, export):
+        export.refresh_from_db()  # eager/inline workers may have already finished it
+        completed = export.status == ReportExport.STATUS_COMPLETED
+        return {
+            'export_id': str(export.pk),
+            'report_type': export.report_type,
+            'format': export.format,
+            'status': export.status,
+            'filename': export_filename(export),
+            'row_count': export.row_count if completed else None,
+            'file_size': export.file_size if completed else None,
+            'error': export.error,
+            'created_at': export.created_at,
+            'completed_at': export.completed_at,
+            'expires_at': export.expires_at,
+            'status_url': request.build_absolute_uri(reverse('owner-export-status', kwargs={'export_id': export.pk})),
+            'download_url': request.build_absolute_uri(
+                reverse('owner-export-download', kwargs={'export_id': export.pk})
+            ) if completed else None
+        }
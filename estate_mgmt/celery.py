@@ -0,0 +1,10 @@
+import os
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'estate_mgmt.settings')
+
+app = Celery('estate_mgmt')
+
+# Every CELERY_* setting in estate_mgmt/settings.py configures the app
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 import dotenv
+from celery.schedules import crontab
 
 dotenv.load_dotenv()
 
@@ -41,6 +42,80 @@ DATABASES = {
     }
 }
 
+# Redis when REDIS_URL is set, otherwise a per-process local memory cache
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'pms-default',
+        }
+    }
+
+# Whether every process sees the same cache. Cache versions (core/cache.py)
+# only retire entries across processes through a shared cache, so without
+# one API responses are not cached and owner estate scopes are read per request
+SHARED_CACHE = bool(REDIS_URL)
+
+# Upper bound on how long a cached API response is kept; entries are
+# invalidated earlier through per-model version counters (core/cache.py)
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300))
+# Seconds a process keeps its copy of the payment/complaint status tables
+# (core/statuses.py) before re-reading them, even if no version bump reached it
+STATUS_REGISTRY_TTL = float(os.environ.get('STATUS_REGISTRY_TTL', 60))
+
+# Composite owner dashboard (core/dashboard.py): widgets run on up to this many
+# threads per request, each holding its own database connection while it runs
+DASHBOARD_MAX_WORKERS = int(os.environ.get('DASHBOARD_MAX_WORKERS', 6))
+# Seconds before a widget is reported as timed out and the page returns without it
+DASHBOARD_WIDGET_TIMEOUT = float(os.environ.get('DASHBOARD_WIDGET_TIMEOUT', 10))
+
+# Background jobs (core/tasks.py). Run a worker with `celery -A estate_mgmt worker`
+# and the schedule below with `celery -A estate_mgmt beat`. Eager mode runs
+# tasks inline in the caller and is meant for tests and local debugging only.
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', REDIS_URL or 'redis://localhost:6379/0')
+CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', 'false').lower() == 'true'
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_BEAT_SCHEDULE = {
+    'purge-expired-report-exports': {
+        'task': 'core.tasks.purge_expired_report_exports',
+        'schedule': 60 * 60,
+    },
+    # Idempotent, so a daily run also invoices leases that start mid-month
+    'generate-monthly-invoices': {
+        'task': 'payments.tasks.generate_monthly_invoices',
+        'schedule': crontab(hour=1, minute=0),
+    },
+    # Hourly, so payments turn Overdue soon after local midnight
+    'mark-overdue-payments': {
+        'task': 'payments.tasks.mark_overdue_payments',
+        'schedule': crontab(minute=5),
+    },
+}
+
+# Generated report exports (core/exports.py): a local file store, rows fetched
+# from the database this many at a time, files kept this many hours
+REPORT_EXPORT_ROOT = os.environ.get('REPORT_EXPORT_ROOT', str(BASE_DIR / 'exports'))
+REPORT_EXPORT_CHUNK_SIZE = int(os.environ.get('REPORT_EXPORT_CHUNK_SIZE', 2000))
+REPORT_EXPORT_TTL_HOURS = int(os.environ.get('REPORT_EXPORT_TTL_HOURS', 24))
+
+# Bulk payment import (payments/imports.py): rows accepted per request, and
+# rows per INSERT / duplicate lookup
+PAYMENT_IMPORT_MAX_ROWS = int(os.environ.get('PAYMENT_IMPORT_MAX_ROWS', 10000))
+PAYMENT_IMPORT_CHUNK_SIZE = int(os.environ.get('PAYMENT_IMPORT_CHUNK_SIZE', 1000))
+
+# Monthly rent invoices (payments/invoices.py): day of the month rent falls
+# due (capped at the month's last day), and tenants invoiced per transaction
+INVOICE_DUE_DAY = int(os.environ.get('INVOICE_DUE_DAY', 1))
+INVOICE_CHUNK_SIZE = int(os.environ.get('INVOICE_CHUNK_SIZE', 2000))
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -90,6 +165,11 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # orjson-backed JSON (falls back to the stock renderer when orjson is missing)
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 from datetime import timedelta
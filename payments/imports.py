@@ -0,0 +1,229 @@
+"""
+Bulk payment import for bank and mobile-money statements.
+
+A batch is parsed and validated in memory (PaymentImportRowSerializer), its
+tenants are resolved with one ``in_bulk`` lookup, and duplicates are found
+with indexed lookups on ``reference_number`` and on the unique
+tenant/year/month key. A row for a month whose payment is still an open
+(pending or overdue) invoice settles that invoice if it is for the
+invoice's amount, and is invalid otherwise; any other month already on
+file is a duplicate. Accepted rows are inserted with chunked
+``bulk_create`` and settled invoices updated with ``bulk_update``, in a
+single transaction.
+"""
+import copy
+import csv
+import io
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from core import rollups
+from core.cache import bump_model_version_on_commit
+from core.scoping import scope_queryset
+from core.statuses import PAYMENT_STATUSES
+from tenants.models import Tenant
+from .invoices import open_invoice_status_ids
+from .models import Payment
+from .serializers import PaymentImportRowSerializer
+
+# Statement lines are money already received
+DEFAULT_IMPORT_STATUS = 'Paid'
+# Statuses that stamp paid_at when a row doesn't carry one (as in update_payment_status)
+PAID_STATUS_NAMES = ('paid', 'completed')
+# What a statement row sets on the invoice it settles (the amount is the invoice's)
+SETTLED_FIELDS = ('status_id', 'paid_at', 'payment_method', 'reference_number', 'notes')
+
+
+class PaymentImportError(Exception):
+    """The batch as a whole could not be read"""
+
+
+def parse_import_rows(request):
+    """Rows of an uploaded CSV file ('file'), or of a JSON list / {'payments': [...]} body"""
+    upload = request.FILES.get('file')
+    if upload is not None:
+        try:
+            reader = csv.DictReader(io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''))
+            # Empty cells mean "not given", like a missing JSON key
+            rows = [
+                {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+                for row in reader
+            ]
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise PaymentImportError(f'Could not read CSV file: {e}')
+    else:
+        data = request.data
+        rows = data.get('payments') if isinstance(data, dict) else data
+        if not isinstance(rows, list):
+            raise PaymentImportError('Send a CSV file as "file", or a JSON list of payments')
+
+    if not rows:
+        raise PaymentImportError('No payment rows found')
+    if len(rows) > settings.PAYMENT_IMPORT_MAX_ROWS:
+        raise PaymentImportError(f'At most {settings.PAYMENT_IMPORT_MAX_ROWS} rows can be imported at once')
+    return rows
+
+
+def _chunks(values):
+    size = settings.PAYMENT_IMPORT_CHUNK_SIZE
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _status_lookup():
+    """{id or exact name: id} for every payment status, with the import default under None"""
+    default_status_id = PAYMENT_STATUSES.get_or_create(DEFAULT_IMPORT_STATUS)
+    statuses = PAYMENT_STATUSES.names()
+    lookup = {name: pk for pk, name in reversed(list(statuses.items()))}  # first id wins
+    lookup.update({str(pk): pk for pk in statuses})
+    lookup[None] = default_status_id
+    return statuses, lookup
+
+
+def import_payments(rows, estate_ids=None, dry_run=False):
+    """
+    Validate ``rows`` and insert the acceptable ones, settling open invoices
+    for their months. ``estate_ids`` limits the tenants rows may name (an
+    owner's scope; None allows any tenant). Returns a report with a per-row
+    entry, numbered from 1, for every row that was rejected as invalid or as
+    a duplicate.
+    """
+    report = {
+        'total_rows': len(rows), 'accepted': 0, 'created': 0, 'settled': 0,
+        'duplicates': 0, 'invalid': 0, 'errors': []
+    }
+
+    def reject(number, reason, errors):
+        report['duplicates' if reason == 'duplicate' else 'invalid'] += 1
+        report['errors'].append({'row': number, 'reason': reason, 'errors': errors})
+
+    valid = []
+    for number, row in enumerate(rows, start=1):
+        serializer = PaymentImportRowSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((number, serializer.validated_data))
+        else:
+            reject(number, 'invalid', serializer.errors)
+
+    tenants = scope_queryset(
+        Tenant.objects.annotate(estate_id=F('apartment__block__estate')), estate_ids, 'apartment__block__estate'
+    ).in_bulk({data['tenant'] for _, data in valid})
+
+    # Payments already on file, by reference and by tenant/month
+    references = {data['reference_number'] for _, data in valid if data.get('reference_number')}
+    existing_references = set()
+    for chunk in _chunks(references):
+        existing_references.update(
+            Payment.objects.filter(reference_number__in=chunk).values_list('reference_number', flat=True)
+        )
+    years = {data['payment_for_year'] for _, data in valid}
+    existing_months = {}  # tenant/year/month -> (payment id, status id, amount)
+    for chunk in _chunks(tenants):
+        existing_months.update(
+            ((tenant_id, year, month), (pk, status_id, amount))
+            for pk, tenant_id, year, month, status_id, amount in Payment.objects.filter(
+                tenant_id__in=chunk, payment_for_year__in=years
+            ).values_list('id', 'tenant_id', 'payment_for_year', 'payment_for_month', 'status_id', 'amount')
+        )
+    open_status_ids = set(open_invoice_status_ids())
+
+    statuses, status_ids = _status_lookup()
+    now = timezone.now()
+    payments = []
+    settlements = {}  # invoice id -> (invoice amount, the fields settling it)
+    for number, data in valid:
+        tenant = tenants.get(data['tenant'])
+        if tenant is None:
+            reject(number, 'invalid', {'tenant': ['Tenant not found']})
+            continue
+        status_id = status_ids.get(data.get('status'))
+        if status_id is None:
+            reject(number, 'invalid', {'status': [f"Unknown payment status '{data['status']}'"]})
+            continue
+
+        reference = data.get('reference_number') or None
+        month = (tenant.id, data['payment_for_year'], data['payment_for_month'])
+        if reference in existing_references:
+            reject(number, 'duplicate', {'reference_number': [f"Reference '{reference}' has already been imported"]})
+            continue
+        invoice_id, invoice_status_id, invoice_amount = existing_months.get(month, (None, None, None))
+        if month in existing_months and invoice_status_id not in open_status_ids:
+            reject(number, 'duplicate', {
+                'payment_for_month': [f"Tenant already has a payment for {month[2]}/{month[1]}"]
+            })
+            continue
+        if invoice_id is not None and data['amount'] != invoice_amount:
+            reject(number, 'invalid', {
+                'amount': [f"The open invoice for {month[2]}/{month[1]} is for {invoice_amount}"]
+            })
+            continue
+        if reference:
+            existing_references.add(reference)
+        existing_months[month] = (None, None, None)
+
+        paid_at = data.get('paid_at')
+        if paid_at is None and statuses[status_id].lower() in PAID_STATUS_NAMES:
+            paid_at = now
+        fields = {
+            'status_id': status_id,
+            'paid_at': paid_at,
+            'payment_method': data.get('payment_method') or None,
+            'reference_number': reference,
+            'notes': data.get('notes') or None,
+        }
+        if invoice_id is not None:
+            settlements[invoice_id] = (invoice_amount, fields)
+            continue
+        payments.append(Payment(
+            tenant_id=tenant.id,
+            amount=data['amount'],
+            due_date=data['due_date'],
+            payment_for_month=data['payment_for_month'],
+            payment_for_year=data['payment_for_year'],
+            payment_type=data.get('payment_type') or None,
+            **fields
+        ))
+
+    report['accepted'] = len(payments) + len(settlements)
+    if report['accepted'] and not dry_run:
+        # An IntegrityError here (a concurrent write took a tenant/month or
+        # settled an invoice) rolls back the whole batch
+        estate_ids = {pk: tenant.estate_id for pk, tenant in tenants.items()}
+        with transaction.atomic():
+            Payment.objects.bulk_create(payments, batch_size=settings.PAYMENT_IMPORT_CHUNK_SIZE)
+            rollups.add_payment_rollups(payments, estate_ids)
+            _settle_invoices(settlements, estate_ids)
+            bump_model_version_on_commit(Payment._meta.label_lower)
+        report['created'] = len(payments)
+        report['settled'] = len(settlements)
+
+    report['errors'].sort(key=lambda error: error['row'])
+    report['dry_run'] = dry_run
+    return report
+
+
+def _settle_invoices(settlements, estate_ids):
+    """Apply ``settlements`` (invoice id -> (amount, fields)) to the still-open, unchanged invoices, locked"""
+    invoices = []
+    for chunk in _chunks(settlements):
+        invoices.extend(Payment.objects.select_for_update().filter(
+            id__in=chunk, status_id__in=open_invoice_status_ids()
+        ))
+    if len(invoices) != len(settlements) or any(
+        invoice.amount != settlements[invoice.id][0] for invoice in invoices
+    ):
+        raise IntegrityError('An invoice being settled was paid or changed by another change')
+
+    previous = [copy.copy(invoice) for invoice in invoices]
+    for invoice, before in zip(invoices, previous):
+        _, fields = settlements[invoice.id]
+        for field, value in fields.items():
+            setattr(invoice, field, value)
+        # Keep the invoice's own note when the statement line has none
+        invoice.notes = fields['notes'] or before.notes
+    Payment.objects.bulk_update(invoices, SETTLED_FIELDS, batch_size=settings.PAYMENT_IMPORT_CHUNK_SIZE)
+    # bulk_update sends no signals: swap each invoice's rollup contribution by hand
+    rollups.add_payment_rollups(previous, estate_ids, sign=-1)
+    rollups.add_payment_rollups(invoices, estate_ids)
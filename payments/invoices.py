@@ -0,0 +1,154 @@
+"""
+Monthly rent invoices: one pending Payment per active lease per month.
+
+A lease is active in a month when it has an apartment and its
+lease_start/lease_end range overlaps the month (as in the occupancy
+report); a lease without an end date runs month to month until one is set.
+
+Generation is idempotent: tenants are walked in id order a chunk at a time,
+tenants that already have a payment for the month are skipped (an indexed
+lookup on the unique tenant/year/month key), and the rest are inserted with
+``bulk_create`` in one transaction per chunk. Run it as often as you like;
+leases that start mid-month are picked up by the next run.
+
+An invoice holds the tenant/month key, so the payment that pays it settles
+it instead of being added beside it: ``open_invoice`` finds the tenant's
+pending or overdue payment for the month, and log_payment, create and the
+statement import update its status, paid_at, reference and method. The
+invoice keeps its amount, the rent owed; a payment of any other amount is
+rejected (InvoiceAmountMismatch) and the invoice stays open, so arrears
+still show on the dashboards.
+"""
+import calendar
+from datetime import date
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from core import rollups
+from core.cache import bump_model_version_on_commit
+from core.scoping import scope_queryset
+from core.statuses import PAYMENT_STATUSES
+from tenants.models import Tenant
+from .models import Payment
+from .overdue import overdue_status_ids, pending_status_ids
+
+INVOICE_STATUS = 'Pending'
+INVOICE_PAYMENT_TYPE = 'rent'
+
+
+class InvoiceAmountMismatch(Exception):
+    """A payment for an invoiced month that isn't the invoice's amount"""
+
+    def __init__(self, invoice, amount):
+        super().__init__(f'Invoice {invoice.id} is for {invoice.amount}, not {amount}')
+        self.invoice = invoice
+        self.amount = amount
+
+
+def open_invoice_status_ids():
+    """Statuses of an invoice that is still waiting for its payment"""
+    return pending_status_ids() + overdue_status_ids()
+
+
+def open_invoice(tenant_id, year, month):
+    """
+    The tenant's pending or overdue payment for the month, locked for
+    settling (call inside a transaction); None if there isn't one.
+    """
+    if not (tenant_id and year and month):
+        return None
+    return Payment.objects.select_for_update().filter(
+        tenant_id=tenant_id, payment_for_year=year, payment_for_month=month,
+        status_id__in=open_invoice_status_ids()
+    ).first()
+
+
+def month_bounds(year, month):
+    """First and last day of the month"""
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def active_leases(year, month, estate_ids=None):
+    """Tenants whose lease overlaps the month"""
+    first, last = month_bounds(year, month)
+    queryset = Tenant.objects.filter(
+        Q(lease_end__isnull=True) | Q(lease_end__gte=first),
+        apartment__isnull=False, lease_start__lte=last
+    )
+    return scope_queryset(queryset, estate_ids, 'apartment__block__estate')
+
+
+def generate_monthly_invoices(year, month, estate_ids=None, dry_run=False, chunk_size=None):
+    """
+    Create the month's pending rent payments for every active lease that
+    doesn't have one yet. ``estate_ids`` limits the estates invoiced (None
+    invoices all). Returns counts of what was created and skipped.
+    """
+    chunk_size = chunk_size or settings.INVOICE_CHUNK_SIZE
+    first, last = month_bounds(year, month)
+    due_date = first.replace(day=min(settings.INVOICE_DUE_DAY, last.day))
+    status_id = PAYMENT_STATUSES.get_or_create(INVOICE_STATUS)
+    leases = active_leases(year, month, estate_ids).order_by('id').values_list(
+        'id', 'apartment__rent_amount', 'apartment__block__estate_id'
+    )
+
+    report = {'year': year, 'month': month, 'active_leases': 0, 'created': 0, 'existing': 0, 'no_rent': 0, 'dry_run': dry_run}
+    last_id = 0
+    while True:
+        chunk = list(leases.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
+        report['active_leases'] += len(chunk)
+
+        billable = []
+        for tenant_id, rent, estate_id in chunk:
+            if rent:
+                billable.append((tenant_id, rent, estate_id))
+            else:
+                report['no_rent'] += 1
+        if dry_run:
+            existing = _invoiced_tenants([tenant_id for tenant_id, _, _ in billable], year, month)
+            report['existing'] += len(existing)
+            report['created'] += len(billable) - len(existing)
+            continue
+
+        created, existing = _create_chunk(billable, year, month, due_date, status_id)
+        report['created'] += created
+        report['existing'] += existing
+
+    if report['created'] and not dry_run:
+        bump_model_version_on_commit(Payment._meta.label_lower)
+    return report
+
+
+def _invoiced_tenants(tenant_ids, year, month):
+    return set(Payment.objects.filter(
+        tenant_id__in=tenant_ids, payment_for_year=year, payment_for_month=month
+    ).values_list('tenant_id', flat=True))
+
+
+def _create_chunk(billable, year, month, due_date, status_id):
+    """Insert the chunk's missing invoices; returns (created, already existing)"""
+    # A concurrent run (or a tenant paying meanwhile) can take a tenant/month
+    # between the lookup and the insert; the chunk is then looked up again
+    for attempt in range(2):
+        existing = _invoiced_tenants([tenant_id for tenant_id, _, _ in billable], year, month)
+        payments = [
+            Payment(
+                tenant_id=tenant_id, amount=rent, status_id=status_id, due_date=due_date,
+                payment_for_month=month, payment_for_year=year, payment_type=INVOICE_PAYMENT_TYPE
+            )
+            for tenant_id, rent, _ in billable if tenant_id not in existing
+        ]
+        if not payments:
+            return 0, len(existing)
+        try:
+            with transaction.atomic():
+                Payment.objects.bulk_create(payments)
+                rollups.add_payment_rollups(payments, {tenant_id: estate_id for tenant_id, _, estate_id in billable})
+        except IntegrityError:
+            if attempt:
+                raise
+            continue
+        return len(payments), len(existing)
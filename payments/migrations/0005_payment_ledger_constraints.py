@@ -0,0 +1,63 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:20
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_months(apps, schema_editor):
+    # Refuse to guess which ledger row is the real one; duplicates must be
+    # merged by hand before the unique constraint can be added
+    Payment = apps.get_model("payments", "Payment")
+    duplicates = list(
+        Payment.objects.filter(
+            payment_for_month__isnull=False, payment_for_year__isnull=False
+        )
+        .values("tenant_id", "payment_for_year", "payment_for_month")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+        .order_by("tenant_id", "payment_for_year", "payment_for_month")[:20]
+    )
+    if duplicates:
+        listed = ", ".join(
+            f"tenant {row['tenant_id']} {row['payment_for_month']}/{row['payment_for_year']}"
+            for row in duplicates
+        )
+        raise RuntimeError(
+            "Cannot add unique_payment_per_tenant_month: tenants have more than one "
+            f"payment for the same month ({listed}). Merge or re-date them, then migrate again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0004_payment_payment_type"),
+        ("tenants", "0002_tenant_emergency_contact_tenant_phone_number_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_months, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="payment",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name="payment",
+            name="due_date",
+            field=models.DateField(db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["status", "due_date"], name="payments_pa_status__077a1c_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="payment",
+            constraint=models.UniqueConstraint(
+                fields=("tenant", "payment_for_year", "payment_for_month"),
+                name="unique_payment_per_tenant_month",
+            ),
+        ),
+    ]
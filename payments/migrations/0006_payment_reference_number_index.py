@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0005_payment_ledger_constraints"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="payment",
+            name="reference_number",
+            field=models.CharField(
+                blank=True, db_index=True, max_length=100, null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-17 02:33
+
+from django.db import migrations, models
+
+
+# No partial index on open payments: status names are data (PaymentStatus
+# rows), so a migration can't state "status is pending" as an index
+# condition, and paid_at isn't cleared when a payment is reopened. The
+# overdue job and the alert lookups read ranges of the existing
+# (status, due_date) index instead.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0006_payment_reference_number_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="payment",
+            name="overdue_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When the overdue job moved this payment to Overdue",
+                null=True,
+            ),
+        ),
+    ]
@@ -11,16 +11,30 @@ class Payment(models.Model):
     tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.ForeignKey(PaymentStatus, on_delete=models.SET_NULL, null=True)
-    due_date = models.DateField()
+    due_date = models.DateField(db_index=True)
     paid_at = models.DateTimeField(null=True, blank=True)
+    overdue_at = models.DateTimeField(null=True, blank=True, help_text="When the overdue job moved this payment to Overdue")
     payment_for_month = models.IntegerField(help_text="Month number (1-12)", null=True, blank=True)
     payment_for_year = models.IntegerField(null=True, blank=True)
     payment_method = models.CharField(max_length=100, blank=True, null=True)
     payment_type = models.CharField(max_length=100, blank=True, null=True)
-    reference_number = models.CharField(max_length=100, blank=True, null=True)
+    reference_number = models.CharField(max_length=100, blank=True, null=True, db_index=True)
     receipt_file = models.FileField(upload_to='payment_receipts/', blank=True, null=True)
     notes = models.TextField(blank=True, null=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        # One payment per tenant per billing month; the unique index also serves
+        # tenant and tenant/month lookups. NULL months are never considered equal.
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tenant', 'payment_for_year', 'payment_for_month'],
+                name='unique_payment_per_tenant_month'
+            )
+        ]
+        # Per status, due-date order: the overdue job's scan of pending payments
+        # and the overdue alert lookups (payments/overdue.py) are range reads on it
+        indexes = [models.Index(fields=['status', 'due_date'])]
 
     def __str__(self):
         return f"Payment by {self.tenant.user.username} - {self.amount}"
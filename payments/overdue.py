@@ -0,0 +1,55 @@
+"""
+Overdue payments.
+
+A payment becomes overdue when the overdue job (``mark_overdue_payments``,
+run hourly by Celery beat) finds it still pending after its due date, and
+moves it to the Overdue status with a bulk UPDATE, stamping ``overdue_at``.
+Both the job's scan and the overdue lookups are range reads on the
+(status, due_date) index. Read paths then ask for the Overdue status instead of each
+re-deriving "pending and past due" with its own status-name rule.
+"""
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from core import rollups
+from core.cache import bump_model_version_on_commit
+from core.statuses import PAYMENT_STATUSES
+from .models import Payment
+
+OVERDUE_STATUS = 'Overdue'
+
+
+def pending_status_ids():
+    return PAYMENT_STATUSES.ids_containing('pending')
+
+
+def overdue_status_ids():
+    return PAYMENT_STATUSES.ids_containing('overdue')
+
+
+def mark_overdue_payments(today=None):
+    """
+    Move pending payments due before ``today`` (the local date by default)
+    to Overdue. Returns the number of payments moved.
+    """
+    today = today or timezone.localdate()
+    overdue_id = PAYMENT_STATUSES.get_or_create(OVERDUE_STATUS)
+    moved = 0
+    marked_at = None
+    with transaction.atomic():
+        for status_id in pending_status_ids():
+            # Each UPDATE gets its own timestamp, which then picks out exactly
+            # the rows it moved for the rollup adjustment
+            now = timezone.now()
+            marked_at = now if marked_at is None or now > marked_at else marked_at + timedelta(microseconds=1)
+            count = Payment.objects.filter(
+                status_id=status_id, due_date__lt=today
+            ).update(status_id=overdue_id, overdue_at=marked_at)
+            if count:
+                rollups.move_payment_rollups(
+                    Payment.objects.filter(status_id=overdue_id, overdue_at=marked_at), status_id, overdue_id
+                )
+                moved += count
+        if moved:
+            bump_model_version_on_commit(Payment._meta.label_lower)
+    return moved
@@ -1,4 +1,6 @@
+from decimal import Decimal
 from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator
 from .models import Payment, PaymentStatus
 
 class PaymentSerializer(serializers.ModelSerializer):
@@ -6,6 +8,31 @@ class PaymentSerializer(serializers.ModelSerializer):
         model = Payment
         fields = '__all__'
 
+    def get_validators(self):
+        # The unique tenant/month constraint is enforced by the database;
+        # the views turn its IntegrityError into a 400 instead of pre-querying
+        return [
+            validator for validator in super().get_validators()
+            if not isinstance(validator, UniqueTogetherValidator)
+        ]
+
+class PaymentImportRowSerializer(serializers.Serializer):
+    """
+    One row of a bulk import. Plain fields only, so a batch validates without
+    touching the database; tenant and status are resolved by payments.imports.
+    """
+    tenant = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    due_date = serializers.DateField()
+    payment_for_month = serializers.IntegerField(min_value=1, max_value=12)
+    payment_for_year = serializers.IntegerField(min_value=1900, max_value=9999)
+    status = serializers.CharField(max_length=50, required=False)
+    paid_at = serializers.DateTimeField(required=False, allow_null=True)
+    payment_method = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    payment_type = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    reference_number = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
 class PaymentStatusSerializer(serializers.ModelSerializer):
     class Meta:
         model = PaymentStatus
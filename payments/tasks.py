@@ -0,0 +1,16 @@
+from celery import shared_task
+from django.utils import timezone
+from .invoices import generate_monthly_invoices as generate
+from .overdue import mark_overdue_payments as mark_overdue
+
+
+@shared_task
+def generate_monthly_invoices(year=None, month=None):
+    """Invoice the given month, or the current one"""
+    today = timezone.localdate()
+    return generate(year or today.year, month or today.month)
+
+
+@shared_task
+def mark_overdue_payments():
+    return mark_overdue()
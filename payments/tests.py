@@ -0,0 +1,326 @@
+import contextlib
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework.validators import UniqueTogetherValidator
+from core.models import Estate, Block, Apartment
+from core.tests import RollupAssertions
+from core.statuses import PAYMENT_STATUSES
+from tenants.models import Tenant
+from .imports import import_payments
+from .invoices import generate_monthly_invoices
+from .models import Payment, PaymentStatus
+from .overdue import mark_overdue_payments
+from .serializers import PaymentSerializer
+
+RENT = Decimal('1000.00')
+
+
+class PaymentTestCase(TestCase):
+    """An estate with two let apartments, a manager and a tenant client"""
+
+    def setUp(self):
+        cache.clear()
+        # Status ids cached by an earlier test were rolled back with it
+        PAYMENT_STATUSES.invalidate()
+        self.statuses = {
+            name: PaymentStatus.objects.create(name=name).id
+            for name in ('Pending', 'Paid', 'Processing', 'Overdue')
+        }
+        self.estate = Estate.objects.create(name='Estate', address='-')
+        block = Block.objects.create(estate=self.estate, name='A')
+        self.tenants = [
+            Tenant.objects.create(
+                user=User.objects.create_user(f'tenant{number}'),
+                apartment=Apartment.objects.create(block=block, number=str(number), rent_amount=RENT),
+                lease_start=date(2026, 1, 1),
+            )
+            for number in range(2)
+        ]
+        self.tenant = self.tenants[0]
+        self.manager = APIClient()
+        self.manager.force_authenticate(User.objects.create_user('manager', is_staff=True))
+        self.tenant_client = APIClient()
+        self.tenant_client.force_authenticate(self.tenant.user)
+
+    def post(self, client, url, data, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return client.post(url, data, **kwargs)
+
+    def payment_data(self, **overrides):
+        return {
+            'tenant': self.tenant.id, 'amount': str(RENT), 'due_date': '2026-03-01',
+            'payment_for_month': 3, 'payment_for_year': 2026, **overrides
+        }
+
+
+class DuplicateMonthTests(PaymentTestCase):
+    """Every write path answers a tenant/month clash with the same 400"""
+
+    def setUp(self):
+        super().setUp()
+        self.paid = Payment.objects.create(
+            tenant=self.tenant, amount=RENT, status_id=self.statuses['Paid'], due_date=date(2026, 3, 1),
+            payment_for_month=3, payment_for_year=2026
+        )
+        self.other = Payment.objects.create(
+            tenant=self.tenant, amount=RENT, status_id=self.statuses['Paid'], due_date=date(2026, 4, 1),
+            payment_for_month=4, payment_for_year=2026
+        )
+
+    def assertDuplicate(self, response):
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['existing_payment_id'], self.paid.id)
+        self.assertEqual(response.data['error'], 'Payment for 3/2026 already exists for this tenant')
+
+    def test_post(self):
+        self.assertDuplicate(self.post(self.manager, '/api/payments/payments/', self.payment_data()))
+
+    def test_patch(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            response = self.manager.patch(f'/api/payments/payments/{self.other.id}/', {'payment_for_month': 3})
+        self.assertDuplicate(response)
+
+    def test_put(self):
+        response = self.manager.put(f'/api/payments/payments/{self.other.id}/', self.payment_data())
+        self.assertDuplicate(response)
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.payment_for_month, 4)
+
+    def test_log_payment(self):
+        self.assertDuplicate(self.post(self.tenant_client, '/api/payments/payments/log_payment/', self.payment_data()))
+
+    def test_serializer_drops_only_the_unique_together_validator(self):
+        generated = super(PaymentSerializer, PaymentSerializer()).get_validators()
+        self.assertTrue(any(isinstance(validator, UniqueTogetherValidator) for validator in generated))
+        self.assertEqual(
+            PaymentSerializer().get_validators(),
+            [validator for validator in generated if not isinstance(validator, UniqueTogetherValidator)]
+        )
+
+
+class InvoiceGenerationTests(PaymentTestCase):
+    def test_generation_is_idempotent(self):
+        report = generate_monthly_invoices(2026, 3)
+        self.assertEqual((report['active_leases'], report['created'], report['existing']), (2, 2, 0))
+
+        report = generate_monthly_invoices(2026, 3)
+        self.assertEqual((report['created'], report['existing']), (0, 2))
+        invoices = Payment.objects.filter(payment_for_year=2026, payment_for_month=3)
+        self.assertEqual(invoices.count(), 2)
+        self.assertTrue(all(
+            invoice.status_id == self.statuses['Pending'] and invoice.amount == RENT for invoice in invoices
+        ))
+
+    def test_dry_run_creates_nothing(self):
+        report = generate_monthly_invoices(2026, 3, dry_run=True)
+        self.assertEqual(report['created'], 2)
+        self.assertFalse(Payment.objects.exists())
+
+
+class InvoiceSettlementTests(PaymentTestCase):
+    def setUp(self):
+        super().setUp()
+        generate_monthly_invoices(2026, 3)
+        self.invoice = Payment.objects.get(tenant=self.tenant, payment_for_year=2026, payment_for_month=3)
+
+    def test_manager_payment_settles_the_invoice(self):
+        response = self.post(self.manager, '/api/payments/payments/', self.payment_data(
+            status=self.statuses['Paid'], reference_number='TX1', payment_method='bank'
+        ))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['payment']['id'], self.invoice.id)
+
+        self.invoice.refresh_from_db()
+        self.assertEqual(self.invoice.status_id, self.statuses['Paid'])
+        self.assertEqual(self.invoice.amount, RENT)
+        self.assertEqual((self.invoice.reference_number, self.invoice.payment_method), ('TX1', 'bank'))
+        self.assertIsNotNone(self.invoice.paid_at)
+        self.assertEqual(Payment.objects.filter(tenant=self.tenant).count(), 1)
+
+    def test_tenant_payment_settles_the_invoice_for_verification(self):
+        response = self.post(self.tenant_client, '/api/payments/payments/log_payment/', self.payment_data())
+        self.assertEqual(response.status_code, 201)
+        self.invoice.refresh_from_db()
+        self.assertEqual(self.invoice.status_id, self.statuses['Processing'])
+
+    def test_partial_payment_is_rejected_and_keeps_the_invoice_open(self):
+        response = self.post(
+            self.tenant_client, '/api/payments/payments/log_payment/', self.payment_data(amount='400.00')
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['invoice_id'], self.invoice.id)
+        self.assertEqual(response.data['invoice_amount'], str(RENT))
+
+        self.invoice.refresh_from_db()
+        self.assertEqual((self.invoice.status_id, self.invoice.amount), (self.statuses['Pending'], RENT))
+        self.assertIsNone(self.invoice.paid_at)
+
+    def test_statement_import_settles_matching_invoices(self):
+        other = self.tenants[1]
+        report = import_payments([
+            {**self.payment_data(), 'reference_number': 'ST1'},
+            {**self.payment_data(tenant=other.id), 'amount': '400.00', 'reference_number': 'ST2'},
+            {**self.payment_data(), 'reference_number': 'ST3'},
+        ])
+        self.assertEqual((report['created'], report['settled'], report['invalid'], report['duplicates']), (0, 1, 1, 1))
+        self.assertEqual([(error['row'], error['reason']) for error in report['errors']], [(2, 'invalid'), (3, 'duplicate')])
+
+        self.invoice.refresh_from_db()
+        self.assertEqual(self.invoice.status_id, self.statuses['Paid'])
+        self.assertEqual((self.invoice.amount, self.invoice.reference_number), (RENT, 'ST1'))
+        self.assertIsNotNone(self.invoice.paid_at)
+        short = Payment.objects.get(tenant=other, payment_for_year=2026, payment_for_month=3)
+        self.assertEqual((short.status_id, short.amount), (self.statuses['Pending'], RENT))
+
+    def test_overdue_invoice_can_be_settled(self):
+        Payment.objects.filter(pk=self.invoice.pk).update(
+            status_id=self.statuses['Overdue'], due_date=date.today() - timedelta(days=30)
+        )
+        report = import_payments([{**self.payment_data(), 'reference_number': 'ST1'}])
+        self.assertEqual(report['settled'], 1)
+        self.invoice.refresh_from_db()
+        self.assertEqual(self.invoice.status_id, self.statuses['Paid'])
+
+
+class OverdueJobTests(RollupAssertions, PaymentTestCase):
+    def add_payment(self, month, status_id, due_date):
+        return Payment.objects.create(
+            tenant=self.tenant, amount=RENT, status_id=status_id, due_date=due_date,
+            payment_for_month=month, payment_for_year=2026
+        ).id
+
+    def test_moves_exactly_the_past_due_pending_payments(self):
+        today = date(2026, 3, 10)
+        pending, overdue = self.statuses['Pending'], self.statuses['Overdue']
+        moved = [
+            self.add_payment(1, pending, date(2026, 3, 1)),
+            self.add_payment(2, PaymentStatus.objects.create(name='PENDING').id, date(2026, 3, 9)),
+        ]
+        kept = {
+            self.add_payment(3, pending, today): pending,
+            self.add_payment(4, pending, date(2026, 4, 1)): pending,
+            self.add_payment(5, self.statuses['Paid'], date(2026, 2, 1)): self.statuses['Paid'],
+            self.add_payment(6, self.statuses['Processing'], date(2026, 2, 1)): self.statuses['Processing'],
+            self.add_payment(7, overdue, date(2026, 2, 1)): overdue,
+        }
+
+        self.assertEqual(mark_overdue_payments(today=today), 2)
+        payments = Payment.objects.in_bulk()
+        for pk in moved:
+            self.assertEqual(payments[pk].status_id, overdue)
+            self.assertIsNotNone(payments[pk].overdue_at)
+        for pk, status_id in kept.items():
+            self.assertEqual(payments[pk].status_id, status_id)
+            self.assertIsNone(payments[pk].overdue_at)
+        self.assertRollupsMatchRebuild()
+
+    def test_rerun_moves_nothing(self):
+        self.add_payment(1, self.statuses['Pending'], date(2026, 3, 1))
+        self.assertEqual(mark_overdue_payments(today=date(2026, 3, 10)), 1)
+        overdue_at = Payment.objects.get().overdue_at
+
+        self.assertEqual(mark_overdue_payments(today=date(2026, 3, 10)), 0)
+        self.assertEqual(Payment.objects.get().overdue_at, overdue_at)
+        self.assertRollupsMatchRebuild()
+
+
+class BulkImportTests(RollupAssertions, PaymentTestCase):
+    def row(self, reference, month=3, tenant=None, **overrides):
+        return {
+            **self.payment_data(tenant=(tenant or self.tenant).id, payment_for_month=month),
+            'reference_number': reference, 'status': 'Paid', **overrides
+        }
+
+    def errors(self, report):
+        return [(error['row'], error['reason'], *error['errors']) for error in report['errors']]
+
+    def test_duplicate_references_are_skipped(self):
+        Payment.objects.create(
+            tenant=self.tenants[1], amount=RENT, status_id=self.statuses['Paid'], due_date=date(2026, 1, 1),
+            payment_for_month=1, payment_for_year=2026, reference_number='OLD'
+        )
+        report = import_payments([
+            self.row('OLD', month=4),
+            self.row('NEW', month=5),
+            self.row('NEW', month=6),
+            self.row('', month=7),
+            self.row('', month=8),
+        ])
+        self.assertEqual((report['accepted'], report['created'], report['duplicates']), (3, 3, 2))
+        self.assertEqual(
+            self.errors(report), [(1, 'duplicate', 'reference_number'), (3, 'duplicate', 'reference_number')]
+        )
+        self.assertEqual(
+            sorted(Payment.objects.filter(tenant=self.tenant).values_list('payment_for_month', flat=True)), [5, 7, 8]
+        )
+        self.assertRollupsMatchRebuild()
+
+    def test_duplicate_months_are_skipped(self):
+        Payment.objects.create(
+            tenant=self.tenant, amount=RENT, status_id=self.statuses['Paid'], due_date=date(2026, 3, 1),
+            payment_for_month=3, payment_for_year=2026
+        )
+        report = import_payments([
+            self.row('A', month=3),
+            self.row('B', month=4),
+            self.row('C', month=4),
+            self.row('D', month=4, tenant=self.tenants[1]),
+            self.row('E', month=4, payment_for_year=2027),
+        ])
+        self.assertEqual((report['created'], report['duplicates']), (3, 2))
+        self.assertEqual(
+            self.errors(report), [(1, 'duplicate', 'payment_for_month'), (3, 'duplicate', 'payment_for_month')]
+        )
+        kept = Payment.objects.get(tenant=self.tenant, payment_for_month=4, payment_for_year=2026)
+        self.assertEqual(kept.reference_number, 'B')
+
+    def test_dry_run_saves_nothing(self):
+        report = import_payments([self.row('A'), self.row('B'), {'tenant': self.tenant.id}], dry_run=True)
+        self.assertEqual((report['accepted'], report['created'], report['invalid'], report['dry_run']), (1, 0, 1, True))
+        self.assertEqual(
+            self.errors(report)[1], (3, 'invalid', 'amount', 'due_date', 'payment_for_month', 'payment_for_year')
+        )
+        self.assertFalse(Payment.objects.exists())
+
+    def test_tenants_outside_the_scope_are_not_found(self):
+        outsider = Tenant.objects.create(
+            user=User.objects.create_user('outsider'),
+            apartment=Apartment.objects.create(
+                block=Block.objects.create(estate=Estate.objects.create(name='Other', address='-'), name='B'),
+                number='1', rent_amount=RENT
+            )
+        )
+        report = import_payments(
+            [self.row('A'), self.row('B', tenant=outsider), self.row('C', tenant=outsider, month=4)],
+            estate_ids=[self.estate.id]
+        )
+        self.assertEqual((report['created'], report['invalid']), (1, 2))
+        self.assertEqual(report['errors'][0]['errors'], {'tenant': ['Tenant not found']})
+        self.assertFalse(Payment.objects.filter(tenant=outsider).exists())
+
+    def test_csv_upload(self):
+        upload = SimpleUploadedFile('statement.csv', (
+            'tenant,amount,due_date,payment_for_month,payment_for_year,reference_number,status\n'
+            f'{self.tenant.id},1000.00,2026-03-01,3,2026,ST1,Paid\n'
+            f'{self.tenant.id},1000.00,2026-04-01,4,2026,ST1,Paid\n'
+        ).encode(), content_type='text/csv')
+        url = '/api/payments/payments/bulk-import/'
+
+        response = self.manager.post(url + '?dry_run=true', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['accepted'], response.data['duplicates']), (1, 1))
+        self.assertFalse(Payment.objects.exists())
+
+        upload.seek(0)
+        response = self.manager.post(url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 1)
+        payment = Payment.objects.get()
+        self.assertEqual((payment.reference_number, payment.status_id), ('ST1', self.statuses['Paid']))
+        self.assertIsNotNone(payment.paid_at)
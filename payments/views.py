@@ -1,16 +1,26 @@
+import logging
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db import IntegrityError, transaction
 from django.db.models import Q, Count, Sum
 from django.utils import timezone
 from datetime import timedelta
 from .models import Payment, PaymentStatus
+from .imports import PaymentImportError, import_payments, parse_import_rows
+from .invoices import InvoiceAmountMismatch, open_invoice
+from .overdue import overdue_status_ids, pending_status_ids
 from .serializers import PaymentSerializer, PaymentStatusSerializer
 from tenants.models import Tenant
 from core.models import Estate, Block, Apartment
+from core.exports import PAYMENT_COLUMNS, streaming_csv_response, with_tenant_name
+from core.scoping import EstateScopeMixin
+from core.statuses import PAYMENT_STATUSES
 
-class PaymentViewSet(viewsets.ModelViewSet):
+logger = logging.getLogger(__name__)
+
+class PaymentViewSet(EstateScopeMixin, viewsets.ModelViewSet):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
@@ -33,6 +43,42 @@ class PaymentViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(payment_type=payment_type)
         return queryset
     
+    @action(detail=False, methods=['get'], url_path='export.csv', url_name='export-csv')
+    def export_csv(self, request):
+        """Stream every payment matching the list filters as CSV"""
+        queryset = self.scope_to_owner(self.get_queryset(), 'tenant__apartment__block__estate')
+        filename = f'payments_{timezone.localdate().isoformat()}.csv'
+        return streaming_csv_response(with_tenant_name(queryset), PAYMENT_COLUMNS, filename)
+    
+    @action(detail=False, methods=['post'], url_path='bulk-import')
+    def bulk_import(self, request):
+        """
+        Import a batch of payments from a bank or mobile-money statement: a CSV
+        upload ("file") or a JSON list. Valid rows are created together, or
+        settle the open invoice for their month; invalid and duplicate rows
+        are reported by row number. ?dry_run=true
+        validates without saving.
+        """
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        try:
+            rows = parse_import_rows(request)
+        except PaymentImportError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            report = import_payments(rows, estate_ids=self.get_estate_scope(), dry_run=dry_run)
+        except IntegrityError:
+            return Response({
+                'error': 'Another change to these payments was saved during the import; nothing was imported',
+                'detail': 'Retry the import to skip the payments that now exist'
+            }, status=status.HTTP_409_CONFLICT)
+        
+        logger.info(
+            'Bulk import: %d created, %d settled, %d duplicates, %d invalid',
+            report['created'], report['settled'], report['duplicates'], report['invalid']
+        )
+        return Response(report, status=status.HTTP_201_CREATED if report['created'] else status.HTTP_200_OK)
+    
     def create(self, request, *args, **kwargs):
         """Create payment with proper validation"""
         try:
@@ -107,32 +153,9 @@ class PaymentViewSet(viewsets.ModelViewSet):
                     }, status=status.HTTP_404_NOT_FOUND)
             else:
                 # Set default status if not provided
-                pending_status, created = PaymentStatus.objects.get_or_create(
-                    name='Pending',
-                    defaults={'name': 'Pending'}
-                )
-                data['status'] = pending_status.id
-                print(f"Set default status: {pending_status.name} (ID: {pending_status.id})")
-            
-            # Check for duplicate payment (same tenant, month, year)
-            month = data.get('payment_for_month')
-            year = data.get('payment_for_year')
-            print(f"Checking for duplicate payment: Tenant {tenant_id}, Month {month}, Year {year}")
-            
-            existing_payment = Payment.objects.filter(
-                tenant=tenant,
-                payment_for_month=month,
-                payment_for_year=year
-            ).first()
-            
-            if existing_payment:
-                print(f"Duplicate payment found: ID {existing_payment.id}")
-                return Response({
-                    'error': f'Payment for {month}/{year} already exists for this tenant',
-                    'existing_payment_id': existing_payment.id
-                }, status=status.HTTP_400_BAD_REQUEST)
+                data['status'] = PAYMENT_STATUSES.get_or_create('Pending')
+                print(f"Set default status: Pending (ID: {data['status']})")
             
-            print(f"No duplicate payment found - proceeding with creation")
             print(f"Final data for serializer: {data}")
             
             # Use serializer to create payment
@@ -141,11 +164,24 @@ class PaymentViewSet(viewsets.ModelViewSet):
             
             if serializer.is_valid():
                 print(f"Serializer is valid - saving payment")
-                payment = serializer.save()
+                # A payment for an invoiced month settles the invoice; any other
+                # second payment for the same tenant/month is rejected by the
+                # unique_payment_per_tenant_month constraint, not a pre-check
+                try:
+                    payment, settled = self._save_payment(serializer)
+                except InvoiceAmountMismatch as e:
+                    return self._invoice_mismatch_response(e.invoice)
+                except IntegrityError:
+                    duplicate = self._duplicate_payment_response(
+                        tenant_id, data.get('payment_for_month'), data.get('payment_for_year')
+                    )
+                    if duplicate is None:
+                        raise
+                    return duplicate
                 print(f"Payment created successfully with ID: {payment.id}")
                 
                 return Response({
-                    'message': 'Payment created successfully',
+                    'message': 'Payment recorded against the open invoice for this month' if settled else 'Payment created successfully',
                     'payment': PaymentSerializer(payment).data,
                     'months_paid': months_paid
                 }, status=status.HTTP_201_CREATED)
@@ -186,9 +222,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
             # Validate tenant if provided
             if 'tenant' in data:
                 tenant_id = data.get('tenant')
-                try:
-                    tenant = Tenant.objects.get(id=tenant_id)
-                except Tenant.DoesNotExist:
+                if not Tenant.objects.filter(id=tenant_id).exists():
                     return Response({
                         'error': 'Tenant not found'
                     }, status=status.HTTP_404_NOT_FOUND)
@@ -219,28 +253,24 @@ class PaymentViewSet(viewsets.ModelViewSet):
                         'error': 'Payment status not found'
                     }, status=status.HTTP_404_NOT_FOUND)
             
-            # Check for duplicate payment if month/year is being changed
-            if 'payment_for_month' in data or 'payment_for_year' in data:
-                month = data.get('payment_for_month', instance.payment_for_month)
-                year = data.get('payment_for_year', instance.payment_for_year)
-                tenant = data.get('tenant', instance.tenant.id)
-                
-                existing_payment = Payment.objects.filter(
-                    tenant_id=tenant,
-                    payment_for_month=month,
-                    payment_for_year=year
-                ).exclude(id=instance.id).first()
-                
-                if existing_payment:
-                    return Response({
-                        'error': f'Payment for {month}/{year} already exists for this tenant',
-                        'existing_payment_id': existing_payment.id
-                    }, status=status.HTTP_400_BAD_REQUEST)
-            
             # Use serializer to update payment
             serializer = self.get_serializer(instance, data=data, partial=True)
             if serializer.is_valid():
-                payment = serializer.save()
+                # Moving onto a month the tenant already has a payment for
+                # violates unique_payment_per_tenant_month
+                try:
+                    with transaction.atomic():
+                        payment = serializer.save()
+                except IntegrityError:
+                    duplicate = self._duplicate_payment_response(
+                        data.get('tenant', instance.tenant_id),
+                        data.get('payment_for_month', instance.payment_for_month),
+                        data.get('payment_for_year', instance.payment_for_year),
+                        exclude_id=instance.id
+                    )
+                    if duplicate is None:
+                        raise
+                    return duplicate
                 
                 # Log status change if applicable
                 if 'status' in data:
@@ -266,6 +296,74 @@ class PaymentViewSet(viewsets.ModelViewSet):
                 'details': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    def update(self, request, *args, **kwargs):
+        """Handle PUT requests; a tenant/month clash gets the same 400 as create and PATCH"""
+        instance = self.get_object()
+        serializer = self.get_serializer(instance, data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            data = serializer.validated_data
+            duplicate = self._duplicate_payment_response(
+                data['tenant'].id, data.get('payment_for_month'), data.get('payment_for_year'),
+                exclude_id=instance.id
+            )
+            if duplicate is None:
+                raise
+            return duplicate
+        return Response(serializer.data)
+    
+    def _save_payment(self, serializer):
+        """
+        Save a validated new payment, or settle the tenant's pending/overdue
+        invoice for the month with it. Returns (payment, settled); raises
+        InvoiceAmountMismatch, saving nothing, for a payment of any amount
+        other than the invoice's.
+        """
+        data = serializer.validated_data
+        with transaction.atomic():
+            invoice = open_invoice(
+                data['tenant'].id, data.get('payment_for_year'), data.get('payment_for_month')
+            )
+            if invoice is None:
+                return serializer.save(), False
+            if data['amount'] != invoice.amount:
+                raise InvoiceAmountMismatch(invoice, data['amount'])
+            # The invoice keeps its due date, so it still reads as paid late if it was
+            serializer.instance = invoice
+            payment = serializer.save(
+                due_date=invoice.due_date, paid_at=data.get('paid_at') or timezone.now()
+            )
+            return payment, True
+    
+    def _invoice_mismatch_response(self, invoice):
+        """400 for a payment that doesn't match the open invoice it would settle"""
+        return Response({
+            'error': (
+                f'Payment for {invoice.payment_for_month}/{invoice.payment_for_year} must be '
+                f'{invoice.amount}, the amount of the open invoice for that month'
+            ),
+            'invoice_id': invoice.id,
+            'invoice_amount': str(invoice.amount)
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    def _duplicate_payment_response(self, tenant_id, month, year, exclude_id=None):
+        """400 naming the payment that already covers tenant/month/year, or None if there is none"""
+        existing_payment = Payment.objects.filter(
+            tenant_id=tenant_id,
+            payment_for_month=month,
+            payment_for_year=year
+        ).exclude(id=exclude_id).first()
+        if existing_payment is None:
+            return None
+        logger.debug('Duplicate payment found: ID %s', existing_payment.id)
+        return Response({
+            'error': f'Payment for {month}/{year} already exists for this tenant',
+            'existing_payment_id': existing_payment.id
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
     @action(detail=False, methods=['get'])
     def my_payments(self, request):
         """Get payments for the logged-in tenant"""
@@ -288,7 +386,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
             # Get payments due in next 7 days
             upcoming_due = Payment.objects.filter(
                 tenant=tenant,
-                status__name__in=['Pending', 'Overdue'],
+                status_id__in=pending_status_ids() + overdue_status_ids(),
                 due_date__lte=today + timedelta(days=7),
                 due_date__gte=today
             ).order_by('due_date')
@@ -296,8 +394,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
             # Get overdue payments
             overdue = Payment.objects.filter(
                 tenant=tenant,
-                status__name='Overdue',
-                due_date__lt=today
+                status_id__in=overdue_status_ids()
             ).order_by('due_date')
             
             return Response({
@@ -318,15 +415,24 @@ class PaymentViewSet(viewsets.ModelViewSet):
             data['tenant'] = tenant.id
             
             # Get or create 'Processing' status for tenant-logged payments
-            processing_status, created = PaymentStatus.objects.get_or_create(
-                name='Processing',
-                defaults={'name': 'Processing'}
-            )
-            data['status'] = processing_status.id
+            data['status'] = PAYMENT_STATUSES.get_or_create('Processing')
             
             serializer = self.get_serializer(data=data)
             if serializer.is_valid():
-                payment = serializer.save()
+                # A payment for an invoiced month settles the invoice; any other
+                # month the tenant already has a payment for violates
+                # unique_payment_per_tenant_month
+                try:
+                    payment, _ = self._save_payment(serializer)
+                except InvoiceAmountMismatch as e:
+                    return self._invoice_mismatch_response(e.invoice)
+                except IntegrityError:
+                    duplicate = self._duplicate_payment_response(
+                        tenant.id, data.get('payment_for_month'), data.get('payment_for_year')
+                    )
+                    if duplicate is None:
+                        raise
+                    return duplicate
                 
                 # TODO: Send notification to property manager about new payment log
                 # TODO: Send SMS alert to property manager
@@ -350,6 +456,9 @@ class PaymentViewSet(viewsets.ModelViewSet):
                 tenant=tenant
             ).order_by('-created_at')
             
+            statuses = PAYMENT_STATUSES.names()
+            paid_ids = PAYMENT_STATUSES.ids('Paid')
+            pending_ids = PAYMENT_STATUSES.ids('Pending', 'Processing')
             payment_data = []
             for payment in recent_payments:
                 payment_data.append({
@@ -359,22 +468,22 @@ class PaymentViewSet(viewsets.ModelViewSet):
                     'paid_at': payment.paid_at,
                     'payment_for_month': payment.payment_for_month,
                     'payment_for_year': payment.payment_for_year,
-                    'status': payment.status.name if payment.status else 'Unknown',
+                    'status': statuses.get(payment.status_id, 'Unknown'),
                     'payment_method': payment.payment_method,
                     'reference_number': payment.reference_number,
                     'receipt_file': payment.receipt_file.url if payment.receipt_file else None,
-                    'acknowledgement_status': 'Acknowledged' if payment.status and payment.status.name == 'Paid' else 'Pending'
+                    'acknowledgement_status': 'Acknowledged' if statuses.get(payment.status_id) == 'Paid' else 'Pending'
                 })
             
             print({
                 'payments': payment_data,
-                'total_paid': recent_payments.filter(status__name='Paid').count(),
-                'total_pending': recent_payments.filter(status__name__in=['Pending', 'Processing']).count()
+                'total_paid': recent_payments.filter(status_id__in=paid_ids).count(),
+                'total_pending': recent_payments.filter(status_id__in=pending_ids).count()
             })
             return Response({
                 'payments': payment_data,
-                'total_paid': recent_payments.filter(status__name='Paid').count(),
-                'total_pending': recent_payments.filter(status__name__in=['Pending', 'Processing']).count()
+                'total_paid': recent_payments.filter(status_id__in=paid_ids).count(),
+                'total_pending': recent_payments.filter(status_id__in=pending_ids).count()
             })
         except Tenant.DoesNotExist:
             return Response({'error': 'Tenant profile not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -384,21 +493,23 @@ class PaymentViewSet(viewsets.ModelViewSet):
     def dashboard_summary(self, request):
         """Get payment dashboard summary for property owner"""
         current_date = timezone.now().date()
+        payments = self.scope_to_owner(Payment.objects.all(), 'tenant__apartment__block__estate')
+        paid_ids = PAYMENT_STATUSES.ids_containing('paid')
+        overdue_ids = overdue_status_ids()
+        # Overdue payments are still pending payment
+        pending_ids = pending_status_ids() + overdue_ids
         
         # Get payment statistics
-        total_payments = Payment.objects.count()
-        paid_payments = Payment.objects.filter(status__name__icontains='paid').count()
-        pending_payments = Payment.objects.filter(status__name__icontains='pending').count()
-        overdue_payments = Payment.objects.filter(
-            status__name__icontains='pending',
-            due_date__lt=current_date
-        ).count()
+        total_payments = payments.count()
+        paid_payments = payments.filter(status_id__in=paid_ids).count()
+        pending_payments = payments.filter(status_id__in=pending_ids).count()
+        overdue_payments = payments.filter(status_id__in=overdue_ids).count()
         
         # Monthly revenue
         current_month = current_date.month
         current_year = current_date.year
-        monthly_revenue = Payment.objects.filter(
-            status__name__icontains='paid',
+        monthly_revenue = payments.filter(
+            status_id__in=paid_ids,
             payment_for_month=current_month,
             payment_for_year=current_year
         ).aggregate(total=Sum('amount'))['total'] or 0
@@ -415,60 +526,72 @@ class PaymentViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def estate_payment_status(self, request):
         """Get payment status per estate"""
-        estates = Estate.objects.all()
-        estate_data = []
+        estates = self.scope_to_owner(Estate.objects.all(), 'id')
+        estate_field = 'tenant__apartment__block__estate'
         
-        for estate in estates:
-            # Get all apartments in this estate
-            estate_apartments = Apartment.objects.filter(block__estate=estate)
-            total_apartments = estate_apartments.count()
-            
-            # Get tenants in this estate
-            estate_tenants = Tenant.objects.filter(apartment__block__estate=estate)
-            
-            # Calculate payment statistics
-            total_rent_expected = sum(
-                tenant.apartment.rent_amount or 0 
-                for tenant in estate_tenants 
-                if tenant.apartment and tenant.apartment.rent_amount
+        # Per-estate figures come from one grouped query each, not one per estate/tenant
+        apartment_counts = dict(
+            self.scope_to_owner(Apartment.objects.all(), 'block__estate').order_by().values(
+                'block__estate'
+            ).annotate(count=Count('id')).values_list('block__estate', 'count')
+        )
+        
+        has_rent = Q(apartment__rent_amount__isnull=False) & ~Q(apartment__rent_amount=0)
+        tenant_totals = {
+            row['apartment__block__estate']: row
+            for row in self.scope_to_owner(Tenant.objects.all(), 'apartment__block__estate').order_by().values(
+                'apartment__block__estate'
+            ).annotate(
+                tenants=Count('id'),
+                rent_expected=Sum('apartment__rent_amount', filter=has_rent)
             )
-            
-            # Get paid payments for current month
-            current_month = timezone.now().month
-            current_year = timezone.now().year
-            paid_amount = Payment.objects.filter(
-                tenant__apartment__block__estate=estate,
-                status__name__icontains='paid',
+        }
+        
+        # Get paid payments for current month
+        current_month = timezone.now().month
+        current_year = timezone.now().year
+        paid_amounts = dict(
+            self.scope_to_owner(Payment.objects.filter(
+                status_id__in=PAYMENT_STATUSES.ids_containing('paid'),
                 payment_for_month=current_month,
                 payment_for_year=current_year
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            # Get overdue tenants
-            overdue_tenants = []
-            for tenant in estate_tenants:
-                overdue_payments = Payment.objects.filter(
-                    tenant=tenant,
-                    status__name__icontains='pending',
-                    due_date__lt=timezone.now().date()
-                ).count()
-                if overdue_payments > 0:
-                    overdue_tenants.append({
-                        'tenant_id': tenant.id,
-                        'tenant_name': f"{tenant.user.first_name} {tenant.user.last_name}",
-                        'apartment': tenant.apartment.number if tenant.apartment else None,
-                        'overdue_months': overdue_payments
-                    })
+            ), estate_field).order_by().values(estate_field).annotate(
+                total=Sum('amount')
+            ).values_list(estate_field, 'total')
+        )
+        
+        # Overdue payment counts per tenant, across every estate at once
+        overdue_tenants = {}
+        overdue_rows = self.scope_to_owner(Payment.objects.filter(
+            status_id__in=overdue_status_ids()
+        ), estate_field).order_by().values(
+            estate_field, 'tenant', 'tenant__user__first_name', 'tenant__user__last_name', 'tenant__apartment__number'
+        ).annotate(overdue_months=Count('id')).order_by('tenant')
+        for row in overdue_rows:
+            overdue_tenants.setdefault(row[estate_field], []).append({
+                'tenant_id': row['tenant'],
+                'tenant_name': f"{row['tenant__user__first_name']} {row['tenant__user__last_name']}",
+                'apartment': row['tenant__apartment__number'],
+                'overdue_months': row['overdue_months']
+            })
+        
+        estate_data = []
+        for estate in estates:
+            totals = tenant_totals.get(estate.id, {})
+            total_rent_expected = totals.get('rent_expected') or 0
+            paid_amount = paid_amounts.get(estate.id) or 0
+            estate_overdue = overdue_tenants.get(estate.id, [])
             
             estate_data.append({
                 'estate_id': estate.id,
                 'estate_name': estate.name,
-                'total_apartments': total_apartments,
-                'occupied_apartments': estate_tenants.count(),
+                'total_apartments': apartment_counts.get(estate.id, 0),
+                'occupied_apartments': totals.get('tenants', 0),
                 'total_rent_expected': total_rent_expected,
                 'rent_collected': paid_amount,
                 'collection_rate': (paid_amount / total_rent_expected * 100) if total_rent_expected > 0 else 0,
-                'overdue_tenants': overdue_tenants,
-                'overdue_count': len(overdue_tenants)
+                'overdue_tenants': estate_overdue,
+                'overdue_count': len(estate_overdue)
             })
         
         return Response(estate_data)
@@ -477,23 +600,26 @@ class PaymentViewSet(viewsets.ModelViewSet):
     def payment_alerts(self, request):
         """Get payment alerts for property owner"""
         current_date = timezone.now().date()
+        payments = self.scope_to_owner(Payment.objects.all(), 'tenant__apartment__block__estate')
+        paid_ids = PAYMENT_STATUSES.ids_containing('paid')
+        pending_ids = pending_status_ids()
         
         # Overdue payments (more than 30 days)
-        overdue_30_days = Payment.objects.filter(
-            status__name__icontains='pending',
+        overdue_30_days = payments.filter(
+            status_id__in=overdue_status_ids(),
             due_date__lt=current_date - timedelta(days=30)
         ).select_related('tenant', 'tenant__user', 'tenant__apartment')
         
         # Upcoming due payments (next 7 days)
-        upcoming_due = Payment.objects.filter(
-            status__name__icontains='pending',
+        upcoming_due = payments.filter(
+            status_id__in=pending_ids,
             due_date__gte=current_date,
             due_date__lte=current_date + timedelta(days=7)
         ).select_related('tenant', 'tenant__user', 'tenant__apartment')
         
         # Recently paid payments (last 7 days)
-        recently_paid = Payment.objects.filter(
-            status__name__icontains='paid',
+        recently_paid = payments.filter(
+            status_id__in=paid_ids,
             paid_at__gte=timezone.now() - timedelta(days=7)
         ).select_related('tenant', 'tenant__user', 'tenant__apartment')
         
@@ -721,9 +847,9 @@ class PaymentViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def pending_payments(self, request):
         """Get all pending payments"""
-        pending_status = PaymentStatus.objects.filter(name__icontains='pending').first()
-        if pending_status:
-            pending_payments = Payment.objects.filter(status=pending_status)
+        pending_status_id = PAYMENT_STATUSES.first_containing('pending')
+        if pending_status_id:
+            pending_payments = Payment.objects.filter(status_id=pending_status_id)
             serializer = self.get_serializer(pending_payments, many=True)
             return Response(serializer.data)
         return Response({'error': 'Pending status not found'}, status=status.HTTP_400_BAD_REQUEST)
@@ -731,10 +857,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def overdue_payments(self, request):
         """Get all overdue payments"""
-        overdue_payments = Payment.objects.filter(
-            due_date__lt=timezone.now().date(),
-            status__name__icontains='pending'
-        )
+        overdue_payments = Payment.objects.filter(status_id__in=overdue_status_ids())
         serializer = self.get_serializer(overdue_payments, many=True)
         return Response(serializer.data)
 
@@ -750,29 +873,30 @@ class PaymentViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         # Filter payments by date range
-        payments = Payment.objects.filter(
+        payments = self.scope_to_owner(Payment.objects.filter(
             created_at__date__gte=start_date,
             created_at__date__lte=end_date
-        )
+        ), 'tenant__apartment__block__estate')
+        paid_ids = PAYMENT_STATUSES.ids_containing('paid')
+        overdue_ids = overdue_status_ids()
+        # Overdue payments are still pending payment
+        pending_ids = pending_status_ids() + overdue_ids
         
         total_payments = payments.count()
         total_amount = payments.aggregate(sum=Sum('amount'))['sum'] or 0
-        paid_amount = payments.filter(status__name__icontains='paid').aggregate(sum=Sum('amount'))['sum'] or 0
-        pending_amount = payments.filter(status__name__icontains='pending').aggregate(sum=Sum('amount'))['sum'] or 0
-        overdue_amount = payments.filter(
-            status__name__icontains='pending',
-            due_date__lt=timezone.now().date()
-        ).aggregate(sum=Sum('amount'))['sum'] or 0
+        paid_amount = payments.filter(status_id__in=paid_ids).aggregate(sum=Sum('amount'))['sum'] or 0
+        pending_amount = payments.filter(status_id__in=pending_ids).aggregate(sum=Sum('amount'))['sum'] or 0
+        overdue_amount = payments.filter(status_id__in=overdue_ids).aggregate(sum=Sum('amount'))['sum'] or 0
         
         # Estate breakdown
-        estates = Estate.objects.all()
+        estates = self.scope_to_owner(Estate.objects.all(), 'id')
         estate_breakdown = []
         
         for estate in estates:
             estate_payments = payments.filter(tenant__apartment__block__estate=estate)
             estate_count = estate_payments.count()
             estate_total = estate_payments.aggregate(sum=Sum('amount'))['sum'] or 0
-            estate_paid = estate_payments.filter(status__name__icontains='paid').aggregate(sum=Sum('amount'))['sum'] or 0
+            estate_paid = estate_payments.filter(status_id__in=paid_ids).aggregate(sum=Sum('amount'))['sum'] or 0
             
             if estate_count > 0:
                 estate_breakdown.append({
@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class TenantsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'tenants'
\ No newline at end of file
+    name = 'tenants'
+
+    def ready(self):
+        from . import signals  # noqa: F401
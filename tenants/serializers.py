@@ -2,12 +2,21 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Tenant, TenantType
 from core.models import UserProfile
+from core.fieldsets import SparseFieldsetSerializerMixin, subtree, trim_fields
 
-class TenantSerializer(serializers.ModelSerializer):
+class TenantSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     user = serializers.DictField(write_only=True)
     user_details = serializers.SerializerMethodField(read_only=True)
     tenant_type_details = serializers.SerializerMethodField(read_only=True)
     apartment_details = serializers.SerializerMethodField(read_only=True)
+
+    # apartment_details nests block and estate unless ?expand= narrows it
+    default_expand = ['apartment_details.block.estate']
+    field_sources = {
+        'user_details': 'user',
+        'tenant_type_details': 'tenant_type',
+        'apartment_details': 'apartment',
+    }
     
     class Meta:
         model = Tenant
@@ -16,44 +25,51 @@ class TenantSerializer(serializers.ModelSerializer):
     def get_user_details(self, obj):
         """Return user details for read operations"""
         if obj.user:
-            return {
+            return trim_fields({
                 'id': obj.user.id,
                 'username': obj.user.username,
                 'email': obj.user.email,
                 'first_name': obj.user.first_name,
                 'last_name': obj.user.last_name
-            }
+            }, subtree(self._fieldset_fields, 'user_details'))
         return None
     
     def get_tenant_type_details(self, obj):
         """Return tenant type details"""
         if obj.tenant_type:
-            return {
+            return trim_fields({
                 'id': obj.tenant_type.id,
                 'name': obj.tenant_type.name,
                 'description': obj.tenant_type.description
-            }
+            }, subtree(self._fieldset_fields, 'tenant_type_details'))
         return None
     
     def get_apartment_details(self, obj):
         """Return apartment details with block and estate info"""
         if obj.apartment:
-            return {
-                'id': obj.apartment.id,
-                'number': obj.apartment.number,
-                'size': str(obj.apartment.size) if obj.apartment.size else None,
-                'rent_amount': str(obj.apartment.rent_amount) if obj.apartment.rent_amount else None,
-                'number_of_rooms': obj.apartment.number_of_rooms,
-                'block': {
-                    'id': obj.apartment.block.id,
-                    'name': obj.apartment.block.name,
-                    'estate': {
-                        'id': obj.apartment.block.estate.id,
-                        'name': obj.apartment.block.estate.name,
-                        'address': obj.apartment.block.estate.address
-                    }
-                }
+            apartment = obj.apartment
+            expand = self._fieldset_expand.get('apartment_details', {})
+            details = {
+                'id': apartment.id,
+                'number': apartment.number,
+                'size': str(apartment.size) if apartment.size else None,
+                'rent_amount': str(apartment.rent_amount) if apartment.rent_amount else None,
+                'number_of_rooms': apartment.number_of_rooms,
+                'block': apartment.block_id
             }
+            if 'block' in expand:
+                details['block'] = {
+                    'id': apartment.block.id,
+                    'name': apartment.block.name,
+                    'estate': apartment.block.estate_id
+                }
+                if 'estate' in expand['block']:
+                    details['block']['estate'] = {
+                        'id': apartment.block.estate.id,
+                        'name': apartment.block.estate.name,
+                        'address': apartment.block.estate.address
+                    }
+            return trim_fields(details, subtree(self._fieldset_fields, 'apartment_details'))
         return None
     
     def create(self, validated_data):
@@ -80,7 +96,7 @@ class TenantSerializer(serializers.ModelSerializer):
         tenant = Tenant.objects.create(user=user, **validated_data)
         return tenant
 
-class TenantTypeSerializer(serializers.ModelSerializer):
+class TenantTypeSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = TenantType
         fields = '__all__'
\ No newline at end of file
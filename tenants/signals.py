@@ -0,0 +1,27 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from core.models import Apartment
+from .models import Tenant
+
+
+@receiver(post_init, sender=Tenant)
+def remember_loaded_apartment(sender, instance, **kwargs):
+    """Remember the apartment a tenant was loaded with so a move can release it"""
+    # Reading a deferred column (e.g. a ?fields= narrowed list) would cost a query per row
+    if 'apartment_id' in instance.__dict__:
+        instance._loaded_apartment_id = instance.apartment_id
+
+
+@receiver(post_save, sender=Tenant)
+def sync_apartment_occupancy_on_save(sender, instance, **kwargs):
+    """Keep Apartment.is_occupied in step with tenant assignment"""
+    previous_apartment_id = getattr(instance, '_loaded_apartment_id', None)
+    if kwargs.get('created') or previous_apartment_id != instance.apartment_id:
+        Apartment.sync_occupancy([previous_apartment_id, instance.apartment_id])
+    instance._loaded_apartment_id = instance.apartment_id
+
+
+@receiver(post_delete, sender=Tenant)
+def sync_apartment_occupancy_on_delete(sender, instance, **kwargs):
+    """Release the apartment when a tenant is removed"""
+    Apartment.sync_occupancy([instance.apartment_id])
@@ -0,0 +1,56 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from core.models import Estate, Block, Apartment
+from .models import Tenant
+
+
+class ApartmentOccupancySyncTests(TestCase):
+    """Apartment.is_occupied follows tenant assignment"""
+
+    def setUp(self):
+        block = Block.objects.create(estate=Estate.objects.create(name='Estate', address='-'), name='A')
+        self.first, self.second = (Apartment.objects.create(block=block, number=number) for number in ('1', '2'))
+
+    def add_tenant(self, apartment, username='tenant'):
+        return Tenant.objects.create(user=User.objects.create_user(username), apartment=apartment)
+
+    def assertOccupied(self, first, second):
+        occupied = dict(Apartment.objects.values_list('id', 'is_occupied'))
+        self.assertEqual((occupied[self.first.id], occupied[self.second.id]), (first, second))
+
+    def test_new_tenant_occupies_the_apartment(self):
+        self.assertOccupied(False, False)
+        self.add_tenant(self.first)
+        self.assertOccupied(True, False)
+
+    def test_move_releases_the_old_apartment(self):
+        tenant = self.add_tenant(self.first)
+        tenant.apartment = self.second
+        tenant.save()
+        self.assertOccupied(False, True)
+
+        # Loaded fresh, as a view would
+        tenant = Tenant.objects.get(pk=tenant.pk)
+        tenant.apartment = None
+        tenant.save()
+        self.assertOccupied(False, False)
+
+    def test_apartment_stays_occupied_while_another_tenant_remains(self):
+        leaving = self.add_tenant(self.first, 'leaving')
+        self.add_tenant(self.first, 'staying')
+        leaving.apartment = self.second
+        leaving.save()
+        self.assertOccupied(True, True)
+
+    def test_delete_releases_the_apartment(self):
+        self.add_tenant(self.first)
+        Tenant.objects.get().delete()
+        self.assertOccupied(False, False)
+
+    def test_sync_occupancy_repairs_drift(self):
+        self.add_tenant(self.first)
+        # Bulk updates skip the signals
+        Apartment.objects.update(is_occupied=False)
+        Tenant.objects.update(apartment=self.second)
+        self.assertEqual(Apartment.sync_occupancy(), 2)
+        self.assertOccupied(False, True)
@@ -3,14 +3,16 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta
 from .models import Tenant, TenantType
 from .serializers import TenantSerializer, TenantTypeSerializer
 from core.models import Apartment
+from core.fieldsets import SparseFieldsetViewMixin
 
-class TenantViewSet(viewsets.ModelViewSet):
+class TenantViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Tenant.objects.all()
     serializer_class = TenantSerializer
     permission_classes = [IsAuthenticated]
@@ -51,47 +53,50 @@ class TenantViewSet(viewsets.ModelViewSet):
                     'error': 'Email already exists'
                 }, status=status.HTTP_400_BAD_REQUEST)
             
-            # Check if apartment is available
-            apartment_id = data.get('apartment')
-            if apartment_id:
-                apartment = Apartment.objects.filter(id=apartment_id).first()
-                if not apartment:
-                    return Response({
-                        'error': 'Apartment not found'
-                    }, status=status.HTTP_404_NOT_FOUND)
+            with transaction.atomic():
+                # Check if apartment is available - lock the row so two concurrent
+                # assignments can't both see it as vacant
+                apartment_id = data.get('apartment')
+                if apartment_id:
+                    apartment = Apartment.objects.select_for_update().filter(id=apartment_id).first()
+                    if not apartment:
+                        return Response({
+                            'error': 'Apartment not found'
+                        }, status=status.HTTP_404_NOT_FOUND)
+                    
+                    # Check if apartment already has a tenant
+                    if apartment.is_occupied:
+                        return Response({
+                            'error': 'Apartment is already occupied'
+                        }, status=status.HTTP_400_BAD_REQUEST)
                 
-                # Check if apartment already has a tenant
-                if Tenant.objects.filter(apartment=apartment).exists():
+                # Use serializer to create tenant (which will create user and profile);
+                # Apartment.is_occupied is updated by the tenant post_save signal
+                serializer = self.get_serializer(data=data)
+                if serializer.is_valid():
+                    tenant = serializer.save()
+                    
                     return Response({
-                        'error': 'Apartment is already occupied'
-                    }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Use serializer to create tenant (which will create user and profile)
-            serializer = self.get_serializer(data=data)
-            if serializer.is_valid():
-                tenant = serializer.save()
-                
-                return Response({
-                    'message': 'Tenant created successfully',
-                    'tenant': {
-                        'id': tenant.id,
-                        'user': {
-                            'id': tenant.user.id,
-                            'username': tenant.user.username,
-                            'email': tenant.user.email,
-                            'first_name': tenant.user.first_name,
-                            'last_name': tenant.user.last_name
-                        },
-                        'tenant_type': tenant.tenant_type.id if tenant.tenant_type else None,
-                        'apartment': tenant.apartment.id if tenant.apartment else None,
-                        'lease_start': tenant.lease_start,
-                        'lease_end': tenant.lease_end,
-                        'phone_number': tenant.phone_number,
-                        'emergency_contact': tenant.emergency_contact
-                    }
-                }, status=status.HTTP_201_CREATED)
-            else:
-                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+                        'message': 'Tenant created successfully',
+                        'tenant': {
+                            'id': tenant.id,
+                            'user': {
+                                'id': tenant.user.id,
+                                'username': tenant.user.username,
+                                'email': tenant.user.email,
+                                'first_name': tenant.user.first_name,
+                                'last_name': tenant.user.last_name
+                            },
+                            'tenant_type': tenant.tenant_type.id if tenant.tenant_type else None,
+                            'apartment': tenant.apartment.id if tenant.apartment else None,
+                            'lease_start': tenant.lease_start,
+                            'lease_end': tenant.lease_end,
+                            'phone_number': tenant.phone_number,
+                            'emergency_contact': tenant.emergency_contact
+                        }
+                    }, status=status.HTTP_201_CREATED)
+                else:
+                    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
                 
         except Exception as e:
             return Response({
@@ -117,48 +122,50 @@ class TenantViewSet(viewsets.ModelViewSet):
             print(f"Extracted user_data: {user_data}")
             print(f"Data after popping user: {data}")
             
-            if user_data:
-                user = instance.user
-                print(f"Updating user: {user.username}")
+            with transaction.atomic():
+                if user_data:
+                    user = instance.user
+                    print(f"Updating user: {user.username}")
+                    
+                    # Update user fields
+                    for field, value in user_data.items():
+                        if field == 'password':
+                            user.set_password(value)
+                        elif hasattr(user, field):
+                            setattr(user, field, value)
+                            print(f"Updated user.{field} = {value}")
+                    
+                    user.save()
+                    print("User saved successfully")
                 
-                # Update user fields
-                for field, value in user_data.items():
-                    if field == 'password':
-                        user.set_password(value)
-                    elif hasattr(user, field):
-                        setattr(user, field, value)
-                        print(f"Updated user.{field} = {value}")
+                # Handle apartment change
+                apartment_id = data.get('apartment')
+                if apartment_id and str(apartment_id) != str(instance.apartment_id):
+                    apartment = Apartment.objects.select_for_update().filter(id=apartment_id).first()
+                    if not apartment:
+                        return Response({
+                            'error': 'Apartment not found'
+                        }, status=status.HTTP_404_NOT_FOUND)
+                    
+                    # Check if new apartment is available
+                    if apartment.is_occupied:
+                        return Response({
+                            'error': 'Apartment is already occupied'
+                        }, status=status.HTTP_400_BAD_REQUEST)
                 
-                user.save()
-                print("User saved successfully")
-            
-            # Handle apartment change
-            apartment_id = data.get('apartment')
-            if apartment_id and str(apartment_id) != str(instance.apartment.id):
-                apartment = Apartment.objects.filter(id=apartment_id).first()
-                if not apartment:
-                    return Response({
-                        'error': 'Apartment not found'
-                    }, status=status.HTTP_404_NOT_FOUND)
+                print(f"Final data for serializer: {data}")
                 
-                # Check if new apartment is available
-                if Tenant.objects.filter(apartment=apartment).exclude(id=instance.id).exists():
-                    return Response({
-                        'error': 'Apartment is already occupied'
-                    }, status=status.HTTP_400_BAD_REQUEST)
-            
-            print(f"Final data for serializer: {data}")
-            
-            # Update tenant fields (without user data)
-            serializer = self.get_serializer(instance, data=data, partial=partial)
-            if serializer.is_valid():
-                print("Serializer is valid, saving...")
-                tenant = serializer.save()
-                print("Tenant saved successfully")
-                return Response(self.get_serializer(tenant).data)
-            else:
-                print(f"Serializer errors: {serializer.errors}")
-                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+                # Update tenant fields (without user data); the old and new
+                # apartments' is_occupied flags are updated by the post_save signal
+                serializer = self.get_serializer(instance, data=data, partial=partial)
+                if serializer.is_valid():
+                    print("Serializer is valid, saving...")
+                    tenant = serializer.save()
+                    print("Tenant saved successfully")
+                    return Response(self.get_serializer(tenant).data)
+                else:
+                    print(f"Serializer errors: {serializer.errors}")
+                    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
                 
         except Exception as e:
             print(f"Exception in tenant update: {str(e)}")
@@ -290,7 +297,7 @@ class TenantViewSet(viewsets.ModelViewSet):
             'count': len(expiring_data)
         })
 
-class TenantTypeViewSet(viewsets.ModelViewSet):
+class TenantTypeViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = TenantType.objects.all()
     serializer_class = TenantTypeSerializer
     permission_classes = [IsAuthenticated]
\ No newline at end of file